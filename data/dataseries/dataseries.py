@@ -4,6 +4,7 @@ manipulate multiple data series together
 
 v0.1 feb 2019
 v0.2 set 2020 added shuffle method
+v0.3 oct 2026 vectorized shuffle
 hdaniel@ualg.pt
 '''
 from abc import ABC, abstractmethod
@@ -11,9 +12,9 @@ from hdlib.data.dataseries.idataseries import IDataSeries
 from hdlib.base import Base
 import pandas as pd
 import numpy as np
-import random
+import json, struct
 from sklearn.preprocessing import MinMaxScaler
-from typing import ClassVar, Any, Tuple, Type
+from typing import ClassVar, Any, Tuple, Type, Iterator, Optional
 
 class DataSeries(IDataSeries, Base):
 	'''
@@ -26,6 +27,13 @@ class DataSeries(IDataSeries, Base):
 	'''
 	_comment    : ClassVar[str] = '#'
 	_rawDataRef : ClassVar[str] = '_rawData'
+	#binary file format, see save()
+	_fileMagic  : ClassVar[bytes] = b'HDDS\x01\x00\x00\x00'
+	_fileAlign  : ClassVar[int]   = 64
+	#values checked at a time by bounded()
+	_boundsBlock: ClassVar[int]   = 1<<20
+	#index samples scanned at a time by findGaps()
+	_gapsBlock  : ClassVar[int]   = 1<<20
 	
 	'''
 	Nested classes for indexing:
@@ -206,6 +214,78 @@ class DataSeries(IDataSeries, Base):
 		expectedSamples, existingSamples = self.findMissing(resolution) 
 		return  expectedSamples != existingSamples
 
+	def hasGaps(self, resolution:float) -> bool:
+		'''
+		returns True if there are gaps in the index at given resolution, found
+		with findGaps(). Unlike hasMissing(), a duplicate sample does not hide
+		a missing one, and extra samples are not reported.
+
+		Index must be sorted ascending with <DataSeries>.sortIndex()
+		'''
+		gaps, _ = self.findGaps(resolution)
+		return len(gaps) > 0
+
+	def findGaps(self, resolution:float) -> Tuple[pd.DataFrame, pd.Index]:
+		'''
+		Scans the index for gaps and duplicates, considering it has constant 
+		spaced period, at given resolution (as in findMissing()).
+
+		returns gaps, duplicates:
+			gaps:       DataFrame with a row for each gap and columns
+			            'start', index of the first missing sample, and
+			            'length', number of missing samples
+			duplicates: Index with the repeated index values
+		
+		Distances between consecutive samples are rounded to the nearest
+		multiple of resolution, so off grid samples are not gaps.
+		The index is scanned in blocks of _gapsBlock samples, in one pass, 
+		without creating the full reindexed range.
+
+		Index must be sorted ascending with <DataSeries>.sortIndex()
+		'''
+		idx  = self._indexAsNumbers(self._rawData.index)
+		step = self._resolutionAsNumber(resolution)
+		pos, lengths, dups = DataSeries._scanGaps(idx, step, type(self)._gapsBlock)
+		gaps = pd.DataFrame({'start': self._numbersAsIndex(idx[pos] + step), 'length': lengths})
+		return gaps, self._numbersAsIndex(idx[dups])
+
+	@staticmethod
+	def _scanGaps(idx:np.ndarray, step:float, blockSize:int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+		'''
+		returns positions of samples followed by a gap, number of missing samples
+		in each gap and positions of duplicate samples, in numeric index idx
+		with constant period step, scanned in blocks of blockSize samples. See findGaps()
+		'''
+		pos, lengths, dups = [], [], []
+		for i in range(0, max(len(idx)-1, 0), blockSize):
+			#overlap one sample with previous block
+			d = np.diff(idx[i:i+blockSize+1])
+			if (d < 0).any():
+				raise RuntimeError('Index must be sorted ascending, use sortIndex()')
+			missing = np.rint(d / step).astype(np.int64) - 1
+			g = np.flatnonzero(missing > 0)
+			pos.append(i + g)
+			lengths.append(missing[g])
+			dups.append(i + 1 + np.flatnonzero(d == 0))
+
+		if not pos: return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+		return np.concatenate(pos), np.concatenate(lengths), np.concatenate(dups)
+
+	def _indexAsNumbers(self, index:pd.Index) -> np.ndarray:
+		'''
+		returns index values as a numeric array, to find gaps.
+		Subclasses with non numeric index must override it
+		'''
+		return index.to_numpy()
+
+	def _resolutionAsNumber(self, resolution:float) -> float:
+		'''returns resolution in the same units of _indexAsNumbers()'''
+		return resolution
+
+	def _numbersAsIndex(self, values:np.ndarray) -> pd.Index:
+		'''inverse of _indexAsNumbers()'''
+		return pd.Index(values)
+
 
 	'''
 	Constructor, copy, converters, and factory methods
@@ -239,7 +319,7 @@ class DataSeries(IDataSeries, Base):
 		return obj
 		'''
 		#using _rawFromDataFrame() factory method
-		#fromDataFrame already copies
+		#_rawFromDataFrame already copies
 		#type(self) to get subclass Class and thus subclass object
 		obj = type(self)._rawFromDataFrame(self._rawData, copy=True)
 		return obj
@@ -277,21 +357,288 @@ class DataSeries(IDataSeries, Base):
 		obj = cls._rawFromDataFrame(df)
 		return obj
 
+	@classmethod
+	def _rawReadCSVChunks(cls, datafile:str, columns, chunkSize:int, dtype=None) -> Iterator[pd.DataFrame]:
+		'''
+		Generator that reads csv file in DataFrames with at most chunkSize rows,
+		so only one chunk is in memory at a time.
+
+		dtype: None to infer types per chunk, a type or a dict {column name: type}
+		'''
+		with pd.read_csv(datafile, names=columns, comment=cls._comment,
+						 dtype=dtype, chunksize=chunkSize) as reader:
+			for df in reader:
+				yield df
+
+	@staticmethod
+	def _rawCountLines(datafile:str, bufferSize:int=1<<20) -> int:
+		'''
+		returns the number of lines in a file, an upper bound of the number
+		of rows in a csv file (comment and empty lines are also counted).
+		Reads the file in buffers, so memory does not depend on file size
+		'''
+		lines = 0
+		last  = b'\n'
+		with open(datafile, 'rb') as fp:
+			while True:
+				buf = fp.read(bufferSize)
+				if not buf: break
+				lines += buf.count(b'\n')
+				last = buf[-1:]
+		#last line may not end with newline
+		if last != b'\n': lines += 1
+		return lines
+
+	@classmethod
+	def _rawStitchChunks(cls, chunks:Iterator[pd.DataFrame], rows:int) -> 'DataSeries':
+		'''
+		Factory method to create DataSeries, or its subclasses' objects, stitching
+		DataFrame chunks in one DataFrame, pre-allocated for rows (upper bound) samples.
+		Each chunk is copied once to its place, without concat() intermediate copies.
+
+		If a later chunk needs a wider type for a column (eg.: int then float)
+		that column is converted once.
+		Extension types, like category, are not pre-allocated, and fall back to concat()
+		'''
+		arrays : dict       = {}
+		index  : np.ndarray = None
+		first  : pd.DataFrame = None
+		pending = []  #only used on fallback
+		n = 0
+		for df in chunks:
+			if first is None:
+				first = df
+				if not all(isinstance(t, np.dtype) for t in df.dtypes):
+					pending.append(df)
+					continue
+				arrays = {c: np.empty(rows, dtype=df[c].dtype) for c in df.columns}
+				if not isinstance(df.index, pd.RangeIndex):
+					index = np.empty(rows, dtype=df.index.dtype)
+			if pending:
+				pending.append(df)
+				continue
+
+			m = len(df)
+			for c in df.columns:
+				col = df[c].to_numpy()
+				#copied only if the type widens, eg: int64 with a float64 chunk,
+				#not for chunks of narrower types, as int64 chunks of float64 columns
+				if col.dtype != arrays[c].dtype:
+					rt = np.result_type(arrays[c].dtype, col.dtype)
+					if rt != arrays[c].dtype: arrays[c] = arrays[c].astype(rt)
+				arrays[c][n:n+m] = col
+			if index is not None:
+				index[n:n+m] = df.index.to_numpy()
+			n += m
+
+		if first is None:
+			return cls._rawFromDataFrame(pd.DataFrame([]), copy=False)
+		if pending:
+			df = pd.concat(pending)
+			if isinstance(first.index, pd.RangeIndex): df = df.reset_index(drop=True)
+			return cls._rawFromDataFrame(df, copy=False)
+
+		#slices are views, no copies
+		if index is None: idx = pd.RangeIndex(n)
+		else:             idx = pd.Index(index[:n], name=first.index.name)
+		df = pd.DataFrame({c: arrays[c][:n] for c in first.columns}, index=idx,
+						  columns=first.columns, copy=False)
+		return cls._rawFromDataFrame(df, copy=False)
+
 	#Note:pandas has no support yet feb 2019
 	#pd.DataFrame behaves as Any
-	def toDataFrame(self) -> pd.DataFrame: 
+	def toDataFrame(self, copy=True) -> pd.DataFrame: 
 		'''
 		returns a copy of the underlying pandas Dataframe
-		this way _rawData can not be modified externally
+		this way _rawData can not be modified externally.
+		If parameter copy is False returns a reference to it,
+		to avoid copying large series when only reading is needed
 		'''
 		df = self._rawData
-		return df.copy()
+		if copy: return df.copy()
+		else:    return df
 
 	def __str__(self):
 		'''called by print'''
 		return str(self._rawData)
 
 
+	'''
+	Persistence
+	'''
+	def save(self, fn:str) -> None:
+		'''
+		Save DataSeries in a columnar binary file:
+
+			magic (8 bytes) | header length (uint64) | json header | column buffers
+
+		The header has the class name, number of rows, index and columns
+		names, types and offsets, and the minmax scaler state, if scaled.
+		Each column, and the index, is stored as its raw numpy buffer,
+		aligned to 64 bytes, so it can be memory mapped by load().
+
+		Supported types are numeric, bool, datetime64 (with or without time zone)
+		and object columns with strings only (stored as fixed width unicode),
+		or missing values (NaN or None), kept in a mask after the strings.
+		Raises TypeError for other column types
+		'''
+		df = self._rawData
+		buffers = []
+		header  = {'class': type(self).__name__, 'rows': len(df),
+				   'scaler': self.getScalerState(), 'columns': []}
+
+		idx = df.index
+		if isinstance(idx, pd.RangeIndex):
+			header['index'] = {'kind': 'range', 'name': idx.name,
+							   'start': int(idx.start), 'stop': int(idx.stop), 'step': int(idx.step)}
+		else:
+			desc, arr = DataSeries._columnBuffer(idx, 'index')
+			header['index'] = dict(desc, kind='array', name=idx.name)
+			buffers.append(arr)
+
+		for c in df.columns:
+			desc, arr = DataSeries._columnBuffer(df[c], c)
+			header['columns'].append(dict(desc, name=c))
+			buffers.append(arr)
+
+		#set offsets, need header length, which depends on offsets digits,
+		#so reserve offsets with a fixed number of digits
+		descs = ([header['index']] if header['index']['kind'] == 'array' else []) + header['columns']
+		for d in descs: d['offset'] = 10**15
+		headerLen = len(json.dumps(header).encode())
+		offset = DataSeries._align(len(DataSeries._fileMagic) + 8 + headerLen)
+		for d, arr in zip(descs, buffers):
+			d['offset'] = offset
+			offset = DataSeries._align(offset + arr.nbytes)
+		hdr = json.dumps(header).encode()
+		hdr += b' ' * (headerLen - len(hdr))
+
+		with open(fn, 'wb') as fp:
+			fp.write(DataSeries._fileMagic)
+			fp.write(struct.pack('<Q', headerLen))
+			fp.write(hdr)
+			for d, arr in zip(descs, buffers):
+				fp.write(b'\0' * (d['offset'] - fp.tell()))
+				fp.write(arr.view(np.uint8).data)
+
+	@classmethod
+	def load(cls, fn:str, mmap:bool=False) -> 'DataSeries':
+		'''
+		Factory method to create DataSeries, or its subclasses' objects, from a file
+		written by save().
+		If called from DataSeries the subclass is the one saved in the file.
+
+		mmap: if True numeric, bool and datetime columns are backed by numpy.memmap,
+		      so no data is read until accessed and several processes share the same
+		      page cache. The map is copy-on-write: changes are only in memory.
+		      String columns and time zone columns are always read to memory
+		'''
+		with open(fn, 'rb') as fp:
+			magic = fp.read(len(DataSeries._fileMagic))
+			if magic != DataSeries._fileMagic:
+				raise TypeError('Not a DataSeries file: {}'.format(fn))
+			headerLen, = struct.unpack('<Q', fp.read(8))
+			header = json.loads(fp.read(headerLen).decode())
+
+		if cls is DataSeries:
+			cls = DataSeries._subclass(header['class'])
+
+		rows = header['rows']
+		buf  = np.memmap(fn, dtype=np.uint8, mode='c') if mmap else None
+		
+		def read(d:dict) -> Any:
+			dtype = np.dtype(d['dtype'])
+			if buf is not None:
+				arr = buf[d['offset']:d['offset'] + rows*dtype.itemsize].view(dtype)
+			else:
+				arr = np.fromfile(fn, dtype=dtype, count=rows, offset=d['offset'])
+			missing = None
+			if 'missing' in d:
+				missing = np.fromfile(fn, dtype=np.bool_, count=rows, offset=d['offset'] + rows*dtype.itemsize)
+			return DataSeries._columnFromBuffer(d, arr, missing)
+
+		hidx = header['index']
+		if hidx['kind'] == 'range':
+			idx = pd.RangeIndex(hidx['start'], hidx['stop'], hidx['step'], name=hidx['name'])
+		else:
+			idx = pd.Index(read(hidx), name=hidx['name'], copy=False)
+
+		cols = [d['name'] for d in header['columns']]
+		data = {d['name']: read(d) for d in header['columns']}
+		#dict of arrays, with copy=False, keeps each column in its own buffer
+		df = pd.DataFrame(data, index=idx, columns=cols, copy=False)
+
+		obj = cls._rawFromDataFrame(df, copy=False)
+		obj.setScalerState(header['scaler'])
+		return obj
+
+	@staticmethod
+	def _align(offset:int) -> int:
+		'''returns offset rounded up to file format alignment'''
+		a = DataSeries._fileAlign
+		return (offset + a - 1) // a * a
+
+	@staticmethod
+	def _columnBuffer(col:Any, name:Any) -> Tuple[dict, np.ndarray]:
+		'''
+		returns the description of a column (or index) and the contiguous
+		numpy array to store it, see save()
+		'''
+		desc : dict = {'tz': None}
+		dtype = col.dtype
+		if isinstance(dtype, pd.DatetimeTZDtype):
+			desc['tz'] = str(dtype.tz)
+			arr = np.asarray(col.tz_convert('UTC').tz_localize(None) if isinstance(col, pd.Index) \
+							 else col.dt.tz_convert('UTC').dt.tz_localize(None))
+		elif dtype == object:
+			if pd.api.types.infer_dtype(col, skipna=True) not in ('string', 'empty'):
+				raise TypeError('Column {} type cannot be saved: only strings allowed in object columns'.format(name))
+			values  = np.asarray(col, dtype=object)
+			missing = np.asarray(pd.isna(values), dtype=np.bool_)
+			if not missing.any():
+				arr = values.astype('U')
+			else:
+				#missing as '', and the mask of missing values after the strings
+				desc['missing'] = 'None' if all(v is None for v in values[missing]) else 'nan'
+				values = values.copy()
+				values[missing] = ''
+				strs = values.astype('U')
+				desc['dtype'] = strs.dtype.str
+				return desc, np.concatenate((strs.view(np.uint8), missing.view(np.uint8)))
+		elif isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+			arr = np.asarray(col)
+		else:
+			raise TypeError('Column {} type cannot be saved: {}'.format(name, dtype))
+
+		desc['dtype'] = arr.dtype.str
+		return desc, np.ascontiguousarray(arr)
+
+	@staticmethod
+	def _columnFromBuffer(desc:dict, arr:np.ndarray, missing:np.ndarray=None) -> Any:
+		'''
+		returns column (or index) values from its buffer, as saved by _columnBuffer(),
+		missing is the mask of missing values of string columns, if any
+		'''
+		if arr.dtype.kind == 'U':
+			values = arr.astype(object)
+			if missing is not None:
+				values[missing] = None if desc['missing'] == 'None' else np.nan
+			return values
+		if desc['tz'] is not None:
+			return pd.DatetimeIndex(arr).tz_localize('UTC').tz_convert(desc['tz'])
+		return arr
+
+	@staticmethod
+	def _subclass(name:str) -> type:
+		'''returns DataSeries concrete subclass with name'''
+		pending = DataSeries.__subclasses__()
+		while pending:
+			sub = pending.pop()
+			if sub.__name__ == name: return sub
+			pending.extend(sub.__subclasses__())
+		raise TypeError('Unknown DataSeries subclass: {}'.format(name))
+
+
 	
 	'''
 	Info 
@@ -314,17 +661,57 @@ class DataSeries(IDataSeries, Base):
 		if not isinstance(other, DataSeries):
 			raise TypeError("DataSeries subclass expected")
 		#Note: pandas.testing.assert_frame_equal() gives more control on how equal are
-		return self._rawData.equals(other.toDataFrame())
+		#compare with other _rawData directly, toDataFrame() would copy it
+		return self._rawData.equals(other._rawData)
 	
 	def bounded(self, min:float, max:float) -> bool:
 		'''
 		returns True if all numeric columns fave values between min and max (included)
+		NaN values are not bounded.
+
+		Checks each numeric column buffer, in blocks of _boundsBlock values,
+		and returns as soon as a block is out of bounds
+
+		PRE: min < max
+		'''
+		for c in self.numericColumnNames():
+			col = self._rawData[c].to_numpy()
+			blockSize = type(self)._boundsBlock
+			for i in range(0, len(col), blockSize):
+				block = col[i:i+blockSize]
+				#min()/max() propagate NaN, which compares False
+				if not (block.min() >= min and block.max() <= max):
+					return False
+		return True
 
-		PRE: min > max
+	def boundsCheck(self, min:float, max:float) -> dict:
 		'''
-		cols = self.numericColumnNames() #Not needed: .tolist(), cause is an Index
-		b = self._rawData[cols].applymap(lambda x: (x>=min) & (x<=max))
-		return all(b.values.flatten())
+		returns a dict with a report of bounds on numeric columns:
+
+			'bounded':     True if all values are between min and max (included)
+			'min', 'max':  pandas Series with min and max of each column (NaN skipped)
+			'violations':  number of values not between min and max (NaN included)
+			'first':       index of first row with a value out of bounds, or None
+
+		PRE: min < max
+		'''
+		cols = self.numericColumnNames()
+		n    = len(self._rawData)
+		violations = 0
+		first      = n
+		for c in cols:
+			col = self._rawData[c].to_numpy()
+			out = ~((col >= min) & (col <= max))
+			count = int(np.count_nonzero(out))
+			violations += count
+			if count > 0 and int(out.argmax()) < first:
+				first = int(out.argmax())
+
+		return {'bounded':    violations == 0,
+				'min':        pd.Series([self._rawData[c].min() for c in cols], index=cols, dtype=np.float64),
+				'max':        pd.Series([self._rawData[c].max() for c in cols], index=cols, dtype=np.float64),
+				'violations': violations,
+				'first':      self._rawData.index[first] if violations > 0 else None}
 
 	
 	'''
@@ -359,6 +746,74 @@ class DataSeries(IDataSeries, Base):
 			self._rawData[cols] = self._scaler.inverse_transform(self._rawData[cols])
 		else:
 			raise TypeError ('Object not previously scaled with minmaxScale()')
+
+	def minmaxAppend(self, data:Any) -> None:
+		'''
+		Append rows, not scaled, to a DataSeries scaled with minmaxScale()
+		scaling them with the same scaler, in place.
+
+		data: pandas DataFrame or DataSeries with the same columns,
+		      or a list of them, to append many batches at once
+
+		The scaler min and max of each numeric column are updated incrementally
+		with the new rows only, and only the new rows are scaled, in O(rows) time.
+		If min or max changed, the rows already scaled are also mapped to the new range,
+		in O(n) time. Appending the rows copies the series (pandas concat), also
+		in O(n) time, so append batches in a list, to copy the series only once.
+		'''
+		if self._scaler is None:
+			raise TypeError ('Object not previously scaled with minmaxScale()')
+		if isinstance(data, list):
+			data = pd.concat([d._rawData if isinstance(d, DataSeries) else d for d in data])
+		if isinstance(data, DataSeries): data = data._rawData
+
+		sc = self._scaler
+		cols = self._rawData._get_numeric_data().columns #Not needed: .tolist()
+		oldScale, oldMin = sc.scale_.copy(), sc.min_.copy()
+		sc.partial_fit(data[cols])
+
+		#scaled x = raw x * scale + min, map old scaled values to new range
+		if not (np.array_equal(oldScale, sc.scale_) and np.array_equal(oldMin, sc.min_)):
+			a = sc.scale_ / oldScale
+			self._rawData[cols] = self._rawData[cols].to_numpy() * a + (sc.min_ - oldMin * a)
+
+		new = data.copy()
+		new[cols] = sc.transform(data[cols])
+		self._rawData = pd.concat([self._rawData, new])
+
+	def getScalerState(self) -> Optional[dict]:
+		'''
+		returns minmax scaler state as a dict that can be serialized to json,
+		or None if not scaled. See setScalerState()
+		'''
+		if self._scaler is None: return None
+		sc = self._scaler
+		state = {'feature_range': list(sc.feature_range),
+				 'n_samples_seen_': int(sc.n_samples_seen_)}
+		for attr in ('data_min_', 'data_max_', 'data_range_', 'scale_', 'min_'):
+			state[attr] = getattr(sc, attr).tolist()
+		if hasattr(sc, 'feature_names_in_'):
+			state['feature_names_in_'] = sc.feature_names_in_.tolist()
+		return state
+
+	def setScalerState(self, state:Optional[dict]) -> None:
+		'''
+		Sets minmax scaler state returned by getScalerState(), possibly
+		from other DataSeries, so it can be unscaled with unMinmaxScale(), 
+		or new rows added with minmaxAppend().
+		If state is None the DataSeries is considered not scaled
+		'''
+		if state is None:
+			self._scaler = None
+			return
+		sc = MinMaxScaler(feature_range=tuple(state['feature_range']))
+		sc.n_samples_seen_ = state['n_samples_seen_']
+		for attr in ('data_min_', 'data_max_', 'data_range_', 'scale_', 'min_'):
+			setattr(sc, attr, np.array(state[attr], dtype=np.float64))
+		sc.n_features_in_ = len(sc.data_min_)
+		if 'feature_names_in_' in state:
+			sc.feature_names_in_ = np.array(state['feature_names_in_'], dtype=object)
+		self._scaler = sc
 	
 	def _rawInterpolate(self, rng) -> None:
 		'''
@@ -373,27 +828,220 @@ class DataSeries(IDataSeries, Base):
 		self._rawData = self._rawData.reindex(rng)
 		self._rawData = self._rawData.interpolate()  #default: method='linear' interpolation
 
+	def interpolateGaps(self, resolution:float, method:str='linear') -> None:
+		'''
+		adds missing samples at given resolution, as interpolate(), but only
+		where there are gaps found with findGaps(). Existing samples are kept, 
+		even if not in the resolution grid, and so are duplicates.
+		Cost of interpolation depends on the number of missing samples, 
+		not on the series length, which is only scanned and copied once.
+
+		method: 'linear'   numeric columns are interpolated between the samples
+		                   before and after the gap, other columns are NaN
+		        'nearest'  all columns get the values of the nearest sample
+		        'previous' all columns get the values of the sample before the gap
 
-	def shuffle(self, sliceLen:int=1) -> 'DataSeries':
+		Index must be sorted with <DataSeries>.sortIndex()
+		Works in place
 		'''
-		shuffles Dataseries in slices of len sleceLen
+		self._rawData = self._rawFillGaps(self._rawData, resolution, method)
+
+	def appendInterpolated(self, data:Any, resolution:float, method:str='linear') -> None:
 		'''
-		
-		r:range = range(0, len(self._rawData), sliceLen)
-		l:int = len(r)
-		rnd = pd.DataFrame([])
-		
-		for _ in range(0, l):
-		    n = random.randint(0,l-1)
-		    part = self._rawData.iloc[n * sliceLen:(n + 1) * sliceLen - 1, :]
-		    rnd = rnd.append(part, ignore_index=True)
+		appends rows in data, a DataFrame or DataSeries sorted with index after
+		the last index of this series, and interpolates only the tail:
+		from the last sample of this series to the end of data.
+		See interpolateGaps()
+		Works in place
+		'''
+		if isinstance(data, DataSeries): data = data._rawData
+		if len(self._rawData) == 0:
+			self._rawData = self._rawFillGaps(data.copy(), resolution, method)
+			return
+		tail = self._rawFillGaps(pd.concat([self._rawData.iloc[-1:], data]), resolution, method)
+		self._rawData = pd.concat([self._rawData, tail.iloc[1:]])
+
+	def _rawFillGaps(self, df:pd.DataFrame, resolution:float, method:str) -> pd.DataFrame:
+		'''returns df with gaps at given resolution filled with method. See interpolateGaps()'''
+		if method not in ('linear', 'nearest', 'previous'):
+			raise RuntimeError('Unknown interpolation method: {}'.format(method))
+		idx  = self._indexAsNumbers(df.index)
+		step = self._resolutionAsNumber(resolution)
+		pos, lengths, _ = DataSeries._scanGaps(idx, step, type(self)._gapsBlock)
+		if len(pos) == 0: return df
+
+		#for each new sample: its gap, position k in gap (1..length),
+		#sample before (prev) and after (nxt) the gap
+		gap  = np.repeat(np.arange(len(pos)), lengths)
+		k    = np.arange(len(gap)) - np.repeat(np.cumsum(lengths) - lengths, lengths) + 1
+		prev = pos[gap]
+		nxt  = prev + 1
+		newIdx = idx[prev] + k * step
+		frac = (newIdx - idx[prev]) / (idx[nxt] - idx[prev])
+
+		if method == 'previous':
+			rows = df.take(prev)
+		elif method == 'nearest':
+			rows = df.take(np.where(frac <= 0.5, prev, nxt))
+		else:
+			rows = pd.DataFrame(np.nan, index=range(len(gap)), columns=df.columns)
+			for c in df._get_numeric_data().columns:
+				col = df[c].to_numpy()
+				if col.dtype.kind not in 'iuf': continue
+				a = col[prev]
+				rows[c] = a + (col[nxt] - a) * frac
+		rows.index = self._numbersAsIndex(newIdx)
+		rows.index.name = df.index.name
+
+		#final positions of existing and new samples, to merge them without sorting
+		inserted = np.zeros(len(df), dtype=np.int64)
+		inserted[nxt[np.r_[True, gap[1:] != gap[:-1]]]] = lengths
+		oldPos = np.arange(len(df)) + np.cumsum(inserted)
+		newPos = oldPos[prev] + k
+		order  = np.empty(len(df) + len(gap), dtype=np.int64)
+		order[oldPos] = np.arange(len(df))
+		order[newPos] = len(df) + np.arange(len(gap))
+		return pd.concat([df, rows]).take(order)
+
+
+	def slidingWindows(self, window:int, horizon:int=1, columns=None, targets=None) -> Tuple[np.ndarray, np.ndarray]:
+		'''
+		returns training pairs (X, Y), as read only strided views over the series values:
+
+			X[i] = rows i        .. i+window-1         of columns, shape (samples, window, len(columns))
+			Y[i] = rows i+window .. i+window+horizon-1 of targets, shape (samples, horizon, len(targets))
+
+			samples = len(self) - window - horizon + 1
+
+		columns, targets: lists of column names, by default all numeric columns
+
+		No window is materialized, so memory does not grow with window length.
+		The views share memory with the series if the columns are consecutive
+		and have the same type, otherwise the selected columns are copied once.
+
+		PRE: window > 0, horizon > 0
+		'''
+		if columns is None: columns = self.numericColumnNames()
+		if targets is None: targets = self.numericColumnNames()
+		vx = self._valuesView(columns)
+		vy = self._valuesView(targets)
+		n  = len(vx)
+		if window < 1 or horizon < 1 or window + horizon > n:
+			raise RuntimeError('window and horizon must be > 0 and window + horizon <= series length')
+
+		#sliding_window_view adds window axis at the end: (samples, columns, window)
+		X = np.lib.stride_tricks.sliding_window_view(vx[:n-horizon], window, axis=0)
+		Y = np.lib.stride_tricks.sliding_window_view(vy[window:], horizon, axis=0)
+		return X.transpose(0, 2, 1), Y.transpose(0, 2, 1)
+
+	def windowBatches(self, window:int, horizon:int=1, batchSize:int=128, columns=None, targets=None,
+					  flatten:bool=False, shuffle:bool=False, rng:np.random.Generator=None,
+					  start:int=0, stop:int=None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+		'''
+		Generator of batches of at most batchSize training pairs from slidingWindows().
+		Only one batch is copied to memory at a time.
+
+		flatten: if True each pair is flattened to (window*len(columns),) and
+		         (horizon*len(targets),), as needed by dense networks (MLP)
+		shuffle: if True pairs are in random order, using numpy random Generator rng
+		start, stop: only pairs start .. stop-1, eg: to split train and validation pairs
+		'''
+		X, Y = self.slidingWindows(window, horizon, columns, targets)
+		start, stop, _ = slice(start, stop).indices(len(X))
+		order = None
+		if shuffle:
+			if rng is None: rng = np.random.default_rng()
+			order = start + rng.permutation(max(stop - start, 0))
+		for i in range(start, stop, batchSize):
+			sel = slice(i, min(i+batchSize, stop)) if order is None else order[i-start:i-start+batchSize]
+			xb, yb = np.ascontiguousarray(X[sel]), np.ascontiguousarray(Y[sel])
+			if flatten:
+				xb, yb = xb.reshape(len(xb), -1), yb.reshape(len(yb), -1)
+			yield xb, yb
+
+	def windowDataset(self, window:int, horizon:int=1, batchSize:int=128, columns=None, targets=None,
+					  flatten:bool=False, shuffle:bool=False, seed:int=None, start:int=0, stop:int=None) -> Any:
+		'''
+		returns a tensorflow tf.data.Dataset with the batches of windowBatches(),
+		prefetched, so batches are prepared while training.
+		Needs tensorflow installed.
+		seed: seed of the shuffle random generator, a different order in each epoch
+		'''
+		#tensorflow is only needed here, not to use DataSeries
+		import tensorflow as tf
+		X, Y = self.slidingWindows(window, horizon, columns, targets)
+		xshape = (None, X.shape[1]*X.shape[2]) if flatten else (None,) + X.shape[1:]
+		yshape = (None, Y.shape[1]*Y.shape[2]) if flatten else (None,) + Y.shape[1:]
+		rng = np.random.default_rng(seed)
+		ds = tf.data.Dataset.from_generator(
+				lambda: self.windowBatches(window, horizon, batchSize, columns, targets, flatten, shuffle, rng, start, stop),
+				output_signature=(tf.TensorSpec(shape=xshape, dtype=X.dtype), tf.TensorSpec(shape=yshape, dtype=Y.dtype)))
+		return ds.prefetch(tf.data.AUTOTUNE)
+
+	def _valuesView(self, columns) -> np.ndarray:
+		'''
+		returns values of columns as a 2D array (rows, columns).
+		It is a view if columns are consecutive in _rawData and have the same type
+		'''
+		pos = self._rawData.columns.get_indexer(columns)
+		if (pos < 0).any():
+			raise KeyError('Unknown columns: {}'.format(list(np.asarray(columns)[pos < 0])))
+		if len(pos) > 0 and (np.diff(pos) == 1).all():
+			return self._rawData.iloc[:, pos[0]:pos[-1]+1].to_numpy()
+		return self._rawData.iloc[:, pos].to_numpy()
+
+	def shuffle(self, sliceLen:int=1, replace:bool=True, rng:np.random.Generator=None) -> 'DataSeries':
+		'''
+		shuffles Dataseries in slices of len sliceLen
+
+		replace: if True slices are drawn with replacement (the original behaviour),
+		         so some slices may repeat and others be missing.
+		         If False slices are permuted, so every row appears exactly once
+		rng:     numpy random Generator, to make shuffles reproducible.
+		         If None a new one is created, seeded from the OS
+
+		The last slice may be shorter than sliceLen if len(self) is not a multiple of it.
+		All the slices are selected as a single index array and rows are gathered
+		with one take(), so cost and memory are linear in the output size.
+		'''
+		idx = DataSeries.shuffleIndexes(len(self._rawData), sliceLen, replace, rng)
+		rnd = self._rawData.take(idx)
 
 		begin = self._rawData.index[0]
-		idx = pd.date_range(start=begin, periods=len(rnd), freq='T')
-		rnd = rnd.set_index(idx)
+		rnd.index = pd.date_range(start=begin, periods=len(rnd), freq='T')
 		
-		obj = type(self)._rawFromDataFrame(rnd, copy=True)
+		#take() already returns a new DataFrame, no need to copy again
+		obj = type(self)._rawFromDataFrame(rnd, copy=False)
 		return obj
 
+	@staticmethod
+	def shuffleIndexes(samples:int, sliceLen:int=1, replace:bool=True,
+					   rng:np.random.Generator=None) -> np.ndarray:
+		'''
+		returns an array with the row positions of samples rows shuffled
+		in slices of len sliceLen (the last slice may be shorter).
+
+		replace: if True slices are drawn with replacement, else permuted
+		rng:     numpy random Generator, if None a new one is created
+
+		PRE: sliceLen > 0
+		'''
+		if sliceLen < 1:
+			raise RuntimeError('sliceLen must be > 0')
+		if rng is None: rng = np.random.default_rng()
+
+		nslices = -(-samples // sliceLen)  #ceil
+		if replace: order = rng.integers(0, nslices, size=nslices)
+		else:       order = rng.permutation(nslices)
+
+		#slice starts broadcast against offsets inside a slice
+		idx = (order * sliceLen)[:, None] + np.arange(sliceLen)
+		idx = idx.ravel()
+		#drop positions past the end, only the last (shorter) slice has them
+		if samples % sliceLen != 0:
+			idx = idx[idx < samples]
+		return idx
 
 
+from hdlib.time.instrument import instrumentModule
+instrumentModule(__name__)
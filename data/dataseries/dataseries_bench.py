@@ -0,0 +1,164 @@
+'''
+Benchmarks of DataSeries hot paths
+
+Times and peak memory of the main DataSeries operations, on synthetic
+time series with 10K, 1M and 10M rows (5 numeric columns, one string
+column and 0.1% missing samples).
+Results are printed as a table and can be saved as json, to be compared
+with a previous run to catch regressions:
+
+	python dataseries_bench.py --out base.json
+	python dataseries_bench.py --compare base.json
+
+Time is the best of --repeat runs. Peak memory is measured with tracemalloc
+in a separate run, since tracing slows down execution.
+A case is a regression if time or peak memory are more than --threshold
+times the compared ones (and at least 1 ms or 1 MB more).
+
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+from hdlib.data.dataseries.timeseries import TimeSeries
+from hdlib.time.stopwatch import Stopwatch
+from typing import Callable, List, Tuple, Any
+import argparse, json, os, platform, sys, tempfile, tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sizes      : List[int] = [10000, 1000000, 10000000]
+resolution : float     = 60
+columns    : List[str] = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def makeSeries(rows:int, seed:int=0) -> TimeSeries:
+	'''returns TimeSeries with rows samples, one per minute, and 0.1% missing'''
+	rng = np.random.default_rng(seed)
+	keep = rng.random(rows + rows//100 + 10) >= 0.001
+	keep = np.flatnonzero(keep)[:rows]
+	tr = pd.date_range('2019-1-1', periods=keep[-1]+1, freq='T')[keep]
+	df = pd.DataFrame(rng.random((rows, len(columns))) * 1000, columns=columns)
+	df['Symbol'] = 'BTCUSD'
+	return TimeSeries.fromDataFrame(df, tr, copy=False)
+
+def makeCSV(ts:TimeSeries, fn:str) -> List[str]:
+	'''writes ts to csv file fn, with date column, returns column names'''
+	df = ts.toDataFrame(copy=False)
+	df.to_csv(fn, header=False, date_format='%Y-%m-%d %H:%M:%S', index_label='Date')
+	return ['Date'] + list(df.columns)
+
+def cases(ts:TimeSeries, csv:str, names:List[str]) -> List[Tuple[str, Callable[[], Any], Callable[[Any], Any]]]:
+	'''
+	returns the benchmark cases as (name, setup, run).
+	setup() is not timed, its result is passed to run()
+	'''
+	df = ts.toDataFrame(copy=False)
+	begin, end = ts.beginEndIndex()
+	mid = begin + (end - begin) / 2
+	n = len(ts)
+	def scaled() -> TimeSeries:
+		s = ts.copy(); s.minmaxScale(); return s
+	return [
+		('fromCSV',         lambda: None, lambda _: TimeSeries.fromCSV(csv, names, 'Date')),
+		('fromCSV chunked', lambda: None, lambda _: TimeSeries.fromCSV(csv, names, 'Date', chunkSize=1<<18)),
+		('fromDataFrame',   lambda: None, lambda _: TimeSeries.fromDataFrame(df)),
+		('fromDataFrame view', lambda: None, lambda _: TimeSeries.fromDataFrame(df, copy=False)),
+		('loc slice',       lambda: None, lambda _: ts.loc[begin:mid]),
+		('iloc slice',      lambda: None, lambda _: ts.iloc[n//4:3*n//4]),
+		('[] slice',        lambda: None, lambda _: ts[begin:mid]),
+		('copy',            lambda: None, lambda _: ts.copy()),
+		('findMissing',     lambda: None, lambda _: ts.findMissing(resolution)),
+		('findGaps',        lambda: None, lambda _: ts.findGaps(resolution)),
+		('interpolate',     ts.copy,      lambda s: s.interpolate(resolution)),
+		('interpolateGaps', ts.copy,      lambda s: s.interpolateGaps(resolution)),
+		('minmaxScale',     ts.copy,      lambda s: s.minmaxScale()),
+		('unMinmaxScale',   scaled,       lambda s: s.unMinmaxScale()),
+		('shuffle',         lambda: None, lambda _: ts.shuffle(60, rng=np.random.default_rng(0))),
+		('bounded',         lambda: None, lambda _: ts.bounded(0, 1000)),
+	]
+
+def measure(setup:Callable[[], Any], run:Callable[[Any], Any], repeat:int) -> Tuple[float, int]:
+	'''returns best time in seconds of repeat runs, and peak memory in bytes'''
+	chrono = Stopwatch()
+	best = float('inf')
+	for _ in range(repeat):
+		arg = setup()
+		chrono.reset()
+		run(arg)
+		best = min(best, chrono.watch())
+		del arg
+
+	arg = setup()
+	tracemalloc.start()
+	run(arg)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return best, peak
+
+def bench(sizes:List[int], repeat:int, only:List[str]=None) -> dict:
+	'''runs benchmarks, returns results dict, as saved in json'''
+	results = []
+	with tempfile.TemporaryDirectory() as tmp:
+		for rows in sizes:
+			ts  = makeSeries(rows)
+			csv = os.path.join(tmp, 'bench{}.csv'.format(rows))
+			names = makeCSV(ts, csv)
+			for name, setup, run in cases(ts, csv, names):
+				if only and name not in only: continue
+				t, peak = measure(setup, run, repeat)
+				results.append({'case': name, 'rows': rows, 'time': t, 'peak': peak})
+				print(row(results[-1]), flush=True)
+			os.remove(csv)
+	return {'meta': {'date': datetime.now().isoformat(timespec='seconds'),
+					 'python': platform.python_version(), 'numpy': np.__version__,
+					 'pandas': pd.__version__, 'machine': platform.machine(),
+					 'repeat': repeat},
+			'results': results}
+
+def row(r:dict, base:dict=None) -> str:
+	'''returns a result formatted as a table row, with ratios to base if given'''
+	out = '{:<20} {:>10} {:>12.6f} {:>12.1f}'.format(r['case'], r['rows'], r['time'], r['peak']/2**20)
+	if base is not None:
+		out += ' {:>8.2f} {:>8.2f}'.format(r['time']/max(base['time'], 1e-9), (r['peak']+1)/(base['peak']+1))
+	return out
+
+def compare(results:dict, baseline:dict, threshold:float) -> bool:
+	'''prints results with time and peak ratios to baseline, returns True if no regressions'''
+	base = {(r['case'], r['rows']): r for r in baseline['results']}
+	ok = True
+	print('\n{:<20} {:>10} {:>12} {:>12} {:>8} {:>8}'.format('case', 'rows', 'time (s)', 'peak (MB)', 'time x', 'peak x'))
+	for r in results['results']:
+		b = base.get((r['case'], r['rows']))
+		if b is None:
+			print(row(r) + '   (new)')
+			continue
+		line = row(r, b)
+		#ignore differences below 1 ms and 1 MB, which are noise
+		if r['time'] > b['time'] * threshold + 1e-3 or r['peak'] > b['peak'] * threshold + 2**20:
+			line += '   REGRESSION'
+			ok = False
+		print(line)
+	return ok
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description='DataSeries benchmarks')
+	parser.add_argument('--sizes', type=int, nargs='+', default=sizes, help='series rows')
+	parser.add_argument('--repeat', type=int, default=3, help='runs per case, best time is kept')
+	parser.add_argument('--cases', nargs='+', help='run only these cases')
+	parser.add_argument('--out', help='save results to json file')
+	parser.add_argument('--compare', help='json file with results to compare')
+	parser.add_argument('--threshold', type=float, default=1.2,
+						help='ratio to compared results that is a regression')
+	args = parser.parse_args()
+
+	print('{:<20} {:>10} {:>12} {:>12}'.format('case', 'rows', 'time (s)', 'peak (MB)'))
+	results = bench(args.sizes, args.repeat, args.cases)
+	if args.out:
+		with open(args.out, 'w') as fp:
+			json.dump(results, fp, indent=1)
+	if args.compare:
+		with open(args.compare) as fp:
+			baseline = json.load(fp)
+		if not compare(results, baseline, args.threshold):
+			sys.exit(1)
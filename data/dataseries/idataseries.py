@@ -55,8 +55,9 @@ class IDataSeries(ABC):
 		pass
 
 	@abstractmethod
-	def shuffle(self, sliceLen:int = 1) -> 'DataSeries':
+	def shuffle(self, sliceLen:int = 1, replace:bool = True, rng = None) -> 'DataSeries':
 		"""
-		shuffles Dataseries in slices of len sleceLen
+		shuffles Dataseries in slices of len sliceLen,
+		with or without replacement of slices, using numpy random Generator rng
 		"""
 		pass
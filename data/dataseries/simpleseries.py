@@ -4,7 +4,7 @@ Manipulate multiple series
 v0.1 feb 2019
 hdaniel@ualg.pt
 '''
-from typing import ClassVar, Any, Tuple, Type, List
+from typing import ClassVar, Any, Tuple, Type, List, Iterator
 import csv
 import numpy as np
 import pandas as pd
@@ -37,17 +37,35 @@ class SimpleSeries(DataSeries):
 		
 	
 	@classmethod
-	def fromCSV(cls, datafile:str, columns) -> 'SimpleSeries':
+	def fromCSV(cls, datafile:str, columns, dtype=None, chunkSize:int=None) -> 'SimpleSeries':
 		'''
 		Factory method to create SimpleSeries object with values
 		read from csv file with data series
 
 		columns:    List with the names of columns
+		dtype:      None to infer, a type or a dict {column name: type}
+		chunkSize:  if not None the file is read in chunks of chunkSize rows,
+		            which are stitched in one pre-allocated DataFrame.
+		            Peak memory is the series plus one chunk
 		'''
+		if chunkSize is not None:
+			rows = cls._rawCountLines(datafile)
+			return cls._rawStitchChunks(cls._rawReadCSVChunks(datafile, columns, chunkSize, dtype), rows) #type: ignore
+
 		obj = cls()
-		obj._rawData = pd.read_csv(datafile, names=columns, comment=cls._comment)
+		obj._rawData = pd.read_csv(datafile, names=columns, comment=cls._comment, dtype=dtype)
 		return obj
 
+	@classmethod
+	def fromCSVChunks(cls, datafile:str, columns, chunkSize:int, dtype=None) -> Iterator['SimpleSeries']:
+		'''
+		Generator of SimpleSeries objects, each with at most chunkSize rows,
+		read from csv file with data series.
+		Only one chunk is in memory at a time, so files larger than
+		available memory can be processed
+		'''
+		for df in cls._rawReadCSVChunks(datafile, columns, chunkSize, dtype):
+			yield cls.fromDataFrame(df, copy=False)
 
 	@classmethod
 	#Not needed in the present implementation since just call super._rawRandom()
@@ -109,3 +127,7 @@ class SimpleSeries(DataSeries):
 		rng = SimpleSeries.createNumericIndex(begin, end, resolution)
 		
 		super()._rawInterpolate(rng)
+
+
+from hdlib.time.instrument import instrumentModule
+instrumentModule(__name__)
@@ -5,6 +5,7 @@ v0.1 feb 2019
 hdaniel@ualg.pt
 '''
 from hdlib.data.dataseries.simpleseries import SimpleSeries
+from hdlib.data.dataseries.dataseries import DataSeries
 
 ##############
 # Unit tests #
@@ -12,7 +13,9 @@ from hdlib.data.dataseries.simpleseries import SimpleSeries
 import unittest
 from typing import ClassVar, Any, Tuple, Type, List
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+import os, tempfile, json
 
 plot     : bool = False
 seriesFN : str  = "unittest0.csv"
@@ -109,6 +112,39 @@ class TestSimpleSeries(unittest.TestCase):
 		ds = SimpleSeries.random(min, max, 10, ['A', 'B', 'Cr'])
 		self.assertTrue(ds.bounded(min, max))
 
+	def testFromCSVChunks0(self) -> None:
+		ds0 = SimpleSeries.fromCSV(seriesFN, allColumNames, chunkSize=3)
+		self.assertEqual(ds0, type(self).marketDataSS)
+		chunks = list(SimpleSeries.fromCSVChunks(seriesFN, allColumNames, 4))
+		self.assertEqual([len(c) for c in chunks], [4, 4, 2])
+		self.assertEqual(chunks[2].iat[0, 3], type(self).marketDataSS.iat[8, 3])
+
+	def testFromCSVChunks1(self) -> None:
+		#chunks with other column types, only widening types are kept
+		chunks = [pd.DataFrame({'A': [0.5, 1.5], 'B': [1, 2]}),
+				  pd.DataFrame({'A': [2, 3], 'B': [3, 4]}),
+				  pd.DataFrame({'A': [4.5], 'B': [5.5]})]
+		ds0 = SimpleSeries._rawStitchChunks(iter(chunks), 5)
+		df0 = ds0.toDataFrame()
+		self.assertEqual(list(df0.dtypes), [np.float64, np.float64])
+		self.assertEqual(df0['A'].tolist(), [0.5, 1.5, 2.0, 3.0, 4.5])
+		self.assertEqual(df0['B'].tolist(), [1.0, 2.0, 3.0, 4.0, 5.5])
+
+	def testSaveLoad0(self) -> None:
+		ds0 = type(self).marketDataSS.copy()
+		ds0.minmaxScale()
+		with tempfile.TemporaryDirectory() as tmp:
+			fn = os.path.join(tmp, 'ds.hdds')
+			ds0.save(fn)
+			ds1 = SimpleSeries.load(fn, mmap=True)
+			self.assertEqual(ds0, ds1)
+			self.assertTrue(isinstance(ds1.toDataFrame(copy=False).index, pd.RangeIndex))
+			#scaler state is restored
+			ds1.unMinmaxScale()
+			ds0.unMinmaxScale()
+			self.assertEqual(ds0, ds1)
+			del ds1
+
 	''' Operators '''
 	def testEqual0(self) -> None:
 		ds = type(self).marketDataSS.copy()
@@ -137,6 +173,33 @@ class TestSimpleSeries(unittest.TestCase):
 		self.assertFalse(ds0.bounded(-23.0, 10.23))
 		self.assertFalse(ds0.bounded(-23.2, 10.0))
 		self.assertFalse(ds0.bounded(-22, 10.0))
+		#out of bounds value in the last block
+		SimpleSeries._boundsBlock = 2
+		try:
+			self.assertTrue(ds0.bounded(-23.1, 10.23))
+			ds0.iat[2, 2] = 11
+			self.assertFalse(ds0.bounded(-23.1, 10.23))
+		finally:
+			del SimpleSeries._boundsBlock
+		self.assertEqual(DataSeries._boundsBlock, SimpleSeries._boundsBlock)
+
+	def testBoundsCheck0(self) -> None:
+		df0 = pd.DataFrame([[0,1,10.23,'a'],[2,3,-23.1,'b'],[4,5,np.nan,'c']], columns=['A', 'B', 'C', 'D'])
+		ds0 = SimpleSeries.fromDataFrame(df0)
+		self.assertFalse(ds0.bounded(-23.1, 10.23))
+		r = ds0.boundsCheck(-23.1, 10.23)
+		self.assertFalse(r['bounded'])
+		self.assertEqual(r['violations'], 1)
+		self.assertEqual(r['first'], 2)
+		self.assertEqual(list(r['min']), [0, 1, -23.1])
+		self.assertEqual(list(r['max']), [4, 5, 10.23])
+		r = ds0.boundsCheck(0, 4)
+		self.assertEqual(r['violations'], 4)
+		self.assertEqual(r['first'], 0)
+		ds0.iat[2, 2] = 0
+		self.assertTrue(ds0.bounded(-23.1, 10.23))
+		self.assertTrue(ds0.boundsCheck(-23.1, 10.23)['bounded'])
+		self.assertIsNone(ds0.boundsCheck(-23.1, 10.23)['first'])
 
 	''' Info '''
 	def testColumnNames0(self) -> None:
@@ -186,6 +249,16 @@ class TestSimpleSeries(unittest.TestCase):
 			plt.show()
 		
 
+	def testFindGaps0(self) -> None:
+		df0 = pd.DataFrame({'A': range(6)}, index=[0, 0.5, 2, 2.5, 2.5, 4.1])
+		ds0 = SimpleSeries.fromDataFrame(df0)
+		gaps, dups = ds0.findGaps(0.5)
+		self.assertEqual(list(gaps['start']), [1, 3])
+		self.assertEqual(list(gaps['length']), [2, 2])
+		self.assertEqual(list(dups), [2.5])
+		gaps, dups = SimpleSeries.fromDataFrame(df0.iloc[:2]).findGaps(0.5)
+		self.assertEqual((len(gaps), len(dups)), (0, 0))
+
 	def testMimmaxScale0(self) -> None:
 		ds0 = type(self).marketDataSS
 		ds1 = ds0.copy()
@@ -221,6 +294,87 @@ class TestSimpleSeries(unittest.TestCase):
 		self.assertEqual (max, 0.0)
 
 
+	def testMinmaxAppend0(self) -> None:
+		ds0 = type(self).marketDataSS
+		cols = ds0.numericColumnNames()
+		#scale all at once
+		ds1 = ds0.copy()
+		ds1.minmaxScale()
+		#scale first rows and append the others incrementally, in 2 batches
+		ds2 = ds0.iloc[:4].copy()
+		with self.assertRaises(TypeError):
+			ds2.minmaxAppend(ds0.iloc[4:7])
+		ds2.minmaxScale()
+		ds2.minmaxAppend(ds0.iloc[4:7])
+		ds2.minmaxAppend(ds0.toDataFrame().iloc[7:])
+		self.assertEqual(len(ds2), len(ds0))
+		diff = ds1.toDataFrame()[cols] - ds2.toDataFrame()[cols]
+		self.assertAlmostEqual(abs(diff.values).max(), 0.0, 9)
+		#unscale gets original values
+		ds2.unMinmaxScale()
+		self.assertTrue(np.allclose(ds0.toDataFrame()[cols].values, ds2.toDataFrame()[cols].values, rtol=1e-12))
+		#batches in a list
+		ds3 = ds0.iloc[:4].copy()
+		ds3.minmaxScale()
+		ds3.minmaxAppend([ds0.iloc[4:7], ds0.toDataFrame().iloc[7:]])
+		self.assertEqual(len(ds3), len(ds0))
+		diff = ds1.toDataFrame()[cols] - ds3.toDataFrame()[cols]
+		self.assertAlmostEqual(abs(diff.values).max(), 0.0, 9)
+
+	def testScalerState0(self) -> None:
+		ds0 = type(self).marketDataSS.copy()
+		ds0.minmaxScale()
+		state = json.loads(json.dumps(ds0.getScalerState()))
+		#restore state in other series
+		ds1 = ds0.copy()
+		ds1.setScalerState(state)
+		ds1.unMinmaxScale()
+		cols = ds1.numericColumnNames()
+		self.assertTrue(np.allclose(type(self).marketDataSS.toDataFrame()[cols].values, 
+									ds1.toDataFrame()[cols].values, rtol=1e-12))
+		ds1.setScalerState(None)
+		self.assertIsNone(ds1.getScalerState())
+
+	def testSlidingWindows0(self) -> None:
+		df0 = pd.DataFrame(np.arange(30.).reshape(10, 3), columns=['A', 'B', 'C'])
+		ds0 = SimpleSeries.fromDataFrame(df0, copy=False)
+		X, Y = ds0.slidingWindows(3, 2, columns=['A', 'B'], targets=['C'])
+		self.assertEqual(X.shape, (6, 3, 2))
+		self.assertEqual(Y.shape, (6, 2, 1))
+		self.assertTrue((X[1] == df0[['A', 'B']].values[1:4]).all())
+		self.assertTrue((Y[1, :, 0] == df0['C'].values[4:6]).all())
+		#views, not copies
+		self.assertTrue(np.shares_memory(X, df0.values))
+		self.assertTrue(np.shares_memory(Y, df0.values))
+		self.assertFalse(X.flags.writeable)
+		#not consecutive columns are copied once
+		X, Y = ds0.slidingWindows(3, columns=['A', 'C'])
+		self.assertEqual(X.shape, (7, 3, 2))
+		self.assertTrue((X[-1] == df0[['A', 'C']].values[-4:-1]).all())
+		with self.assertRaises(RuntimeError):
+			ds0.slidingWindows(9, 2)
+
+	def testWindowBatches0(self) -> None:
+		df0 = pd.DataFrame(np.arange(30.).reshape(10, 3), columns=['A', 'B', 'C'])
+		ds0 = SimpleSeries.fromDataFrame(df0, copy=False)
+		X, Y = ds0.slidingWindows(3, 1)
+		batches = list(ds0.windowBatches(3, 1, batchSize=4))
+		self.assertEqual([len(b[0]) for b in batches], [4, 3])
+		self.assertTrue((np.concatenate([b[0] for b in batches]) == X).all())
+		xb, yb = next(ds0.windowBatches(3, 1, batchSize=4, flatten=True))
+		self.assertEqual((xb.shape, yb.shape), ((4, 9), (4, 3)))
+		batches = list(ds0.windowBatches(3, 1, batchSize=4, shuffle=True, rng=np.random.default_rng(0)))
+		xs = np.concatenate([b[0] for b in batches])
+		self.assertEqual(sorted(xs[:, 0, 0]), sorted(X[:, 0, 0]))
+		#range of pairs
+		batches = list(ds0.windowBatches(3, 1, batchSize=4, start=2, stop=-1))
+		self.assertEqual([len(b[0]) for b in batches], [4])
+		self.assertTrue((np.concatenate([b[0] for b in batches]) == X[2:-1]).all())
+		batches = list(ds0.windowBatches(3, 1, batchSize=4, shuffle=True, rng=np.random.default_rng(0), start=5))
+		xs = np.concatenate([b[0] for b in batches])
+		self.assertEqual(sorted(xs[:, 0, 0]), sorted(X[5:, 0, 0]))
+		self.assertEqual(list(ds0.windowBatches(3, 1, shuffle=True, start=7)), [])
+
 #This way only runs if NOT imported!
 if __name__ == "__main__":
 	try:
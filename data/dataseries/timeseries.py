@@ -4,7 +4,7 @@ Manipulate multiple data series together
 v0.1 feb 2019
 hdaniel@ualg.pt
 '''
-from typing import ClassVar, Any, Tuple, List
+from typing import ClassVar, Any, Tuple, List, Iterator, Optional
 import csv
 import pandas as pd
 import numpy as np
@@ -18,6 +18,17 @@ class TimeSeries (DataSeries):
 	Time series manipulation
 	'''
 
+	'''
+	class variables
+	'''
+	#fixed format dates parsing: YYYY-MM-DD HH:MM:SS.mmm
+	_parseBlock  : ClassVar[int] = 1<<18 #dates parsed at a time
+	_parseSeps   : ClassVar[np.ndarray] = np.array([[4, ord('-')], [7, ord('-')], [13, ord(':')],
+													[16, ord(':')], [19, ord('.')]])
+	_parseDigits : ClassVar[np.ndarray] = np.array([0,1,2,3, 5,6, 8,9, 11,12, 14,15, 17,18, 20,21,22])
+	_monthDays   : ClassVar[np.ndarray] = np.array([0, 31,28,31,30,31,30,31,31,30,31,30,31])
+	_cumDays     : ClassVar[np.ndarray] = np.array([0, 0,31,59,90,120,151,181,212,243,273,304,334])
+
 	'''
 	Constructor, copy, converters, and factory methods
 	'''
@@ -32,7 +43,8 @@ class TimeSeries (DataSeries):
 		from a pandas DataFrame and time indexes in timeRange
 		Note: External 'dataframe' object is copied by default.
 			  If parameter copy is False is created a new TimeSeries
-			  with a reference to it.
+			  with a reference to it, even if a timeRange is given,
+			  so slicing with [], loc and iloc returns views, not copies.
 
 		time range format:
 			- None (if dataframe have already a time index)
@@ -42,22 +54,29 @@ class TimeSeries (DataSeries):
 		'''
 		#Use DataSeries to check if it is a DataFrame
 		#this way it is only tested in the upper class
-		ds  = super()._rawFromDataFrame(dataframe, copy)
+		obj = super()._rawFromDataFrame(dataframe, copy)
 
-		#create TimeSeries and add time index
-		obj = cls()
-		obj._rawData = ds.toDataFrame() 
+		#add time index
 		if timeRange is not None:
-			obj._rawData = obj._rawData.set_index(pd.to_datetime(timeRange))
-		return obj
+			#set_index() would copy the data again, so a shallow copy is made,
+			#sharing the data buffers, and only its index is replaced.
+			#This way the external 'dataframe' index is not changed when copy == False
+			if not copy: obj._rawData = obj._rawData.copy(deep=False)
+			obj._rawData.index = pd.to_datetime(timeRange)
+		return obj #type: ignore
 
 	@classmethod
-	def fromCSV(cls, datafile:str, columns, timeRange) -> 'TimeSeries':
+	def fromCSV(cls, datafile:str, columns, timeRange, dtype=None, chunkSize:int=None) -> 'TimeSeries':
 		'''
 		Factory method to create TimeSeries object with values
 		read csv file with time indexes in specified in timeRange
 
 		columns:    List with the names of columns
+		dtype:      None to infer, a type or a dict {column name: type}
+		chunkSize:  if not None the file is read in chunks of chunkSize rows,
+		            which are stitched in one pre-allocated DataFrame.
+		            Peak memory is the series plus one chunk, instead
+		            of the several copies done when reading the whole file
 
 		time range format:
 			- sole string is a column name where time series is
@@ -66,18 +85,32 @@ class TimeSeries (DataSeries):
 			- unix time stamp integer list
 			- datetime64 list
 		'''
+		if chunkSize is not None:
+			rows   = cls._rawCountLines(datafile)
+			chunks = (ts._rawData for ts in cls.fromCSVChunks(datafile, columns, timeRange, chunkSize, dtype))
+			return cls._rawStitchChunks(chunks, rows) #type: ignore
+
 		#create TimeSeries and add time index
 		obj = cls()
-		obj._rawData = pd.read_csv(datafile, names=columns, comment=cls._comment)
-
-		if isinstance(timeRange, str): #is Name of column with date
-			obj._rawData[timeRange] = pd.to_datetime(obj._rawData[timeRange]) #need to be first 
-			obj._rawData = obj._rawData.set_index(timeRange)				  #after being index it is no longer a column
-		else:	#is numeric list
-			obj._rawData = obj._rawData.set_index(pd.to_datetime(timeRange))
-	
+		df  = pd.read_csv(datafile, names=columns, comment=cls._comment, dtype=dtype)
+		obj._rawData = TimeSeries._rawSetTimeIndex(df, timeRange)
 		return obj
 	
+	@classmethod
+	def fromCSVChunks(cls, datafile:str, columns, timeRange, chunkSize:int, dtype=None) -> Iterator['TimeSeries']:
+		'''
+		Generator of TimeSeries objects, each with at most chunkSize rows,
+		read from csv file, with time indexes specified in timeRange,
+		as in fromCSV().
+		Only one chunk is in memory at a time, so files larger than
+		available memory can be processed
+		'''
+		offset = 0
+		for df in cls._rawReadCSVChunks(datafile, columns, chunkSize, dtype):
+			obj = cls()
+			obj._rawData = TimeSeries._rawSetTimeIndex(df, timeRange, offset)
+			offset += len(df)
+			yield obj
 
 	@classmethod
 	def random(cls, min:float, max:float, columns, dateBegin, dateEnd, resolution:float) -> 'TimeSeries':
@@ -99,7 +132,7 @@ class TimeSeries (DataSeries):
 
 		#create TimeSeries and add time index
 		obj = super()._rawRandom(min, max, samples, columns)
-		obj._rawData = obj.toDataFrame().set_index(timeRange)
+		obj._rawData.index = timeRange
 		return obj #type:ignore
 
 
@@ -117,6 +150,87 @@ class TimeSeries (DataSeries):
 		timeRange = pd.date_range(begin, end, freq=freq)
 		return timeRange
 
+	@staticmethod
+	def _rawSetTimeIndex(df:pd.DataFrame, timeRange, offset:int=0) -> pd.DataFrame:
+		'''
+		returns df indexed by timeRange, which is a column name or a list.
+		If it is a list, df rows are at position offset of the list
+		'''
+		if isinstance(timeRange, str): #is Name of column with date
+			df[timeRange] = TimeSeries.parseDateTime(df[timeRange]) #need to be first 
+			return df.set_index(timeRange)	#after being index it is no longer a column
+		else:	#is numeric list
+			return df.set_index(pd.to_datetime(timeRange[offset:offset+len(df)]))
+
+	@staticmethod
+	def parseDateTime(values) -> np.ndarray:
+		'''
+		returns a datetime64[ns] array with the dates in values.
+
+		Strings formatted as YYYY-MM-DD HH:MM:SS.mmm or YYYY-MM-DD HH:MM:SS
+		(date and time may also be separated by 'T') are parsed vectorized
+		in blocks of bytes.
+		Any other format, invalid dates or non string values
+		fall back to pandas.to_datetime()
+		'''
+		arr = np.asarray(values)
+		try:
+			if arr.ndim != 1 or arr.dtype.kind not in 'OSU': raise ValueError
+			#fixed width bytes, itemsize is the largest string
+			b = arr.astype('S')
+		except (ValueError, TypeError, UnicodeEncodeError):
+			return np.asarray(pd.to_datetime(values), dtype='datetime64[ns]')
+
+		width = b.dtype.itemsize
+		if width not in (19, 23) or len(b) == 0:
+			return np.asarray(pd.to_datetime(values), dtype='datetime64[ns]')
+
+		out = np.empty(len(b), dtype=np.int64)
+		for i in range(0, len(b), TimeSeries._parseBlock):
+			ns = TimeSeries._parseDateTimeBlock(b[i:i+TimeSeries._parseBlock], width)
+			if ns is None:
+				return np.asarray(pd.to_datetime(values), dtype='datetime64[ns]')
+			out[i:i+TimeSeries._parseBlock] = ns
+		return out.view('datetime64[ns]')
+
+	@staticmethod
+	def _parseDateTimeBlock(b:np.ndarray, width:int) -> Optional[np.ndarray]:
+		'''
+		returns nanoseconds since epoch of fixed format dates in
+		bytes array b, or None if some date is not in that format
+		'''
+		raw = np.frombuffer(b, dtype=np.uint8).reshape(-1, width)
+		seps = TimeSeries._parseSeps[:4 if width == 19 else 5]
+		if (raw[:, seps[:, 0]] != seps[:, 1]).any(): return None
+		#date and time may be separated by ' ' or 'T'
+		if ((raw[:, 10] != ord(' ')) & (raw[:, 10] != ord('T'))).any(): return None
+		
+		#digits, other chars wrap around to values > 9
+		c = raw - np.uint8(48)
+		if (c[:, TimeSeries._parseDigits[:14 if width == 19 else 17]] > 9).any():
+			return None
+
+		def field(begin:int, end:int) -> np.ndarray:
+			r = c[:, begin].astype(np.int64)
+			for i in range(begin+1, end):
+				r *= 10
+				r += c[:, i]
+			return r
+
+		y, m, d  = field(0, 4), field(5, 7), field(8, 10)
+		h, mi, s = field(11, 13), field(14, 16), field(17, 19)
+		ms = field(20, 23) if width == 23 else 0
+
+		leap = ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+		if ((m < 1) | (m > 12)).any(): return None
+		dim = TimeSeries._monthDays[m] + (leap & (m == 2))
+		if ((d < 1) | (d > dim) | (h > 23) | (mi > 59) | (s > 59)).any(): return None
+
+		#days since epoch, proleptic gregorian calendar
+		yy = y - 1
+		days = yy*365 + yy//4 - yy//100 + yy//400 - 719162 + TimeSeries._cumDays[m] + (d-1) + (leap & (m > 2))
+		return (((days*24 + h)*60 + mi)*60 + s)*1000000000 + ms*1000000
+
 	'''
 	Indexing
 	'''
@@ -128,6 +242,21 @@ class TimeSeries (DataSeries):
 		self._rawData.index = (self._rawData.index + pd.Timedelta(seconds=delta))
 
 
+	def _indexAsNumbers(self, index:pd.Index) -> np.ndarray:
+		'''returns time index as nanoseconds since epoch (UTC), without copying'''
+		return index.asi8
+
+	def _resolutionAsNumber(self, resolution:float) -> float:
+		'''returns resolution in seconds as nanoseconds'''
+		return int(round(resolution * 1e9))
+
+	def _numbersAsIndex(self, values:np.ndarray) -> pd.Index:
+		'''returns time index from nanoseconds since epoch, in the time zone of this series'''
+		idx = pd.DatetimeIndex(values.astype(np.int64).view('datetime64[ns]'))
+		tz  = self._rawData.index.tz
+		if tz is not None: idx = idx.tz_localize('UTC').tz_convert(tz)
+		return idx
+
 	def findExpectedSamples(self, resolution: float) -> int:
 		'''
 		returns the number of samples for a time series sarting at begin
@@ -163,3 +292,7 @@ class TimeSeries (DataSeries):
 		timeRange = TimeSeries.createDateTimeIndex(begin, end, resolution)
 
 		super()._rawInterpolate(timeRange)
+
+
+from hdlib.time.instrument import instrumentModule
+instrumentModule(__name__)
@@ -13,6 +13,10 @@ import unittest
 from typing import ClassVar, Any, Tuple, Type, List
 import pandas as pd
 import matplotlib.pyplot as plt
+import os, tempfile
+import numpy as np
+from unittest import mock
+from hdlib.data.dataseries.dataseries import DataSeries
 
 plot     : bool = False
 seriesFN : str  = "unittest1.csv"
@@ -177,6 +181,112 @@ class TestTimeSeries(unittest.TestCase):
 		self.assertTrue(all(b0.values.flatten()))
 		self.assertTrue(all(b1))	
 
+	def testFromDataFrameView0(self) -> None:
+		df0 = pd.DataFrame(np.arange(20.).reshape(10,2), columns=['A', 'B'])
+		tr  = pd.date_range(start='2018-1-1', periods=10, freq='T')
+		ts  = TimeSeries.fromDataFrame(df0, tr, copy=False)
+		#shares data with df0, but df0 index is not changed
+		self.assertTrue(np.shares_memory(ts.toDataFrame(copy=False)['A'].values, df0['A'].values))
+		self.assertFalse(isinstance(df0.index, pd.DatetimeIndex))
+		#copy=True does not share
+		ts1 = TimeSeries.fromDataFrame(df0, tr)
+		self.assertFalse(np.shares_memory(ts1.toDataFrame(copy=False)['A'].values, df0['A'].values))
+
+	def testSliceView0(self) -> None:
+		ts0 = TimeSeries.fromDataFrame(pd.DataFrame(np.arange(20.).reshape(10,2), columns=['A', 'B']),
+									   pd.date_range(start='2018-1-1', periods=10, freq='T'))
+		buf = ts0.toDataFrame(copy=False)['A'].values
+		for ts1 in (ts0['2018-1-1 00:02':'2018-1-1 00:05'], 
+					ts0.loc['2018-1-1 00:02':'2018-1-1 00:05'],
+					ts0.iloc[2:6]):
+			self.assertEqual(len(ts1), 4)
+			self.assertTrue(np.shares_memory(ts1.toDataFrame(copy=False)['A'].values, buf))
+
+	def testSliceAllocation0(self) -> None:
+		#slicing must not allocate memory proportional to the series size
+		import tracemalloc
+		rows = 1000000
+		ts0 = TimeSeries.fromDataFrame(pd.DataFrame(np.zeros((rows, 2)), columns=['A', 'B']),
+									   pd.date_range(start='2018-1-1', periods=rows, freq='S'), copy=False)
+		tracemalloc.start()
+		ts1 = ts0.iloc[10:rows-10]
+		ts2 = ts0.loc['2018-1-2':'2018-1-5']
+		_, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		self.assertLess(peak, ts0.toDataFrame(copy=False).values.nbytes // 100)
+
+	def testFromCSVChunks0(self) -> None:
+		ts0 = TimeSeries.fromCSV(seriesFN, allColumNames, 'Date')
+		ts1 = TimeSeries.fromCSV(seriesFN, allColumNames, 'Date', chunkSize=7000)
+		self.assertTrue(ts0 == ts1)
+		chunks = list(TimeSeries.fromCSVChunks(seriesFN, allColumNames, 'Date', 10000))
+		self.assertEqual([len(c) for c in chunks], [10000, 10000, 10000, 10000, 810])
+		self.assertEqual(type(chunks[0]), TimeSeries)
+		self.assertEqual(chunks[1].beginEndIndex(), ts0.iloc[10000:20000].beginEndIndex())
+
+	def testFromCSVDtype0(self) -> None:
+		ts = TimeSeries.fromCSV(seriesFN, allColumNames, 'Date', dtype={'Volume': np.float32}, chunkSize=5000)
+		self.assertEqual(ts.toDataFrame(copy=False)['Volume'].dtype, np.float32)
+
+	def testParseDateTime0(self) -> None:
+		dates = ['2019-01-07 15:01:00.123', '2020-02-29T23:59:59.999', '1969-12-31 00:00:00.000']
+		self.assertTrue((TimeSeries.parseDateTime(dates) == pd.to_datetime(dates).values).all())
+		dates = ['2019-01-07 15:01:00', '2000-03-01 00:00:01']
+		self.assertTrue((TimeSeries.parseDateTime(dates) == pd.to_datetime(dates).values).all())
+		#other formats fall back to pandas
+		dates = ['7/1/2019 15:01', '2019-01-07']
+		self.assertTrue((TimeSeries.parseDateTime(dates) == pd.to_datetime(dates).values).all())
+		#invalid dates are not parsed as fixed format
+		with self.assertRaises(ValueError):
+			TimeSeries.parseDateTime(['2019-02-29 15:01:00'])
+
+	def testSaveLoad0(self) -> None:
+		ts0 = type(self).marketDataTS
+		with tempfile.TemporaryDirectory() as tmp:
+			fn = os.path.join(tmp, 'ts.hdds')
+			ts0.save(fn)
+			ts1 = TimeSeries.load(fn)
+			ts2 = TimeSeries.load(fn, mmap=True)
+			ts3 = DataSeries.load(fn, mmap=True)
+			self.assertTrue(ts0 == ts1)
+			self.assertTrue(ts0 == ts2)
+			self.assertEqual(type(ts3), TimeSeries)
+			self.assertTrue(isinstance(ts2.toDataFrame(copy=False)['Open'].values.base, np.memmap))
+			#copy on write, file is not changed
+			ts2.iat[0, 3] = -1
+			self.assertTrue(ts0 == TimeSeries.load(fn, mmap=True))
+			del ts2, ts3
+
+	def testSaveLoad1(self) -> None:
+		df = pd.DataFrame({'A': [1.5, 2.5], 'B': ['x', 'yz']})
+		ts0 = TimeSeries.fromDataFrame(df, pd.date_range('2018-1-1', periods=2, freq='T', tz='Europe/Lisbon'))
+		with tempfile.TemporaryDirectory() as tmp:
+			fn = os.path.join(tmp, 'ts.hdds')
+			ts0.save(fn)
+			self.assertTrue(ts0 == TimeSeries.load(fn, mmap=True))
+			#objects other than strings cannot be saved
+			ts0.iat[0, 1] = 3
+			with self.assertRaises(TypeError):
+				ts0.save(fn)
+			#missing values in string columns
+			ts0.iat[0, 1] = None
+			ts0.save(fn)
+			self.assertTrue(ts0 == TimeSeries.load(fn))
+			with open(fn, 'wb') as fp: fp.write(b'not a series')
+			with self.assertRaises(TypeError):
+				TimeSeries.load(fn)
+
+	def testSaveLoad2(self) -> None:
+		#interpolated samples have missing Symbol
+		ts0 = type(self).marketDataTS.copy()
+		ts0.interpolate(60)
+		self.assertTrue(ts0.toDataFrame(copy=False)['Symbol'].isna().any())
+		with tempfile.TemporaryDirectory() as tmp:
+			fn = os.path.join(tmp, 'ts.hdds')
+			ts0.save(fn)
+			self.assertTrue(ts0 == TimeSeries.load(fn))
+			self.assertTrue(ts0 == TimeSeries.load(fn, mmap=True))
+
 	''' Operators '''
 	def testEqual0(self) -> None:
 		ts = type(self).marketDataTS.copy()
@@ -240,6 +350,129 @@ class TestTimeSeries(unittest.TestCase):
 			plt.subplot(1,2,2); plt.plot(ts1.iloc[:,2:].toDataFrame())
 			plt.show()
 
+	def testShuffle0(self) -> None:
+		ts0 = type(self).rndts0
+		rng = np.random.default_rng(7)
+		#without replacement every row appears once, including last row of each slice
+		ts1 = ts0.shuffle(4, replace=False, rng=rng)
+		self.assertEqual(len(ts1), len(ts0))
+		v0 = np.sort(ts0.toDataFrame().values, axis=0)
+		v1 = np.sort(ts1.toDataFrame().values, axis=0)
+		self.assertTrue((v0 == v1).all())
+		#slices are kept together
+		df0 = ts0.toDataFrame().reset_index(drop=True)
+		df1 = ts1.toDataFrame().reset_index(drop=True)
+		first = df0.index[df0['A'] == df1.at[0, 'A']][0]
+		self.assertTrue((df1.iloc[:3].values == df0.iloc[first:first+3].values).all())
+		#new time index with 1 minute period starting at begin
+		self.assertEqual(ts1.beginEndIndex()[0], ts0.beginEndIndex()[0])
+		self.assertFalse(ts1.hasMissing(60))
+
+	def testShuffle1(self) -> None:
+		ts0 = type(self).rndts0
+		ts1 = ts0.shuffle(5, rng=np.random.default_rng(1))
+		ts2 = ts0.shuffle(5, rng=np.random.default_rng(1))
+		self.assertTrue(ts1 == ts2)
+		#with replacement rows come from the original series
+		self.assertTrue(ts1.toDataFrame()['A'].isin(ts0.toDataFrame()['A']).all())
+		with self.assertRaises(RuntimeError):
+			ts0.shuffle(0)
+
+	def testShuffleIndexes0(self) -> None:
+		idx = TimeSeries.shuffleIndexes(10, 3, replace=False, rng=np.random.default_rng(3))
+		self.assertEqual(sorted(idx.tolist()), list(range(10)))
+		idx = TimeSeries.shuffleIndexes(9, 3, replace=True, rng=np.random.default_rng(3))
+		self.assertEqual(len(idx), 9)
+		self.assertTrue(all(idx[i] % 3 == 0 for i in range(0, 9, 3)))
+
+	def testFindGaps0(self) -> None:
+		ts0 : TimeSeries = type(self).marketDataTS
+		gaps, dups = ts0.findGaps(60)
+		self.assertEqual(gaps['length'].sum(), 3830)
+		self.assertEqual(len(dups), 0)
+		#gap starts are missing samples, and the sample before them exists
+		start = gaps['start'].iloc[0]
+		self.assertFalse(start in ts0.toDataFrame(copy=False).index)
+		self.assertTrue(start - pd.Timedelta(seconds=60) in ts0.toDataFrame(copy=False).index)
+		ts1 = ts0.copy()
+		ts1.interpolate(60)
+		gaps, dups = ts1.findGaps(60)
+		self.assertEqual(len(gaps), 0)
+
+	def testFindGaps1(self) -> None:
+		tr = pd.to_datetime(['2018-1-1 00:00', '2018-1-1 00:01', '2018-1-1 00:01', 
+							 '2018-1-1 00:03', '2018-1-1 00:04'])
+		ts0 = TimeSeries.fromDataFrame(pd.DataFrame({'A': range(5)}), tr)
+		#duplicate hides one missing sample when counting
+		expectedSamples, existingSamples = ts0.findMissing(60)
+		self.assertEqual(expectedSamples, existingSamples)
+		self.assertFalse(ts0.hasMissing(60))
+		self.assertTrue(ts0.hasGaps(60))
+		gaps, dups = ts0.findGaps(60)
+		self.assertEqual(list(gaps['start']), [pd.Timestamp('2018-1-1 00:02')])
+		self.assertEqual(list(gaps['length']), [1])
+		self.assertEqual(list(dups), [pd.Timestamp('2018-1-1 00:01')])
+		#blocks overlap, gap and duplicate at block boundary
+		TimeSeries._gapsBlock = 2
+		try:
+			with mock.patch.object(np, 'diff', wraps=np.diff) as diff:
+				gaps1, dups1 = ts0.findGaps(60)
+			self.assertEqual(2, diff.call_count)
+		finally:
+			del TimeSeries._gapsBlock
+		self.assertEqual(DataSeries._gapsBlock, TimeSeries._gapsBlock)
+		self.assertTrue(gaps.equals(gaps1))
+		self.assertTrue(dups.equals(dups1))
+		with self.assertRaises(RuntimeError):
+			ts0.reversed().findGaps(60)
+
+	def testInterpolateGaps0(self) -> None:
+		resolution = 60
+		ts0 : TimeSeries = type(self).marketDataTS
+		ts1 = ts0.copy() 
+		ts1.interpolate(resolution)
+		ts2 = ts0.copy()
+		ts2.interpolateGaps(resolution)
+		self.assertFalse(ts2.hasGaps(resolution))
+		self.assertFalse(ts2.hasMissing(resolution))
+		df1, df2 = ts1.toDataFrame(), ts2.toDataFrame()
+		self.assertTrue((df1.index == df2.index).all())
+		cols = marketValuesColumns
+		self.assertTrue(np.allclose(df1[cols].values, df2[cols].values, rtol=1e-12))
+		#non numeric columns are NaN in new samples
+		self.assertEqual(df2['Symbol'].isna().sum(), 3830)
+
+	def testInterpolateGaps1(self) -> None:
+		tr = pd.to_datetime(['2018-1-1 00:00', '2018-1-1 00:01', '2018-1-1 00:05'])
+		df = pd.DataFrame({'A': [0., 1., 9.], 'S': ['a', 'b', 'c']})
+		ts0 = TimeSeries.fromDataFrame(df, tr)
+		ts1 = ts0.copy(); ts1.interpolateGaps(60)
+		self.assertEqual(list(ts1.toDataFrame()['A']), [0, 1, 3, 5, 7, 9])
+		ts1 = ts0.copy(); ts1.interpolateGaps(60, 'nearest')
+		self.assertEqual(list(ts1.toDataFrame()['A']), [0, 1, 1, 1, 9, 9])
+		self.assertEqual(list(ts1.toDataFrame()['S']), ['a', 'b', 'b', 'b', 'c', 'c'])
+		ts1 = ts0.copy(); ts1.interpolateGaps(60, 'previous')
+		self.assertEqual(list(ts1.toDataFrame()['A']), [0, 1, 1, 1, 1, 9])
+		self.assertEqual(ts1.beginEndIndex(), ts0.beginEndIndex())
+		with self.assertRaises(RuntimeError):
+			ts1.interpolateGaps(60, 'cubic')
+
+	def testAppendInterpolated0(self) -> None:
+		resolution = 60
+		ts0 : TimeSeries = type(self).marketDataTS
+		ts1 = ts0.copy()
+		ts1.interpolateGaps(resolution)
+		ts2 = ts0.iloc[:20000].copy()
+		ts2.interpolateGaps(resolution)
+		ts2.appendInterpolated(ts0.iloc[20000:], resolution)
+		self.assertEqual(len(ts1), len(ts2))
+		cols = marketValuesColumns
+		self.assertTrue(np.allclose(ts1.toDataFrame()[cols].values, ts2.toDataFrame()[cols].values, rtol=1e-12))
+		#empty series
+		ts3 = TimeSeries()
+		ts3.appendInterpolated(ts0.iloc[:100], resolution)
+		self.assertFalse(ts3.hasMissing(resolution))
+
 #This way only runs if NOT imported!
 if __name__ == "__main__":
 	try:
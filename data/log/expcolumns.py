@@ -0,0 +1,242 @@
+#Experiment log columns
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+import numpy as np
+from typing import Tuple, List, Dict, Set, Any, Iterable, Iterator, Optional, Union
+from hdlib.data.log.historystore import HistoryStore, Key
+
+class ExpColumns:
+    '''
+    Columnar storage of ExpLog entries data:
+        (exp, run, numEpochs, bestAcc, bestLoss, etime[, history])
+
+    Behaves as the list of entries data, so it is used as LogStore data
+    container, and entries are built as tuples when accessed.
+    Fields are kept in typed arrays, that grow by doubling, and exp names
+    are dictionary encoded: an int32 code per entry indexes exp names.
+    History, if given, is kept out of line in a HistoryStore, keyed by
+    (exp, run), and only its key is kept per entry, so only one entry
+    may have a history for each (exp, run). Slices share the store, that
+    is copied, with only their histories, when one of them changes it.
+    '''
+    fields  = ('exp', 'run', 'numEpochs', 'bestAcc', 'bestLoss', 'etime')
+    _dtypes = (np.int32, np.int64, np.int64, np.float64, np.float64, np.float64)
+    _BLOCKSIZE = 1024   #initial capacity
+
+    def __init__(self) -> None:
+        self._names   : List[Any] = []
+        self._codes   : Dict[Any, int] = {}
+        self._cols    = [np.empty(ExpColumns._BLOCKSIZE, dtype=dt) for dt in ExpColumns._dtypes]
+        self._history : List[Optional[Key]] = []
+        self._histories = HistoryStore()
+        self._live    : Set[Key] = set()   #keys of entries histories
+        self._shared  = False              #histories store is also of other columns
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    '''
+    Columns access
+    '''
+    def column(self, name:str) -> np.ndarray:
+        '''returns read only view of column name, exp column has exp codes'''
+        view = self._cols[ExpColumns.fields.index(name)][:self._n]
+        view.flags.writeable = False
+        return view
+
+    def expNames(self) -> List[Any]:
+        '''returns exp names, indexed by exp codes'''
+        return self._names.copy()
+
+    def histories(self) -> HistoryStore:
+        '''returns store with only the histories of these entries'''
+        return self._ownHistories()
+
+    def history(self, key:Key) -> Dict[str, np.ndarray]:
+        '''returns history of entry with key (exp, run), raises KeyError if missing'''
+        if key not in self._live: raise KeyError(key)
+        return self._histories.get(key)
+
+    def hasHistory(self, key:Key) -> bool:
+        '''returns True if an entry has history with key (exp, run)'''
+        return key in self._live
+
+    def _ownHistories(self) -> HistoryStore:
+        '''copies histories store, if it is shared, before changing it'''
+        if self._shared:
+            self._histories = self._histories.copy(self._live)
+            self._shared = False
+        return self._histories
+
+    def expCode(self, exp:Any) -> int:
+        '''returns code of exp, creating a new one if needed'''
+        code = self._codes.get(exp)
+        if code is None:
+            code = self._codes[exp] = len(self._names)
+            self._names.append(exp)
+        return code
+
+    '''
+    List like access, used by LogStore
+    '''
+    def _encode(self, entry:Tuple) -> Tuple:
+        '''returns entry with exp as code, raises TypeError if it is not an ExpLog entry'''
+        ExpColumns._check(entry)
+        return (self.expCode(entry[0]),) + entry[1:6]
+
+    @staticmethod
+    def _check(entry:Tuple) -> None:
+        if not isinstance(entry, tuple) or len(entry) not in (6, 7):
+            raise TypeError('ExpLog entry must be (exp, run, numEpochs, bestAcc, bestLoss, etime[, history])')
+
+    def _set(self, i:int, entry:Tuple) -> None:
+        for col, value in zip(self._cols, self._encode(entry)):
+            col[i] = value
+
+    def _historyKey(self, entry:Tuple, old:Optional[Key]=None) -> Optional[Key]:
+        '''
+        returns key of entry history, if any, raises RuntimeError if other entry,
+        than the one with key old, has a history with the same key
+        '''
+        ExpColumns._check(entry)
+        if len(entry) < 7: return None
+        key = (entry[0], int(entry[1]))
+        if key != old and key in self._live:
+            raise RuntimeError('ExpLog already has history of exp {} run {}'.format(*key))
+        return key
+
+    def _putHistory(self, key:Optional[Key], entry:Tuple) -> None:
+        if key is None: return
+        self._ownHistories().put(key, entry[6])
+        self._live.add(key)
+
+    def _dropHistory(self, key:Optional[Key]) -> None:
+        if key is None: return
+        self._ownHistories().drop(key)
+        self._live.discard(key)
+
+    def _grow(self, size:int) -> None:
+        '''grows columns capacity to, at least, size entries'''
+        capacity = max(size, 2 * len(self._cols[0]), ExpColumns._BLOCKSIZE)
+        for j, col in enumerate(self._cols):
+            new = np.empty(capacity, dtype=col.dtype)
+            new[:self._n] = col[:self._n]
+            self._cols[j] = new
+
+    def append(self, entry:Tuple) -> None:
+        key = self._historyKey(entry)
+        n = self._n
+        if n == len(self._cols[0]): self._grow(n + 1)
+        self._set(n, entry)
+        self._putHistory(key, entry)
+        self._history.append(key)
+        self._n = n + 1
+
+    def extend(self, entries:Iterable[Tuple]) -> None:
+        if not isinstance(entries, ExpColumns):
+            #all checked before, so no entry is added if one is invalid
+            entries = list(entries)
+            keys = [key for key in map(self._historyKey, entries) if key is not None]
+            if len(set(keys)) != len(keys):
+                raise RuntimeError('ExpLog entries have more than one history of the same exp run')
+            for entry in entries:
+                self.append(entry)
+            return
+        repeated = self._live & entries._live
+        if repeated:
+            raise RuntimeError('ExpLog already has history of exp {} run {}'.format(*min(repeated, key=str)))
+        #columns copied in block, other exp codes remaped to this ones
+        n, m = self._n, entries._n
+        if n + m > len(self._cols[0]): self._grow(n + m)
+        remap = np.array([self.expCode(name) for name in entries._names] or [0], dtype=np.int32)
+        self._cols[0][n:n+m] = remap[entries._cols[0][:m]]
+        for col, other in zip(self._cols[1:], entries._cols[1:]):
+            col[n:n+m] = other[:m]
+        self._history.extend(entries._history)
+        self._n = n + m
+        #histories store shared if there are none here, as on copies
+        if not self._live:
+            self._histories = entries._histories
+            self._shared = entries._shared = True
+            self._live = entries._live.copy()
+            return
+        histories = self._ownHistories()
+        for key in entries._live:
+            histories.put(key, entries._histories.get(key))
+        self._live |= entries._live
+
+    def _position(self, idx:int) -> int:
+        if idx < 0: idx += self._n
+        if idx < 0 or idx >= self._n: raise IndexError('log index out of range')
+        return idx
+
+    def _entry(self, i:int) -> Tuple:
+        code, run, numEpochs, bestAcc, bestLoss, etime = (col[i].item() for col in self._cols)
+        entry = (self._names[code], run, numEpochs, bestAcc, bestLoss, etime)
+        key = self._history[i]
+        return entry if key is None else entry + (self._histories.get(key),)
+
+    def __getitem__(self, idx:Union[int, slice]) -> Any:
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._n)
+            cols = ExpColumns()
+            m = len(range(start, stop, step))
+            cols._grow(m)
+            for col, other in zip(cols._cols, self._cols):
+                col[:m] = other[start:stop:step]
+            cols._names = self._names.copy()
+            cols._codes = self._codes.copy()
+            cols._history = self._history[start:stop:step]
+            cols._histories = self._histories
+            cols._shared = self._shared = True
+            cols._live = set(cols._history) - {None}
+            cols._n = m
+            return cols
+        return self._entry(self._position(idx))
+
+    def __setitem__(self, idx:int, entry:Tuple) -> None:
+        i = self._position(idx)
+        old = self._history[i]
+        key = self._historyKey(entry, old)
+        self._set(i, entry)
+        if old != key: self._dropHistory(old)
+        self._putHistory(key, entry)
+        self._history[i] = key
+
+    def __delitem__(self, idx:int) -> None:
+        i = self._position(idx)
+        n = self._n
+        for col in self._cols:
+            col[i:n-1] = col[i+1:n]
+        self._dropHistory(self._history[i])
+        del self._history[i]
+        self._n = n - 1
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for i in range(self._n):
+            yield self._entry(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ExpColumns):
+            n = self._n
+            if n != other._n: return False
+            #other exp codes maped to this ones, -1 if exp is not here
+            remap = np.array([self._codes.get(name, -1) for name in other._names] or [0], dtype=np.int32)
+            return np.array_equal(self._cols[0][:n], remap[other._cols[0][:n]]) and \
+                   all(np.array_equal(a[:n], b[:n]) for a, b in zip(self._cols[1:], other._cols[1:])) and \
+                   self._history == other._history and \
+                   self._histories.equal(other._histories, self._live)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __getstate__(self) -> dict:
+        '''pickle only used capacity, and only histories of these entries'''
+        state = self.__dict__.copy()
+        state['_cols'] = [col[:self._n].copy() for col in self._cols]
+        if self._shared: state['_histories'] = self._histories.copy(self._live)
+        state['_shared'] = False
+        return state
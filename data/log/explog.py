@@ -5,24 +5,32 @@
 #
 #import pytz, pickle
 #from datetime import datetime
-from typing import Tuple, AnyStr #List, Any, Optional, AnyStr
+from typing import Tuple, AnyStr, Optional, Dict #List, Any, Optional, AnyStr
+import os
+import numpy as np
+import pandas as pd
 from hdlib.data.log.simplelog import SimpleLog
+from hdlib.data.log.logstore import LogStore
+from hdlib.data.log.expcolumns import ExpColumns
 
 
 class ExpLog(SimpleLog):  
     
-    def __init__(self, tz="Europe/Lisbon", full=False) -> None:
-        super().__init__(tz)
+    def __init__(self, tz="Europe/Lisbon", full=False, concurrent=False) -> None:
+        super().__init__(tz, concurrent)
         self.__full = full
 
     def isFullLog(self) -> bool:
         return self.__full
 
-    def copy(self) -> "SimpleLog":
-        copyLogsuper = super().copy()
-        copyLog = ExpLog(full=self.__full)
-        copyLog.append(copyLogsuper)
-        return copyLog
+    def _journalState(self) -> dict:
+        return {'full': self.__full}
+
+    def _setJournalState(self, state:dict) -> None:
+        self.__full = state['full']
+
+    def _new(self) -> "SimpleLog":
+        return ExpLog(full=self.__full)
 
     def __eq__(self, other) -> bool:  #Super defines other as Object
         """Overrides the default implementation"""
@@ -32,21 +40,62 @@ class ExpLog(SimpleLog):
             #Cannot be used here since it is defined in the base class:
             #if self.__tz != other.__tz: return False
             if self.__full != other.__full:   return False
-            for l0,l1 in zip(self.getAll(), other.getAll()):
-                if l0 != l1: return False
-            return True
+            return self._store() == other._store()
         return NotImplemented
+
+    #full log histories are saved in a side file with this suffix
+    historySuffix = '.hist.npz'
+
+    def getHistory(self, exp:AnyStr, run:int) -> Dict[str, np.ndarray]:
+        '''returns history of exp run, as float32 array per metric, in full logs'''
+        return self._columns().history((exp, run))
+
+    def save(self, fn:AnyStr) -> None:
+        '''saves log, histories of full logs are saved in fn + historySuffix'''
+        histories = self._columns().histories()
+        if len(histories) > 0: histories.save(fn + ExpLog.historySuffix)
+        super().save(fn)
+
+    @classmethod
+    def load(cls, fn:AnyStr, tail:Optional[int]=None) -> 'SimpleLog':
+        '''loads log, histories saved in side file are only read when accessed'''
+        log = super().load(fn, tail)
+        side = fn + ExpLog.historySuffix
+        if isinstance(log, ExpLog) and len(log._columns().histories()) > 0 and os.path.exists(side):
+            log._columns().histories().attach(side)
+        return log
+
+    def _uniqueKey(self, data) -> Optional[Tuple[AnyStr, int]]:
+        '''entries with history must have unique (exp, run)'''
+        if isinstance(data, tuple) and len(data) == 7: return (data[0], int(data[1]))
+        return None
+
+    def _hasUniqueKey(self, store:LogStore, key:Tuple[AnyStr, int]) -> bool:
+        cols = store.container()
+        return isinstance(cols, ExpColumns) and cols.hasHistory(key)
+
+    def _newStore(self) -> LogStore:
+        return LogStore(self.getTimeZone(), ExpColumns())
+
+    def _columns(self) -> ExpColumns:
+        '''returns entries columns, converts entries of stores with other data container'''
+        store = self._store()
+        if not isinstance(store.container(), ExpColumns):
+            cols = ExpColumns()
+            cols.extend(store.container())
+            store._data = cols
+        return store.container()
     
     #log.add((exp, run, numEpochs, bestAcc, bestLoss, trainTime, trainResponse.history))
-    def add(self, exp:AnyStr, run:int, etime:float, history:dict) -> None:
+    def add(self, exp:AnyStr, run:int, etime:float, history:dict, time=None) -> None:
         numEpochs = len(history["val_acc"])
         bestAcc   = max(history["val_acc"])
         bestLoss  = min(history["val_loss"])
 
         if self.__full:
-            super().add((exp, run, numEpochs, bestAcc, bestLoss, etime, history))
+            super().add((exp, run, numEpochs, bestAcc, bestLoss, etime, history), time)
         else:
-            super().add((exp, run, numEpochs, bestAcc, bestLoss, etime))
+            super().add((exp, run, numEpochs, bestAcc, bestLoss, etime), time)
 
     #print log formated
     def show(self, time:bool=True) -> str:
@@ -64,3 +113,80 @@ class ExpLog(SimpleLog):
 
         return outstr
 
+
+    """
+    Queries, vectorized over entries columns
+    """
+    def toDataFrame(self, rows:Optional[np.ndarray]=None) -> pd.DataFrame:
+        """
+        returns log as DataFrame, with time and a column per field,
+        indexed by entry position. Without rows, numeric columns are
+        read only views of the log (not copied), otherwise only the
+        entries at rows positions are copied
+        """
+        cols  = self._columns()
+        times = self._store().times()
+        codes = cols.column('exp')
+        if rows is not None: codes, times = codes[rows], times[rows]
+        #dict in columns order, selecting columns afterwards would copy them
+        data = {'time': pd.DatetimeIndex(times, tz='UTC').tz_convert(self.getTimeZone()),
+                'exp' : pd.Categorical.from_codes(codes, categories=cols.expNames())}
+        for name in ExpColumns.fields[1:]:
+            data[name] = cols.column(name) if rows is None else cols.column(name)[rows]
+        return pd.DataFrame(data, index=rows, copy=False)
+
+    def bestRuns(self, by:str='bestAcc', largest:bool=True) -> pd.DataFrame:
+        """
+        returns entry with largest (or smallest) by column of each exp,
+        as DataFrame ordered by exp, indexed by entry position.
+        Entries are sorted by exp and value, the first of each exp is the best
+        """
+        cols   = self._columns()
+        codes  = cols.column('exp')
+        values = cols.column(by)
+        order  = np.lexsort((-values if largest else values, codes))
+        sortedCodes = codes[order]
+        first  = np.flatnonzero(np.r_[True, sortedCodes[1:] != sortedCodes[:-1]]) if len(order) > 0 else order
+        return self.toDataFrame(order[first])
+
+    def topRuns(self, k:int=10, by:str='bestAcc', largest:bool=True) -> pd.DataFrame:
+        """
+        returns the k entries with largest (or smallest) by column,
+        as DataFrame ordered from best, indexed by entry position
+        """
+        values = self._columns().column(by)
+        key = -values if largest else values
+        k = min(k, len(key))
+        if k <= 0: return self.toDataFrame(np.empty(0, dtype=np.int64))
+        part = np.argpartition(key, k-1)[:k]
+        return self.toDataFrame(part[np.argsort(key[part], kind='stable')])
+
+    def statsPerExp(self, column:str='etime', ddof:int=1) -> pd.DataFrame:
+        """
+        returns count, mean, std (with ddof), min and max of column per exp,
+        as DataFrame indexed by exp
+        """
+        cols   = self._columns()
+        codes  = cols.column('exp')
+        values = cols.column(column).astype(np.float64)
+        names  = cols.expNames()
+        count  = np.bincount(codes, minlength=len(names))
+        used   = np.flatnonzero(count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(codes, weights=values, minlength=len(names)) / count
+            dev  = values - mean[codes]
+            std  = np.sqrt(np.bincount(codes, weights=dev*dev, minlength=len(names)) / (count - ddof))
+        std[count - ddof <= 0] = np.nan
+        #min and max reduced over entries sorted by exp
+        order  = np.argsort(codes, kind='stable')
+        starts = np.r_[0, np.cumsum(count[used])[:-1]].astype(np.int64)
+        sortedValues = values[order]
+        emin = np.minimum.reduceat(sortedValues, starts) if len(used) > 0 else np.empty(0)
+        emax = np.maximum.reduceat(sortedValues, starts) if len(used) > 0 else np.empty(0)
+        return pd.DataFrame({'count': count[used], 'mean': mean[used], 'std': std[used],
+                             'min': emin, 'max': emax},
+                            index=pd.Index([names[i] for i in used], name='exp'))
+
+
+from hdlib.time.instrument import instrumentModule
+instrumentModule(__name__)
@@ -10,7 +10,8 @@ from hdlib.data.log.explog    import ExpLog
 # Unit tests #
 ##############
 import unittest
-import pickle
+import pickle, os, tempfile
+import numpy as np
 from typing import ClassVar, AnyStr, Any, Tuple, List
 from datetime import datetime
 
@@ -109,7 +110,77 @@ class TestExpLog(unittest.TestCase):
         log0 = ExpLog(full=True)
         log0.add("10", 0, 3.33, TestExpLog.history)
         lastHistory = log0.getInfoAt(0)[6]
-        self.assertDictEqual(lastHistory,TestExpLog.history)
+        #histories are kept as float32 arrays
+        self.assertEqual(lastHistory.keys(), TestExpLog.history.keys())
+        for name, values in TestExpLog.history.items():
+            self.assertEqual(lastHistory[name].dtype, np.float32)
+            self.assertTrue(np.allclose(lastHistory[name], values, rtol=1e-6, atol=0))
+
+    def testFullLogHistories0(self) -> None:
+        log0 = ExpLog(full=True)
+        log0.add("10", 0, 3.33, TestExpLog.history)
+        log0.add("10", 1, 3.21, {'val_acc': [0.5, 0.75], 'val_loss': [0.5, 0.25]})
+        self.assertEqual(log0.getHistory("10", 1)['val_acc'].tolist(), [0.5, 0.75])
+        #copies share history arrays
+        log1 = log0.copy()
+        self.assertIs(log1.getHistory("10", 0)['acc'], log0.getHistory("10", 0)['acc'])
+        self.assertTrue(log0 == log1)
+        log1.add("10", 2, 1.0, {'val_acc': [0.5], 'val_loss': [0.5]})
+        self.assertNotIn(("10", 2), log0._columns().histories())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fn = os.path.join(tmp, 'full.log')
+            log0.save(fn)
+            self.assertTrue(os.path.exists(fn + ExpLog.historySuffix))
+            #pickled log does not have the histories
+            self.assertLess(os.path.getsize(fn), 2048)
+            log2 = ExpLog.load(fn)
+            self.assertEqual(len(log2._columns().histories()._arrays), 0)
+            self.assertEqual(log2.getHistory("10", 1)['val_loss'].tolist(), [0.5, 0.25])
+            self.assertEqual(log2, log0)
+            self.assertEqual(log2.getInfoAt(0)[:6], log0.getInfoAt(0)[:6])
+            #saved again with histories not read yet
+            log2.add("11", 0, 1.0, {'val_acc': [1.0], 'val_loss': [0.0]})
+            log2.save(fn)
+            log3 = ExpLog.load(fn, tail=2)
+            self.assertEqual(log3.getHistory("10", 1)['val_acc'].tolist(), [0.5, 0.75])
+            self.assertEqual(log3.getHistory("11", 0)['val_acc'].tolist(), [1.0])
+
+    def testFullLogHistories1(self) -> None:
+        log0 = ExpLog(full=True)
+        log0.add("10", 0, 3.33, {'val_acc': [0.5], 'val_loss': [0.5]})
+        log0.add("10", 1, 3.21, {'val_acc': [0.75], 'val_loss': [0.25]})
+        #other history of the same exp run is rejected, not replaced
+        with self.assertRaises(RuntimeError):
+            log0.add("10", 0, 1.0, {'val_acc': [1.0], 'val_loss': [0.0]})
+        self.assertEqual(len(log0), 2)
+        self.assertEqual(log0.getHistory("10", 0)['val_acc'].tolist(), [0.5])
+        #the same entry history may be replaced
+        log0.setInfoAt(0, ("10", 0, 1, 0.25, 0.75, 3.33, {'val_acc': [0.25], 'val_loss': [0.75]}))
+        self.assertEqual(log0.getHistory("10", 0)['val_acc'].tolist(), [0.25])
+
+        #removed entries history is dropped
+        log1 = log0.copy()
+        log0.remove(0)
+        self.assertNotIn(("10", 0), log0._columns().histories())
+        with self.assertRaises(KeyError):
+            log0.getHistory("10", 0)
+        log0.add("10", 0, 1.0, {'val_acc': [1.0], 'val_loss': [0.0]})
+        self.assertEqual(log0.getHistory("10", 0)['val_acc'].tolist(), [1.0])
+        #copy not changed
+        self.assertEqual(log1.getHistory("10", 0)['val_acc'].tolist(), [0.25])
+
+        #slices share histories store until one of them changes it
+        cols = log1._columns()
+        part = cols[1:]
+        self.assertIs(part._histories, cols._histories)
+        self.assertEqual(part.history(("10", 1))['val_acc'].tolist(), [0.75])
+        with self.assertRaises(KeyError):
+            part.history(("10", 0))
+        del part[0]
+        self.assertIsNot(part._histories, cols._histories)
+        self.assertEqual(len(part.histories()), 0)
+        self.assertEqual(len(cols.histories()), 2)
 
     def testShow0(self) -> None:
         log = TestExpLog.log.copy()
@@ -132,7 +203,58 @@ class TestExpLog(unittest.TestCase):
         strcmp += "2019-08-22 12:43:00\n"
         strcmp += "('10', 1, 103, 0.9921428571428571, 0.002061287123396923, 3.21)"
         self.assertEqual(log.show(time=False), strcmp)
-   
+
+    def queryLog(self) -> ExpLog:
+        log = ExpLog()
+        rng = np.random.default_rng(0)
+        for i in range(50):
+            h = {'val_acc': list(rng.random(3)), 'val_loss': list(rng.random(3))}
+            log.add('exp{}'.format(i % 4), i, float(rng.random()), h)
+        return log
+
+    def testColumns0(self) -> None:
+        log = self.queryLog()
+        df = log.toDataFrame()
+        self.assertEqual(list(df.columns), ['time', 'exp', 'run', 'numEpochs', 'bestAcc', 'bestLoss', 'etime'])
+        self.assertEqual(list(df.iloc[7, 1:]), list(log.getInfoAt(7)))
+        #numeric columns are not copied
+        cols = log._columns()
+        for name in ['run', 'numEpochs', 'bestAcc', 'bestLoss', 'etime']:
+            self.assertTrue(np.shares_memory(df[name].values, cols.column(name)))
+        #entries still as tuples
+        log.remove(0)
+        log.setInfoAt(0, ('new', 1, 2, 0.5, 0.25, 3.0))
+        self.assertEqual(log.getInfoAt(0), ('new', 1, 2, 0.5, 0.25, 3.0))
+        self.assertEqual(len(log.toDataFrame()), 49)
+        self.assertEqual(log.copy(), log)
+
+    def testBestRuns0(self) -> None:
+        log = self.queryLog()
+        df = log.toDataFrame()
+        best = log.bestRuns()
+        expected = df.loc[df.groupby('exp')['bestAcc'].idxmax()]
+        self.assertTrue(best.equals(expected))
+        best = log.bestRuns('bestLoss', largest=False)
+        expected = df.loc[df.groupby('exp')['bestLoss'].idxmin()]
+        self.assertTrue(best.equals(expected))
+
+    def testTopRuns0(self) -> None:
+        log = self.queryLog()
+        df = log.toDataFrame()
+        self.assertTrue(log.topRuns(5).equals(df.sort_values('bestAcc', ascending=False).head(5)))
+        self.assertTrue(log.topRuns(5, 'etime', largest=False).equals(df.sort_values('etime').head(5)))
+        self.assertEqual(len(log.topRuns(100)), 50)
+        self.assertEqual(len(log.topRuns(0)), 0)
+
+    def testStatsPerExp0(self) -> None:
+        log = self.queryLog()
+        df = log.toDataFrame()
+        stats = log.statsPerExp()
+        expected = df.groupby('exp')['etime'].agg(['count', 'mean', 'std', 'min', 'max'])
+        self.assertEqual(list(stats.index), list(expected.index))
+        self.assertTrue(np.allclose(stats.values, expected.values))
+        self.assertEqual(len(ExpLog().statsPerExp()), 0)
+
 
 #This way only runs if NOT imported!
 if __name__ == "__main__":
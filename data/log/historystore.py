@@ -0,0 +1,133 @@
+#Training histories storage
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+import json
+import numpy as np
+from typing import Tuple, List, Dict, Any, Iterable, Optional, AnyStr
+from hdlib.data.log.journal import replaceFile
+
+Key = Tuple[Any, int]   #(exp, run)
+
+class HistoryStore:
+    '''
+    Training histories of a full ExpLog, kept out of the log entries,
+    keyed by (exp, run). Each history is a dict of metric name to
+    a read only float32 array, with a value per epoch.
+
+    Histories are saved in a npz file, one member per history, with
+    a row per metric (or a member per metric if lengths differ), that
+    is only read when the history is accessed. Copies of the store
+    share the history arrays, as they are read only.
+    '''
+    def __init__(self) -> None:
+        self._arrays : Dict[Key, Dict[str, np.ndarray]] = {}   #added or already read
+        self._filed  : Dict[Key, Tuple[int, List[str], bool]] = {}   #in file: (position, metric names, stacked)
+        self._fn     : Optional[AnyStr] = None
+        self._npz    : Any = None
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __contains__(self, key:Key) -> bool:
+        return key in self._arrays or key in self._filed
+
+    def keys(self) -> List[Key]:
+        return list(self._filed.keys() | self._arrays.keys())
+
+    def put(self, key:Key, history:dict) -> None:
+        '''stores history as float32 arrays, replacing any other with same key'''
+        arrays = {}
+        for name, values in history.items():
+            #read only float32 arrays, as from other store, are shared
+            if isinstance(values, np.ndarray) and values.dtype == np.float32 and not values.flags.writeable:
+                arr = values
+            else:
+                arr = np.array(values, dtype=np.float32)
+                arr.flags.writeable = False
+            arrays[name] = arr
+        self._arrays[key] = arrays
+        self._filed.pop(key, None)
+
+    def get(self, key:Key) -> Dict[str, np.ndarray]:
+        '''returns history with key, reads it from file if not read yet, raises KeyError if missing'''
+        arrays = self._arrays.get(key)
+        if arrays is not None: return arrays
+        pos, names, stacked = self._filed[key]
+        if self._npz is None: self._npz = np.load(self._fn)
+        if stacked:
+            rows = self._npz['a{}'.format(pos)]
+            rows.flags.writeable = False
+            arrays = dict(zip(names, rows))
+        else:
+            arrays = {}
+            for j, name in enumerate(names):
+                arr = self._npz['a{}_{}'.format(pos, j)]
+                arr.flags.writeable = False
+                arrays[name] = arr
+        self._arrays[key] = arrays
+        return arrays
+
+    def drop(self, key:Key) -> None:
+        '''removes history with key, if any'''
+        self._arrays.pop(key, None)
+        self._filed.pop(key, None)
+
+    def copy(self, keys:Optional[Iterable[Key]]=None) -> 'HistoryStore':
+        '''returns a copy of the store, or of its histories with keys, that shares history arrays and file'''
+        store = HistoryStore()
+        if keys is None:
+            store._arrays = self._arrays.copy()
+            store._filed  = self._filed.copy()
+        else:
+            store._arrays = {key: self._arrays[key] for key in keys if key in self._arrays}
+            store._filed  = {key: self._filed[key] for key in keys if key in self._filed}
+        store._fn, store._npz = self._fn, self._npz
+        return store
+
+    def equal(self, other:'HistoryStore', keys:Iterable[Key]) -> bool:
+        '''returns True if histories with keys are equal in both stores'''
+        if other is self: return True
+        for key in keys:
+            h0, h1 = self.get(key), other.get(key)
+            if h0.keys() != h1.keys(): return False
+            if not all(h0[name] is h1[name] or np.array_equal(h0[name], h1[name]) for name in h0):
+                return False
+        return True
+
+    '''
+    Persistence
+    '''
+    def save(self, fn:AnyStr) -> None:
+        '''saves all histories to npz file fn, atomically'''
+        keys = self.keys()
+        members : Dict[str, Any] = {}
+        index = []
+        for pos, key in enumerate(keys):
+            arrays = self.get(key)
+            stacked = len(set(len(arr) for arr in arrays.values())) <= 1
+            index.append([key[0], key[1], list(arrays.keys()), stacked])
+            if stacked:
+                members['a{}'.format(pos)] = np.stack(list(arrays.values())) if arrays else np.empty((0, 0), np.float32)
+            else:
+                for j, arr in enumerate(arrays.values()):
+                    members['a{}_{}'.format(pos, j)] = arr
+        members['index'] = np.array(json.dumps(index))
+        replaceFile(fn, lambda fp: np.savez(fp, **members))
+        self.attach(fn)
+
+    def attach(self, fn:AnyStr) -> None:
+        '''uses histories saved in fn, they are read only when accessed'''
+        npz = np.load(fn)
+        index = json.loads(str(npz['index']))
+        self._filed = {(exp, run): (pos, names, stacked) for pos, (exp, run, names, stacked) in enumerate(index)}
+        #added histories are kept, read ones are read again if needed
+        self._arrays = {key: arrays for key, arrays in self._arrays.items() if key not in self._filed}
+        #previous file may still be used by copies
+        self._fn, self._npz = fn, npz
+
+    def __getstate__(self) -> dict:
+        '''only histories not saved in file are pickled'''
+        return {'_arrays': {key: arrays for key, arrays in self._arrays.items() if key not in self._filed},
+                '_filed': self._filed, '_fn': self._fn, '_npz': None}
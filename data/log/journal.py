@@ -0,0 +1,233 @@
+#Append only log file
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+import os, json, pickle, struct, zlib
+from typing import Tuple, List, Any, Iterator, Iterable, Optional, Callable, AnyStr, BinaryIO
+
+Record = Tuple[int, bool, Any]   #(microseconds since epoch, naive, data)
+
+class Journal:
+    '''
+    Append only log file, so each log entry added costs one O(1) write,
+    instead of saving all the log.
+
+    File layout:
+        magic | header length (uint32) | header (json) | records...
+    record:
+        payload length (uint32) | crc32 (uint32) | payload (pickle) | payload length (uint32)
+
+    The trailing length allows reading the last records without reading
+    all the file. A record cut short by a crash (truncated or with a wrong crc)
+    ends the journal, and is ignored.
+    Records are flushed to the OS on each append, and fsync'ed every
+    syncEvery records (0 only on close), to batch the cost of sync.
+    '''
+    _fileMagic = b'HDLJ\x01\x00\x00\x00'
+    _recHead   = struct.Struct('<II')
+    _recFoot   = struct.Struct('<I')
+
+    def __init__(self, fn:AnyStr, syncEvery:int=64) -> None:
+        '''opens existing journal fn for appending, drops truncated last record'''
+        self._fn = fn
+        self._syncEvery = syncEvery
+        self._open(recover=True)
+
+    def _open(self, recover:bool) -> None:
+        '''opens for appending, if recover, checks records and drops invalid ones at end'''
+        self._unsynced = 0
+        with open(self._fn, 'rb') as fp:
+            self.header = Journal.readHeader(fp)
+            end = Journal._validEnd(fp) if recover else fp.seek(0, os.SEEK_END)
+        self._fp : Optional[BinaryIO] = open(self._fn, 'r+b')
+        self._fp.truncate(end)
+        self._fp.seek(end)
+
+    @classmethod
+    def create(cls, fn:AnyStr, header:dict, records:Iterable[Record]=(), syncEvery:int=64) -> 'Journal':
+        '''
+        Factory method that writes a new journal fn, with header and records,
+        atomically replacing any existing file, and opens it for appending
+        '''
+        journal = cls.__new__(cls)
+        journal._fn, journal._syncEvery = fn, syncEvery
+        journal.rewrite(header, records)
+        return journal
+
+    @classmethod
+    def _write(cls, fn:AnyStr, header:dict, records:Iterable[Record]) -> None:
+        def write(fp:BinaryIO) -> None:
+            head = json.dumps(header).encode()
+            fp.write(cls._fileMagic + cls._recFoot.pack(len(head)) + head)
+            for rec in records:
+                fp.write(cls.pack(rec))
+        replaceFile(fn, write)
+
+    def rewrite(self, header:dict, records:Iterable[Record]) -> None:
+        '''atomically replaces journal contents with header and records'''
+        self.close()
+        Journal._write(self._fn, header, records)
+        self._open(recover=False)
+
+    '''
+    Write
+    '''
+    @classmethod
+    def pack(cls, rec:Record) -> bytes:
+        '''returns record bytes'''
+        payload = pickle.dumps(rec, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        return cls._recHead.pack(size, zlib.crc32(payload)) + payload + cls._recFoot.pack(size)
+
+    def append(self, rec:Record) -> None:
+        self._fp.write(Journal.pack(rec))
+        self._fp.flush()
+        self._unsynced += 1
+        if self._syncEvery > 0 and self._unsynced >= self._syncEvery:
+            self.sync()
+
+    def extend(self, recs:Iterable[Record]) -> None:
+        for rec in recs:
+            self._fp.write(Journal.pack(rec))
+            self._unsynced += 1
+        self._fp.flush()
+        if self._syncEvery > 0 and self._unsynced >= self._syncEvery:
+            self.sync()
+
+    def sync(self) -> None:
+        '''forces written records to disk'''
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if getattr(self, '_fp', None) is None: return
+        self.sync()
+        self._fp.close()
+        self._fp = None
+
+    def fileName(self) -> AnyStr:
+        return self._fn
+
+    '''
+    Read
+    '''
+    @classmethod
+    def isJournal(cls, fn:AnyStr) -> bool:
+        with open(fn, 'rb') as fp:
+            return fp.read(len(cls._fileMagic)) == cls._fileMagic
+
+    @classmethod
+    def readHeader(cls, fp:BinaryIO) -> dict:
+        '''reads header, leaves fp at first record'''
+        if fp.read(len(cls._fileMagic)) != cls._fileMagic:
+            raise RuntimeError('not a log journal file')
+        size, = cls._recFoot.unpack(fp.read(cls._recFoot.size))
+        return json.loads(fp.read(size).decode())
+
+    @classmethod
+    def _readRecord(cls, fp:BinaryIO) -> Optional[bytes]:
+        '''returns payload of record at fp, or None if there is no valid record'''
+        head = fp.read(cls._recHead.size)
+        if len(head) < cls._recHead.size: return None
+        size, crc = cls._recHead.unpack(head)
+        payload = fp.read(size)
+        foot = fp.read(cls._recFoot.size)
+        if len(foot) < cls._recFoot.size or zlib.crc32(payload) != crc or \
+           cls._recFoot.unpack(foot)[0] != size:
+            return None
+        return payload
+
+    @classmethod
+    def _skipRecord(cls, fp:BinaryIO, fileSize:int) -> bool:
+        '''moves fp after record, without reading payload, returns False if it does not fit the file'''
+        head = fp.read(cls._recHead.size)
+        if len(head) < cls._recHead.size: return False
+        size, _ = cls._recHead.unpack(head)
+        end = fp.tell() + size + cls._recFoot.size
+        if end > fileSize: return False
+        fp.seek(end - cls._recFoot.size)
+        if cls._recFoot.unpack(fp.read(cls._recFoot.size))[0] != size: return False
+        return True
+
+    @classmethod
+    def _validEnd(cls, fp:BinaryIO) -> int:
+        '''returns end of last valid record, fp at first record'''
+        end = fp.tell()
+        while True:
+            payload = cls._readRecord(fp)
+            if payload is None: return end
+            end = fp.tell()
+
+    @classmethod
+    def _tailOffsets(cls, fp:BinaryIO, count:int) -> List[int]:
+        '''
+        returns offsets of the last count records, fp at first record.
+        Walks back from end of file with records trailing length,
+        if last record is truncated, records are skipped from the start
+        '''
+        first = fp.tell()
+        fileSize = fp.seek(0, os.SEEK_END)
+        offsets : List[int] = []
+        end = fileSize
+        while len(offsets) < count and end > first:
+            if end - first < cls._recHead.size + cls._recFoot.size: break
+            fp.seek(end - cls._recFoot.size)
+            size, = cls._recFoot.unpack(fp.read(cls._recFoot.size))
+            start = end - cls._recFoot.size - size - cls._recHead.size
+            if start < first: break
+            fp.seek(start)
+            if cls._recHead.unpack(fp.read(cls._recHead.size))[0] != size: break
+            offsets.append(start)
+            end = start
+        else:
+            return offsets[::-1]
+
+        #end of file is not a record boundary (truncated), skip from start
+        fp.seek(first)
+        offsets = []
+        while True:
+            pos = fp.tell()
+            if not cls._skipRecord(fp, fileSize): break
+            offsets.append(pos)
+        return offsets[-count:] if count > 0 else []
+
+    @classmethod
+    def read(cls, fn:AnyStr, tail:Optional[int]=None) -> Tuple[dict, Iterator[Record]]:
+        '''
+        returns journal header and an iterator over its records,
+        or over the last tail records.
+        Iteration stops at the first invalid record
+        '''
+        fp = open(fn, 'rb')
+        header = cls.readHeader(fp)
+        def records() -> Iterator[Record]:
+            with fp:
+                if tail is not None:
+                    offsets = cls._tailOffsets(fp, tail)
+                    if len(offsets) == 0: return
+                    fp.seek(offsets[0])
+                while True:
+                    payload = cls._readRecord(fp)
+                    if payload is None: return
+                    yield pickle.loads(payload)
+        return header, records()
+
+
+def replaceFile(fn:AnyStr, write:Callable[[BinaryIO], None]) -> None:
+    '''
+    writes file fn with write(fp) atomically: writes to a temporary
+    file in the same directory, syncs it and replaces fn with it,
+    so a crash never leaves fn half written
+    '''
+    tmp = '{}.{}.tmp'.format(fn, os.getpid())
+    try:
+        with open(tmp, 'wb') as fp:
+            write(fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, fn)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
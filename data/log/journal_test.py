@@ -0,0 +1,146 @@
+#Append only log file
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+from hdlib.data.log.journal import Journal
+from hdlib.data.log.simplelog import SimpleLog
+from hdlib.data.log.explog import ExpLog
+
+##############
+# Unit tests #
+##############
+import unittest, os, tempfile
+from datetime import datetime
+
+class TestJournal(unittest.TestCase):
+    """Unit tests"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fn  = os.path.join(self.tmp.name, 'log.journal')
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def makeLog(self, n:int) -> SimpleLog:
+        log = SimpleLog()
+        log.journal(self.fn, syncEvery=4)
+        for i in range(n):
+            log.add(('entry', i))
+        return log
+
+    def testSaveLoad0(self) -> None:
+        log = SimpleLog('UTC')
+        log.add('before journal')
+        log.journal(self.fn)
+        log.add(('entry', 1))
+        log.append(log.head(1))
+        #only flushed, not synced nor closed
+        log2 = SimpleLog.load(self.fn)
+        self.assertEqual(log, log2)
+        self.assertEqual(log2.getTimeZone(), log.getTimeZone())
+        log.closeJournal()
+        log.add('not in journal')
+        self.assertEqual(len(SimpleLog.load(self.fn)), 3)
+
+    def testNaiveTimes0(self) -> None:
+        log = self.makeLog(2)
+        log._SimpleLog__log[0] = (datetime(2019, 8, 22, 12, 33, 19), 'naive')
+        log.setInfoAt(1, 'changed')
+        log.closeJournal()
+        log2 = SimpleLog.load(self.fn)
+        self.assertEqual(log2.getFirst(), (datetime(2019, 8, 22, 12, 33, 19), 'naive'))
+        self.assertEqual(log2.getLast()[1], 'changed')
+
+    def testRewrite0(self) -> None:
+        log = self.makeLog(5)
+        log.remove(0)
+        log.setInfoAt(0, 'changed')
+        log.add('last')
+        self.assertEqual(SimpleLog.load(self.fn), log)
+        log.clear()
+        log.add('only')
+        self.assertEqual(SimpleLog.load(self.fn).getInfo(), ['only'])
+        log.closeJournal()
+        self.assertEqual(os.listdir(self.tmp.name), ['log.journal'])
+
+    def testTail0(self) -> None:
+        log = self.makeLog(10)
+        log.closeJournal()
+        self.assertEqual(SimpleLog.load(self.fn, tail=3), log.tail(3))
+        self.assertEqual(SimpleLog.load(self.fn, tail=20), log)
+        self.assertEqual(len(SimpleLog.load(self.fn, tail=0)), 0)
+
+    def testTruncated0(self) -> None:
+        log = self.makeLog(10)
+        log.closeJournal()
+        size = os.path.getsize(self.fn)
+        with open(self.fn, 'r+b') as fp:
+            fp.truncate(size - 3)
+        self.assertEqual(SimpleLog.load(self.fn), log.head(9))
+        self.assertEqual(SimpleLog.load(self.fn, tail=2).getInfo(), log.getInfo()[7:9])
+
+        #reopening drops truncated record, and appends after last valid one
+        journal = Journal(self.fn)
+        journal.append(log._SimpleLog__log.raw(-1))
+        journal.close()
+        self.assertEqual(SimpleLog.load(self.fn), log)
+
+    def testOpenJournal0(self) -> None:
+        #new journal if it does not exist
+        log = ExpLog.openJournal(self.fn, syncEvery=4)
+        self.assertIsInstance(log, ExpLog)
+        log.add('exp', 0, 1.5, {'val_acc': [0.5, 0.8], 'val_loss': [0.3, 0.1]})
+        log.closeJournal()
+
+        #existing entries kept, new ones appended
+        log2 = ExpLog.openJournal(self.fn)
+        self.assertEqual(log2, log)
+        log2.add('exp', 1, 2.5, {'val_acc': [0.6], 'val_loss': [0.2]})
+        log2.closeJournal()
+        log3 = ExpLog.load(self.fn)
+        self.assertEqual(len(log3), 2)
+        self.assertEqual(log3, log2)
+
+        #truncated record dropped before appending
+        with open(self.fn, 'r+b') as fp:
+            fp.truncate(os.path.getsize(self.fn) - 3)
+        log4 = ExpLog.openJournal(self.fn)
+        self.assertEqual(log4, log)
+        log4.add('exp', 2, 0.5, {'val_acc': [0.7], 'val_loss': [0.1]})
+        log4.closeJournal()
+        self.assertEqual([e[1] for e in ExpLog.load(self.fn).getInfo()], [0, 2])
+
+        log.save(self.fn)
+        with self.assertRaises(RuntimeError):
+            SimpleLog.openJournal(self.fn)
+
+    def testExpLog0(self) -> None:
+        log = ExpLog(full=True)
+        log.journal(self.fn)
+        log.add('exp', 0, 1.5, {'val_acc': [0.5, 0.8], 'val_loss': [0.3, 0.1]})
+        log.closeJournal()
+        log2 = ExpLog.load(self.fn)
+        self.assertIsInstance(log2, ExpLog)
+        self.assertTrue(log2.isFullLog())
+        self.assertEqual(log, log2)
+
+    def testPickle0(self) -> None:
+        log = self.makeLog(5)
+        fn = os.path.join(self.tmp.name, 'log.pickle')
+        log.save(fn)
+        self.assertFalse(Journal.isJournal(fn))
+        self.assertEqual(SimpleLog.load(fn), log)
+        self.assertEqual(SimpleLog.load(fn, tail=2), log.tail(2))
+        log.closeJournal()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['log.journal', 'log.pickle'])
+
+
+#This way only runs if NOT imported!
+if __name__ == '__main__':
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e:
+        pass
@@ -0,0 +1,65 @@
+#Per thread log buffers
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+import threading
+import numpy as np
+from typing import Tuple, List, Any
+
+class ThreadBuffers:
+    '''
+    Buffers of log entries (microseconds since epoch, naive, data), one per
+    thread, so threads adding entries do not contend for a shared lock:
+    each thread appends to its own buffer, under its own lock, that is
+    only taken by others when the buffers are drained.
+    '''
+    def __init__(self) -> None:
+        self._local   = threading.local()
+        self._lock    = threading.Lock()   #registering and draining
+        self.lock     = threading.Lock()   #for users merging drained entries
+        self._buffers : List[Tuple[threading.Thread, Any, List]] = []
+        self.dirty    = False              #entries added since last drain
+
+    def _register(self) -> Tuple[threading.Thread, Any, List]:
+        buf = (threading.current_thread(), threading.Lock(), [])
+        with self._lock:
+            self._buffers.append(buf)
+        self._local.buf = buf
+        return buf
+
+    def add(self, us:int, data:Any, naive:bool=False) -> int:
+        '''
+        adds entry to calling thread buffer, naive tells if its time
+        should be returned as a naive datetime. Returns buffer size
+        '''
+        try:
+            buf = self._local.buf
+        except AttributeError:
+            buf = self._register()
+        with buf[1]:
+            buf[2].append((us, naive, data))
+            size = len(buf[2])
+        self.dirty = True
+        return size
+
+    def drain(self) -> Tuple[np.ndarray, np.ndarray, List[Any]]:
+        '''
+        removes entries from all buffers, returns their times, naive flags
+        and data, in the order they were added by each thread.
+        Buffers of finished threads are dropped
+        '''
+        entries : List[Tuple[int, bool, Any]] = []
+        with self._lock:
+            #cleared before draining, so entries added meanwhile set it again
+            self.dirty = False
+            alive = []
+            for buf in self._buffers:
+                with buf[1]:
+                    entries.extend(buf[2])
+                    buf[2].clear()
+                if buf[0].is_alive(): alive.append(buf)
+            self._buffers = alive
+        times = np.fromiter((e[0] for e in entries), dtype=np.int64, count=len(entries))
+        naive = np.fromiter((e[1] for e in entries), dtype=np.bool_, count=len(entries))
+        return times, naive, [e[2] for e in entries]
@@ -0,0 +1,156 @@
+#Per thread log buffers
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+from hdlib.data.log.logbuffers import ThreadBuffers
+from hdlib.data.log.simplelog import SimpleLog
+from hdlib.data.log.explog import ExpLog
+
+##############
+# Unit tests #
+##############
+import unittest, threading, pickle, os, tempfile
+import numpy as np
+from datetime import datetime
+
+class TestThreadBuffers(unittest.TestCase):
+    """Unit tests"""
+
+    def addFromThreads(self, log:SimpleLog, threads:int, entries:int) -> None:
+        def work(t:int) -> None:
+            for i in range(entries):
+                log.add((t, i))
+        workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+        for w in workers: w.start()
+        for w in workers: w.join()
+
+    def testDrain0(self) -> None:
+        buffers = ThreadBuffers()
+        self.assertEqual(buffers.add(2, 'b'), 1)
+        self.assertEqual(buffers.add(1, 'a', True), 2)
+        self.assertTrue(buffers.dirty)
+        times, naive, data = buffers.drain()
+        self.assertEqual(times.tolist(), [2, 1])
+        self.assertEqual(naive.tolist(), [False, True])
+        self.assertEqual(data, ['b', 'a'])
+        self.assertFalse(buffers.dirty)
+        self.assertEqual(len(buffers.drain()[0]), 0)
+
+    def testConcurrent0(self) -> None:
+        log = SimpleLog(concurrent=True)
+        self.assertTrue(log.isConcurrent())
+        self.addFromThreads(log, 8, 1000)
+        self.assertEqual(len(log), 8000)
+        times = log.getTimeArray()
+        self.assertTrue(np.all(times[1:] >= times[:-1]))
+        #each thread entries in the order added
+        for t in range(8):
+            self.assertEqual([d[1] for d in log.iterInfo() if d[0] == t], list(range(1000)))
+
+    def testLateEntries0(self) -> None:
+        #entries older than others already merged are inserted in time order
+        log = SimpleLog(concurrent=True)
+        log.add('c', 3000000)
+        log.add('a', 1000000)
+        self.assertEqual(log.getInfo(), ['a', 'c'])
+        log.add('b', 2000000)
+        log.add('d', 4000000)
+        self.assertEqual(log.getInfo(), ['a', 'b', 'c', 'd'])
+        log.add('e', datetime(2019, 8, 22, 12, 33, 19))
+        self.assertEqual(log.getLast()[1], 'e')
+        #naive times are kept naive, also when merged before other entries
+        self.assertIsNone(log.getLast()[0].tzinfo)
+        log.add('f', datetime(2019, 8, 22, 12, 40, 0))
+        log.add('g', 5000000)
+        self.assertEqual(log.getInfo()[-3:], ['g', 'e', 'f'])
+        self.assertEqual([t.tzinfo is None for t in log.getTime()[-3:]], [False, True, True])
+
+    def testConcurrentJournal0(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            fn = os.path.join(tmp, 'log.journal')
+            log = ExpLog(concurrent=True)
+            log.journal(fn)
+            log.add('exp', 1, 1.0, {'val_acc': [0.5], 'val_loss': [0.5]}, time=2000000)
+            log.add('exp', 0, 1.0, {'val_acc': [0.5], 'val_loss': [0.5]}, time=1000000)
+            self.assertEqual(len(log), 2)
+            log.add('exp', 2, 1.0, {'val_acc': [0.5], 'val_loss': [0.5]}, time=1500000)
+            log.syncJournal()
+            self.assertEqual(log.getInfo(), ExpLog.load(fn).getInfo())
+            log.closeJournal()
+
+    def testConcurrentJournal1(self) -> None:
+        #buffered entries are journaled without reading the log
+        with tempfile.TemporaryDirectory() as tmp:
+            fn = os.path.join(tmp, 'log.journal')
+            log = SimpleLog(concurrent=True)
+            log.journal(fn, syncEvery=4)
+            def work() -> None:
+                for i in range(5):
+                    log.add(i, 1000000 * (i + 5))
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+            self.assertEqual(SimpleLog.load(fn).getInfo(), [0, 1, 2, 3])
+            log.add('early', 1000000)
+            log.add('naive', datetime(2019, 8, 22, 12, 33, 19))
+            log.closeJournal()
+            #journal order is fixed on load
+            loaded = SimpleLog.load(fn)
+            self.assertEqual(loaded.getInfo(), ['early', 0, 1, 2, 3, 4, 'naive'])
+            self.assertIsNone(loaded.getLast()[0].tzinfo)
+            self.assertEqual(loaded.getInfo(), log.getInfo())
+
+            #drained entries rewritten with the log entries
+            log.journal(fn, syncEvery=2)
+            log.add('x', 2000000)
+            log.add('y', 3000000)
+            log.remove(0)
+            self.assertEqual(SimpleLog.load(fn).getInfo(), log.getInfo())
+            self.assertEqual(log.getInfo()[:3], ['x', 'y', 0])
+            log.closeJournal()
+
+    def testDuplicates0(self) -> None:
+        #duplicate histories are rejected on add, the other entries kept
+        log = ExpLog(full=True, concurrent=True)
+        h = {'val_acc': [0.5], 'val_loss': [0.5]}
+        log.add('exp', 0, 1.0, h, time=1000000)
+        log.add('exp', 1, 1.0, h, time=2000000)
+        with self.assertRaises(RuntimeError):
+            log.add('exp', 0, 1.0, h, time=3000000)
+        log.add('exp', 2, 1.0, h, time=4000000)
+        self.assertEqual(len(log), 3)
+        #also if already merged
+        with self.assertRaises(RuntimeError):
+            log.add('exp', 1, 1.0, h)
+        log.remove(1)
+        log.add('exp', 1, 1.0, h, time=5000000)
+        self.assertEqual([e[1] for e in log.getInfo()], [0, 2, 1])
+
+        #entries added racing with log changes are dropped on merge
+        log._SimpleLog__keys.clear()
+        log.add('exp', 3, 1.0, h, time=6000000)
+        log._SimpleLog__keys.clear()
+        log.add('exp', 3, 1.0, h, time=7000000)
+        self.assertEqual([e[1] for e in log.getInfo()], [0, 2, 1, 3])
+        self.assertEqual(log.getTime()[-1], log._store().fromMicro(6000000))
+
+    def testPickle0(self) -> None:
+        log = SimpleLog(concurrent=True)
+        self.addFromThreads(log, 2, 10)
+        log2 = pickle.loads(pickle.dumps(log))
+        self.assertTrue(log2.isConcurrent())
+        self.assertEqual(log2, log)
+        log2.add('new')
+        self.assertEqual(len(log2), 21)
+        log2.clear()
+        self.assertEqual(len(log2), 0)
+
+
+#This way only runs if NOT imported!
+if __name__ == '__main__':
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e:
+        pass
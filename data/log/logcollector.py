@@ -0,0 +1,111 @@
+#Log collector for several processes
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+import multiprocessing, threading
+from time import time_ns, monotonic
+from typing import Tuple, List, Any, Optional
+from hdlib.data.log.simplelog import SimpleLog
+
+class LogClient:
+    '''
+    Sends log entries to a LogCollector, from any process.
+    Entries are timestamped when added and sent in batches of
+    batchSize entries, or when the oldest entry waits more than
+    flushInterval seconds, to amortize the queue cost.
+    Pass it to processes on creation (Process args or Pool initializer),
+    as multiprocessing queues can not be sent through other queues
+    '''
+    def __init__(self, queue:Any, batchSize:int=64, flushInterval:float=0.5) -> None:
+        self._queue = queue
+        self._batchSize = batchSize
+        self._flushInterval = flushInterval
+        self._batch : List[Tuple[int, tuple, dict]] = []
+        self._since = 0.0
+
+    def add(self, *args, **kwargs) -> None:
+        '''
+        adds entry with log add() arguments,
+        eg: client.add(data) for SimpleLog
+        or: client.add(exp, run, etime, history) for ExpLog
+        '''
+        if len(self._batch) == 0: self._since = monotonic()
+        self._batch.append((time_ns() // 1000, args, kwargs))
+        if len(self._batch) >= self._batchSize or monotonic() - self._since > self._flushInterval:
+            self.flush()
+
+    def flush(self) -> None:
+        '''sends entries waiting in batch'''
+        if len(self._batch) == 0: return
+        self._queue.put(self._batch)
+        self._batch = []
+
+    def __getstate__(self) -> dict:
+        '''entries waiting are not sent to other processes'''
+        state = self.__dict__.copy()
+        state['_batch'] = []
+        return state
+
+    def __enter__(self) -> 'LogClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+
+class LogCollector:
+    '''
+    Collects into log the entries sent by LogClients in other processes,
+    through a multiprocessing queue, read by a thread of this process.
+    Entries keep the time they were added in the clients.
+    Use a concurrent log, to read it while collecting:
+
+        log = ExpLog(concurrent=True)
+        with LogCollector(log) as collector:
+            workers = [Process(target=f, args=(collector.client(),)) for ...]
+            ...
+    '''
+    def __init__(self, log:SimpleLog, context:Any=None) -> None:
+        self._log = log
+        self._queue = (context or multiprocessing).Queue()
+        self._thread : Optional[threading.Thread] = None
+        self._error  : Optional[BaseException] = None   #first error adding entries
+
+    def client(self, batchSize:int=64, flushInterval:float=0.5) -> LogClient:
+        return LogClient(self._queue, batchSize, flushInterval)
+
+    def start(self) -> 'LogCollector':
+        self._thread = threading.Thread(target=self._collect, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        '''
+        waits for entries already sent and stops collecting,
+        raises the first error adding entries, if any
+        '''
+        if self._thread is None: return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError('LogCollector failed to add entries to log') from error
+
+    def _collect(self) -> None:
+        '''adds entries sent to log, entries that fail are dropped, and the first error is kept'''
+        while True:
+            batch = self._queue.get()
+            if batch is None: return
+            for us, args, kwargs in batch:
+                try:
+                    self._log.add(*args, time=us, **kwargs)
+                except Exception as e:
+                    if self._error is None: self._error = e
+
+    def __enter__(self) -> 'LogCollector':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,79 @@
+#Log collector for several processes
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+from hdlib.data.log.logcollector import LogCollector, LogClient
+from hdlib.data.log.simplelog import SimpleLog
+from hdlib.data.log.explog import ExpLog
+
+##############
+# Unit tests #
+##############
+import unittest, multiprocessing
+import numpy as np
+
+def worker(client:LogClient, w:int, runs:int) -> None:
+    with client:
+        for run in range(runs):
+            client.add('exp{}'.format(w), run, float(run), {'val_acc': [0.5, run/runs], 'val_loss': [0.5]})
+
+class TestLogCollector(unittest.TestCase):
+    """Unit tests"""
+
+    def testProcesses0(self) -> None:
+        log = ExpLog(concurrent=True)
+        with LogCollector(log) as collector:
+            workers = [multiprocessing.Process(target=worker, args=(collector.client(batchSize=7), w, 50))
+                       for w in range(4)]
+            for p in workers: p.start()
+            for p in workers: p.join()
+        self.assertEqual(len(log), 200)
+        times = log.getTimeArray()
+        self.assertTrue(np.all(times[1:] >= times[:-1]))
+        stats = log.statsPerExp('run')
+        self.assertEqual(list(stats['count']), [50] * 4)
+        self.assertEqual(list(stats['max']), [49] * 4)
+
+    def testSameProcess0(self) -> None:
+        log = SimpleLog()
+        collector = LogCollector(log).start()
+        client = collector.client(batchSize=10)
+        for i in range(25):
+            client.add(i)
+        client.flush()
+        collector.stop()
+        self.assertEqual(log.getInfo(), list(range(25)))
+
+    def testErrors0(self) -> None:
+        #entries that fail are dropped, the error is raised on stop
+        log = SimpleLog()
+        collector = LogCollector(log).start()
+        client = collector.client(batchSize=3)
+        client.add(0)
+        client.add(1, wrong=True)
+        client.add(2)
+        with self.assertRaises(RuntimeError) as cm:
+            collector.stop()
+        self.assertIsInstance(cm.exception.__cause__, TypeError)
+        self.assertEqual(log.getInfo(), [0, 2])
+        collector.start().stop()
+
+        #duplicate histories on concurrent logs are also reported on stop
+        log = ExpLog(full=True, concurrent=True)
+        collector = LogCollector(log).start()
+        client = collector.client(batchSize=4)
+        for run in [0, 1, 0, 2]:
+            client.add('exp', run, 1.0, {'val_acc': [0.5], 'val_loss': [0.5]})
+        with self.assertRaises(RuntimeError):
+            collector.stop()
+        self.assertEqual([e[1] for e in log.getInfo()], [0, 1, 2])
+
+
+#This way only runs if NOT imported!
+if __name__ == '__main__':
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e:
+        pass
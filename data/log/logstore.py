@@ -0,0 +1,300 @@
+#Log entries storage
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Tuple, List, Any, Iterator, Union, Optional
+
+class LogStore:
+    '''
+    Append optimized storage of log entries (time, data), used by SimpleLog.
+
+    Times are kept in a compact int64 array, with microseconds since epoch (UTC),
+    instead of a datetime object per entry, and data in a list.
+    Arrays grow by blocks of doubling size, so appends are amortized O(1),
+    and first/last entries are accessed in O(1).
+
+    Entries are returned as (datetime, data) tuples, with datetime aware in the
+    time zone of the store. Naive datetimes are stored as in the time zone of
+    the store, and are returned naive, as added.
+
+    Slices (with step 1) are views, O(1), that share storage with the store
+    they were taken from. Storage is copied (copy on write) when a view is
+    changed, or when the store changes entries that views may see.
+    '''
+    _EPOCH     = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    _MICRO     = timedelta(microseconds=1)
+    _BLOCKSIZE = 1024   #initial capacity
+
+    def __init__(self, tz, data:Any=None) -> None:
+        '''
+        data is the container of entries data, a list by default, or
+        other with list like append, extend, indexing, slicing and del
+        '''
+        self._tz    = tz
+        self._times = np.empty(LogStore._BLOCKSIZE, dtype=np.int64)
+        self._naive = np.zeros(LogStore._BLOCKSIZE, dtype=np.bool_)
+        self._data  : Any = [] if data is None else data
+        self._n     = 0
+        self._off    = 0      #position of first entry in data, on views
+        self._view   = False  #storage is of other store
+        self._shared = False  #storage is seen by views
+
+    def __len__(self) -> int:
+        return self._n
+
+    '''
+    Time conversions
+    '''
+    def toMicro(self, t:datetime) -> Tuple[int, bool]:
+        '''returns datetime t as (microseconds since epoch, naive)'''
+        naive = t.tzinfo is None
+        if naive:
+            #pytz time zones must localize, to get the right offset
+            if hasattr(self._tz, 'localize'): t = self._tz.localize(t)
+            else:                             t = t.replace(tzinfo=self._tz)
+        return (t - LogStore._EPOCH) // LogStore._MICRO, naive
+
+    def fromMicro(self, us:int, naive:bool=False) -> datetime:
+        '''returns datetime in store time zone from microseconds since epoch'''
+        t = (LogStore._EPOCH + timedelta(microseconds=int(us))).astimezone(self._tz)
+        if naive: t = t.replace(tzinfo=None)
+        return t
+
+    '''
+    Storage sharing
+    '''
+    def _own(self, change:bool=True) -> None:
+        '''
+        copies storage if it is of other store, or if change
+        is True and it is seen by views, before changing it
+        '''
+        if not (self._view or (change and self._shared)): return
+        n, off = self._n, self._off
+        capacity = max(n, LogStore._BLOCKSIZE)
+        times = np.empty(capacity, dtype=np.int64)
+        naive = np.zeros(capacity, dtype=np.bool_)
+        times[:n], naive[:n] = self._times[:n], self._naive[:n]
+        self._data = self._data[off:off+n]
+        self._times, self._naive = times, naive
+        self._off, self._view, self._shared = 0, False, False
+
+    def _dataSlice(self, start:int=0) -> Any:
+        '''returns copy of data of entries from start'''
+        return self._data[self._off+start:self._off+self._n]
+
+    def view(self, start:int, stop:int) -> 'LogStore':
+        '''returns store with entries from start to stop, that shares this store storage'''
+        start, stop, _ = slice(start, stop).indices(self._n)
+        stop = max(start, stop)
+        store = LogStore.__new__(LogStore)
+        store._tz    = self._tz
+        store._times = self._times[start:]
+        store._naive = self._naive[start:]
+        store._data  = self._data
+        store._n     = stop - start
+        store._off   = self._off + start
+        store._view, store._shared = True, False
+        self._shared = True
+        return store
+
+    '''
+    Add, change, remove
+    '''
+    def append(self, time:Union[int, datetime], data:Any, naive:bool=False) -> None:
+        '''
+        appends entry, time may be a datetime or
+        an integer with microseconds since epoch (naive tells if it
+        should be returned as a naive datetime)
+        '''
+        if isinstance(time, datetime): time, naive = self.toMicro(time)
+        #appending does not change entries seen by views, only views must copy
+        if self._view: self._own()
+        n = self._n
+        if n == len(self._times): self._grow(n + 1)
+        self._times[n] = time
+        self._naive[n] = naive
+        self._data.append(data)
+        self._n = n + 1
+
+    def extend(self, other:'LogStore') -> None:
+        '''appends all entries of other store'''
+        if self._view: self._own()
+        n, m = self._n, other._n
+        if n + m > len(self._times): self._grow(n + m)
+        self._times[n:n+m] = other._times[:m]
+        self._naive[n:n+m] = other._naive[:m]
+        self._data.extend(other._dataSlice())
+        self._n = n + m
+
+    def insertSorted(self, times:np.ndarray, data:List[Any], naive:Optional[np.ndarray]=None) -> int:
+        '''
+        inserts entries with times (microseconds since epoch), data and naive
+        flags (all False if None), keeping
+        entries sorted by time, when store entries are sorted, returns position
+        of first entry inserted. Entries later than all in store are just
+        appended, otherwise the later ones are merged with the new ones
+        '''
+        m = len(times)
+        if m == 0: return self._n
+        if self._view: self._own()
+        order = np.argsort(times, kind='stable')
+        times, data = times[order], [data[i] for i in order]
+        naive = np.zeros(m, dtype=np.bool_) if naive is None else np.asarray(naive, dtype=np.bool_)[order]
+        n = self._n
+        pos = int(np.searchsorted(self._times[:n], times[0], side='right'))
+        if pos == n:
+            if n + m > len(self._times): self._grow(n + m)
+            self._times[n:n+m] = times
+            self._naive[n:n+m] = naive
+            self._data.extend(data)
+            self._n = n + m
+            return pos
+
+        #merge entries after pos, at equal times the ones in store first
+        self._own()
+        later = [self.raw(i) for i in range(pos, n)]
+        for _ in range(n - pos):
+            del self._data[-1]
+        self._n = pos
+        merged = sorted(later + list(zip(times.tolist(), naive.tolist(), data)), key=lambda e: e[0])
+        for t, naive, d in merged:
+            self.append(t, d, naive)
+        return pos
+
+    def _grow(self, size:int) -> None:
+        '''grows arrays capacity to, at least, size entries'''
+        capacity = max(size, 2 * len(self._times), LogStore._BLOCKSIZE)
+        times = np.empty(capacity, dtype=np.int64)
+        naive = np.zeros(capacity, dtype=np.bool_)
+        times[:self._n] = self._times[:self._n]
+        naive[:self._n] = self._naive[:self._n]
+        self._times, self._naive = times, naive
+
+    def _position(self, idx:int) -> int:
+        '''returns positive position of idx, raises IndexError if out of range'''
+        if idx < 0: idx += self._n
+        if idx < 0 or idx >= self._n: raise IndexError('log index out of range')
+        return idx
+
+    def __getitem__(self, idx:Union[int, slice]) -> Any:
+        '''
+        returns entry (datetime, data) at idx, or a store with entries in
+        slice idx, a view if slice step is 1, otherwise a copy
+        '''
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._n)
+            if step == 1: return self.view(start, stop)
+            sel = range(start, stop, step)
+            store = LogStore(self._tz, self._data[self._off+start:self._off+stop:step])
+            store._grow(len(sel))
+            store._times[:len(sel)] = self._times[start:stop:step]
+            store._naive[:len(sel)] = self._naive[start:stop:step]
+            store._n = len(sel)
+            return store
+        i = self._position(idx)
+        return (self.fromMicro(self._times[i], self._naive[i]), self._data[self._off+i])
+
+    def __setitem__(self, idx:int, entry:Tuple[datetime, Any]) -> None:
+        '''sets entry (datetime, data) at idx'''
+        i = self._position(idx)
+        self._own()
+        self._times[i], self._naive[i] = self.toMicro(entry[0])
+        self._data[i] = entry[1]
+
+    def __delitem__(self, idx:int) -> None:
+        i = self._position(idx)
+        self._own()
+        n = self._n
+        self._times[i:n-1] = self._times[i+1:n]
+        self._naive[i:n-1] = self._naive[i+1:n]
+        del self._data[i]
+        self._n = n - 1
+
+    def info(self, idx:int) -> Any:
+        '''returns data of entry at idx'''
+        return self._data[self._off + self._position(idx)]
+
+    def setInfo(self, idx:int, data:Any) -> None:
+        '''sets data of entry at idx'''
+        i = self._position(idx)
+        self._own()
+        self._data[i] = data
+
+    def time(self, idx:int) -> datetime:
+        '''returns time of entry at idx'''
+        i = self._position(idx)
+        return self.fromMicro(self._times[i], self._naive[i])
+
+    '''
+    Access all entries
+    '''
+    def __iter__(self) -> Iterator[Tuple[datetime, Any]]:
+        for i in range(self._n):
+            yield (self.fromMicro(self._times[i], self._naive[i]), self._data[self._off+i])
+
+    def raw(self, idx:int) -> Tuple[int, bool, Any]:
+        '''returns entry at idx as (microseconds since epoch, naive, data)'''
+        i = self._position(idx)
+        return int(self._times[i]), bool(self._naive[i]), self._data[self._off+i]
+
+    def rawIter(self, start:int=0) -> Iterator[Tuple[int, bool, Any]]:
+        '''returns iterator over entries from start, as (microseconds since epoch, naive, data)'''
+        return zip(self._times[start:self._n].tolist(), self._naive[start:self._n].tolist(),
+                   self._dataSlice(start))
+
+    def times(self) -> np.ndarray:
+        '''returns a read only view of times as datetime64[us] (UTC)'''
+        view = self._times[:self._n].view('datetime64[us]')
+        view.flags.writeable = False
+        return view
+
+    def timeList(self) -> List[datetime]:
+        '''returns a list with the datetime of each entry'''
+        return [self.fromMicro(t, nv) for t, nv in zip(self._times[:self._n].tolist(),
+                                                       self._naive[:self._n].tolist())]
+
+    def infos(self) -> Iterator[Any]:
+        '''returns an iterator over data of entries'''
+        if self._off == 0 and len(self._data) == self._n: return iter(self._data)
+        return (self._data[self._off+i] for i in range(self._n))
+
+    def container(self) -> Any:
+        '''returns the container of entries data, with only this store entries'''
+        self._own(change=False)
+        return self._data
+
+    def between(self, t0:Optional[int]=None, t1:Optional[int]=None) -> Tuple[int, int]:
+        '''
+        returns (start, stop) positions of entries with times (microseconds since epoch)
+        t0 <= time < t1, by binary search, so entries must be sorted by time.
+        None is an open bound
+        '''
+        times = self._times[:self._n]
+        start = 0       if t0 is None else int(np.searchsorted(times, t0, side='left'))
+        stop  = self._n if t1 is None else int(np.searchsorted(times, t1, side='left'))
+        return start, max(start, stop)
+
+    def copy(self) -> 'LogStore':
+        '''returns a copy of the store, an O(1) view copied on write, entries data is not copied'''
+        return self.view(0, self._n)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LogStore): return NotImplemented
+        n = self._n
+        if n != other._n or not np.array_equal(self._times[:n], other._times[:n]) or \
+           not np.array_equal(self._naive[:n], other._naive[:n]):
+            return False
+        if self._data is other._data and self._off == other._off: return True
+        return self._dataSlice() == other._dataSlice()
+
+    def __getstate__(self) -> dict:
+        '''pickle only used capacity, and entries of views'''
+        state = self.__dict__.copy()
+        state['_times'] = self._times[:self._n].copy()
+        state['_naive'] = self._naive[:self._n].copy()
+        state['_data']  = self._dataSlice()
+        state['_off'], state['_view'], state['_shared'] = 0, False, False
+        return state
@@ -0,0 +1,140 @@
+#Log entries storage
+#
+#v0.1 oct 2026
+#hdaniel@ualg.pt
+#
+from hdlib.data.log.logstore import LogStore
+from hdlib.data.log.simplelog import SimpleLog
+
+##############
+# Unit tests #
+##############
+import unittest, pickle, pytz
+import numpy as np
+from datetime import datetime
+
+class TestLogStore(unittest.TestCase):
+    """Unit tests"""
+
+    tz = pytz.timezone('Europe/Lisbon')
+
+    def testNaiveAware0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        naive = datetime(2019, 8, 22, 12, 33, 19)
+        aware = TestLogStore.tz.localize(datetime(2019, 1, 22, 12, 33, 19, 500))
+        store.append(naive, 'a')
+        store.append(aware, 'b')
+        self.assertEqual(store[0], (naive, 'a'))
+        self.assertIsNone(store[0][0].tzinfo)
+        self.assertEqual(store[1], (aware, 'b'))
+        self.assertEqual(str(store[1][0]), '2019-01-22 12:33:19.000500+00:00')
+        #times in UTC
+        self.assertEqual(str(store.times()[0]), '2019-08-22T11:33:19.000000')
+
+    def testGrowFirstLast0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        n = 3 * LogStore._BLOCKSIZE + 5
+        for i in range(n):
+            store.append(1000000 * i, i)
+        self.assertEqual(len(store), n)
+        self.assertEqual(store[0][1], 0)
+        self.assertEqual(store[-1][1], n-1)
+        self.assertEqual(store.time(-1), store.fromMicro(1000000 * (n-1)))
+        self.assertTrue(np.array_equal(store.times().astype(np.int64), 1000000 * np.arange(n)))
+        self.assertEqual(list(store.infos()), list(range(n)))
+        with self.assertRaises(IndexError): store[n]
+        with self.assertRaises(IndexError): store[-n-1]
+
+    def testReadOnlyTimes0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        store.append(0, None)
+        with self.assertRaises(ValueError):
+            store.times()[0] = 1
+
+    def testSliceDelExtend0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        for i in range(10):
+            store.append(i, i)
+        head = store[:3]
+        del store[1]
+        self.assertEqual(list(head.infos()), [0, 1, 2])
+        self.assertEqual(list(store.infos()), [0, 2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(store.times().astype(np.int64)[1], 2)
+        head.extend(store)
+        self.assertEqual(len(head), 12)
+        self.assertEqual(head[-1][1], 9)
+        self.assertEqual(head.copy(), head)
+        self.assertNotEqual(head.copy(), store)
+
+    def testViews0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        for i in range(10):
+            store.append(i, i)
+        view = store[2:5]
+        self.assertTrue(np.shares_memory(view._times, store._times))
+        self.assertEqual(list(view.infos()), [2, 3, 4])
+        self.assertEqual(view[-1][1], 4)
+        self.assertEqual(view.raw(0), (2, False, 2))
+        #store appends do not change views, nor copy storage
+        store.append(10, 10)
+        self.assertTrue(np.shares_memory(view._times, store._times))
+        self.assertEqual(len(view), 3)
+        #changed view copies its storage
+        view.append(100, 'v')
+        view.setInfo(0, 'changed')
+        self.assertFalse(np.shares_memory(view._times, store._times))
+        self.assertEqual(list(view.infos()), ['changed', 3, 4, 'v'])
+        self.assertEqual(store.info(2), 2)
+        self.assertEqual(store.raw(5), (5, False, 5))
+        #changed store copies its storage, views keep entries
+        view = store[8:]
+        del store[9]
+        store[8] = (datetime(2019, 8, 22), 'new')
+        self.assertEqual([e[1] for e in view], [8, 9, 10])
+        self.assertEqual(view.times().astype(np.int64).tolist(), [8, 9, 10])
+        self.assertEqual(store.info(8), 'new')
+        #views of views
+        view2 = view[1:]
+        self.assertEqual(list(view2.infos()), [9, 10])
+        self.assertEqual(view2, view2.copy())
+        self.assertNotEqual(view2, store[9:])
+        self.assertEqual(pickle.loads(pickle.dumps(view2)).container(), [9, 10])
+
+    def testBetween0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        for i in range(0, 100, 10):
+            store.append(i, i)
+        self.assertEqual(store.between(20, 50), (2, 5))
+        self.assertEqual(store.between(21, 50), (3, 5))
+        self.assertEqual(store.between(None, 5), (0, 1))
+        self.assertEqual(store.between(95, None), (10, 10))
+        self.assertEqual(store.between(50, 20), (5, 5))
+
+    def testPickle0(self) -> None:
+        store = LogStore(TestLogStore.tz)
+        for i in range(5):
+            store.append(i, str(i))
+        store2 = pickle.loads(pickle.dumps(store))
+        self.assertEqual(store, store2)
+        self.assertEqual(len(store2._times), 5)
+        store2.append(5, '5')
+        self.assertEqual(store2[-1][1], '5')
+
+    def testLegacyPickle0(self) -> None:
+        #log pickled with entries in a list
+        log = SimpleLog()
+        entries = [(datetime(2019, 8, 22, 12, 33, 19), 0), (datetime(2019, 8, 22, 12, 43), 1)]
+        state = log.__dict__.copy()
+        state['_SimpleLog__log'] = entries
+        log2 = SimpleLog.__new__(SimpleLog)
+        log2.__setstate__(state)
+        self.assertEqual(log2.getAll(), entries)
+
+
+#This way only runs if NOT imported!
+if __name__ == '__main__':
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e: 
+        pass
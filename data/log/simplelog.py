@@ -3,32 +3,129 @@
 #v0.1 jul 2019
 #hdaniel@ualg.pt
 #
-import pytz, pickle
+import os, pytz, pickle
+from contextlib import nullcontext
+from itertools import chain
+import numpy as np
 import matplotlib.pyplot as plt
+from time import time_ns
 from datetime import datetime
-from typing import Tuple, List, Any, Optional, AnyStr
+from typing import Tuple, List, Any, Optional, AnyStr, Iterator, Union
+from hdlib.data.log.logstore import LogStore
+from hdlib.data.log.journal import Journal, replaceFile
+from hdlib.data.log.logbuffers import ThreadBuffers
 
 class SimpleLog:   
-    def __init__(self, tz='Europe/Lisbon') -> None:
-        self.clear()
+    def __init__(self, tz='Europe/Lisbon', concurrent:bool=False) -> None:
+        '''
+        concurrent logs can be added from several threads: each thread adds
+        to its own buffer, that are merged in time order when the log is read.
+        Reads should be done from one thread only. With a journal, buffered
+        entries are also written to it, without reads, when a thread buffer
+        has syncEvery entries, and merged on syncJournal()/closeJournal()
+        '''
         self.__tz = pytz.timezone(tz)
+        self.__journal : Optional[Journal] = None
+        self.__syncEvery = 0
+        self.__buffers : Optional[ThreadBuffers] = ThreadBuffers() if concurrent else None
+        #entries drained from threads buffers, already journaled, not merged yet: (times, naive, data)
+        self.__pending : List[Tuple[np.ndarray, np.ndarray, List[Any]]] = []
+        self.__keys    : set = set()   #unique keys of entries not merged yet
+        self.clear()
     
     def getTimeZone(self):
         return self.__tz
+
+    def isConcurrent(self) -> bool:
+        return self.__buffers is not None
+
+    #Log entries store, on concurrent logs entries in threads buffers are merged first
+    def __getLog(self) -> LogStore:
+        if self.__buffers is not None and (self.__buffers.dirty or self.__pending): self.__merge()
+        return self.__store
+
+    def __setLog(self, store:LogStore) -> None:
+        self.__store = store
+
+    __log = property(__getLog, __setLog)
+
+    def __merge(self) -> None:
+        '''merges entries in threads buffers into log, in time order'''
+        with self.__buffers.lock:
+            self.__drain()
+            if not self.__pending: return
+            pending = self.__pending
+            times = np.concatenate([p[0] for p in pending])
+            naive = np.concatenate([p[1] for p in pending])
+            data  = [d for p in pending for d in p[2]]
+            #entries with unique keys already in log are dropped, only added by
+            #threads racing with changes of the log, as add() rejects the others
+            keep = self.__uniqueEntries(data)
+            if len(keep) < len(data):
+                times, naive, data = times[keep], naive[keep], [data[i] for i in keep]
+            n = len(self.__store)
+            pos = self.__store.insertSorted(times, data, naive)
+            self.__pending = []
+            self.__keys.clear()
+            #journal has each drain in time order, rewritten if log order is other
+            if self.__journal is None: return
+            journaled = np.concatenate([np.sort(p[0], kind='stable') for p in pending])
+            if pos != n or len(keep) < len(journaled) or (np.diff(journaled) < 0).any():
+                self.__rewrite()
+
+    def __uniqueEntries(self, data:List[Any]) -> List[int]:
+        '''returns positions of entries in data whose unique key is not in log, nor in an entry before'''
+        keep, seen = [], set()
+        for i, d in enumerate(data):
+            key = self._uniqueKey(d)
+            if key is not None:
+                if key in seen or self._hasUniqueKey(self.__store, key): continue
+                seen.add(key)
+            keep.append(i)
+        return keep
+
+    def __drain(self) -> None:
+        '''
+        moves entries in threads buffers to pending ones, in time order,
+        and writes them to journal. Must hold buffers lock
+        '''
+        times, naive, data = self.__buffers.drain()
+        if len(times) == 0: return
+        order = np.argsort(times, kind='stable')
+        self.__pending.append((times[order], naive[order], [data[i] for i in order]))
+        if self.__journal is not None:
+            self.__journal.extend(self.__pendingRecords(-1))
+
+    def __pendingRecords(self, start:int=0) -> Iterator[Tuple[int, bool, Any]]:
+        '''returns journal records of pending entries drains, from start'''
+        return ((int(t), bool(nv), d) for times, naive, data in self.__pending[start:]
+                for t, nv, d in zip(times, naive, data))
+
+    def __journalLock(self) -> Any:
+        '''lock of journal writes, threads buffers lock on concurrent logs'''
+        return nullcontext() if self.__buffers is None else self.__buffers.lock
         
     def getInfoAt(self, idx):
-        return self.__log[idx][1]
+        return self.__log.info(idx)
 
     def setInfoAt(self, idx, val):
-        entry = list(self.__log[idx])
-        entry[1] = val
-        self.__log[idx] = tuple(entry)
+        self.__log.setInfo(idx, val)
+        self.__rewriteJournal()
 
     def copy(self) -> 'SimpleLog':
-        copyLog = SimpleLog()
-        copyLog.__tz = self.__tz          #type: ignore
-        copyLog.__log = self.__log.copy() #type: ignore
-        return copyLog
+        """returns a copy of log, O(1), storage is only copied when changed"""
+        return self.__withStore(self.__log.copy())
+
+    def _new(self) -> 'SimpleLog':
+        """returns new empty log, as this one, for copies and slices"""
+        return SimpleLog()
+
+    def __withStore(self, store:LogStore) -> 'SimpleLog':
+        """returns new log, as this one, with store"""
+        nLog = self._new()
+        nLog.__tz = self.__tz   #type: ignore
+        nLog.__log = store      #type: ignore
+        return nLog
 
     def __eq__(self, other) -> bool:  #Super defines other as Object
         '''Overrides the default implementation'''
@@ -37,17 +134,39 @@ class SimpleLog:
             if self.getTimeZone() != other.getTimeZone():     return False
             #or, since it is defined in this base class:
             #if self.__tz != other.__tz: return False
-            for l0,l1 in zip(self.getAll(), other.getAll()):
-                if l0 != l1: return False
-            return True
+            return self.__log == other.__log
         return NotImplemented
 
     def __len__(self) -> int:
         return len(self.__log)
         
-    def add(self, data:Any) -> None:
-        now = datetime.now(self.__tz)
-        self.__log.append((now, data))
+    def add(self, data:Any, time:Union[None, int, datetime]=None) -> None:
+        '''
+        adds entry with data, at current time or at time, given
+        as datetime or as microseconds since epoch
+        '''
+        #microseconds since epoch, avoids creating a datetime per entry
+        if time is None: time = time_ns() // 1000
+        if self.__buffers is not None:
+            naive = False
+            if isinstance(time, datetime): time, naive = self.__store.toMicro(time)
+            key = self._uniqueKey(data)
+            if key is None:
+                size = self.__buffers.add(time, data, naive)
+            else:
+                #checked and buffered under lock, so merges see the key and its entry
+                with self.__buffers.lock:
+                    if key in self.__keys or self._hasUniqueKey(self.__store, key):
+                        raise RuntimeError('Log already has entry with key {}'.format(key))
+                    self.__keys.add(key)
+                    size = self.__buffers.add(time, data, naive)
+            if self.__journal is not None and 0 < self.__syncEvery <= size:
+                with self.__buffers.lock:
+                    self.__drain()
+            return
+        self.__store.append(time, data)
+        if self.__journal is not None:
+            self.__journal.append(self.__store.raw(-1))
     
     def remove(self, index:int) -> None:
         '''
@@ -55,65 +174,245 @@ class SimpleLog:
         PRE: index >= 0 && index < self.len()
         '''
         del self.__log[index]
+        self.__rewriteJournal()
     
     def getAll(self) -> List[Tuple[datetime, Any]]:
         """returns a copy of log list"""
-        return self.__log.copy()
+        return list(self.__log)
     
     def getFirst(self) -> Optional[Tuple[datetime, Any]]: #Optional allow also None
-        """returns a copy of log first entry"""
+        """returns log first entry, O(1)"""
         if len(self.__log) <= 0: return None
-        #need to copy all log, cause log entrie can be any type
-        #that might not support .copy()
-        return self.__log.copy()[0]
+        #entries are built as new tuples, so log is not changed through them
+        return self.__log[0]
       
     def getLast(self) -> Optional[Tuple]:
-        """returns a copy of log last entry"""
+        """returns log last entry, O(1)"""
         if len(self.__log) <= 0: return None
-        #need to copy all log, cause log entrie can be any type
-        #that might not support .copy()
-        return self.__log.copy()[len(self.__log)-1]
+        return self.__log[-1]
     
     def getTime(self) -> List:
         """returns a copy of log time entries"""
-        return [e[0] for e in self.__log.copy()]
+        return self.__log.timeList()
     
     def getInfo(self) -> List[Any]:
         """returns a copy of log info entries"""
-        return [e[1] for e in self.__log.copy()]
+        return list(self.__log.infos())
+
+    def getTimeArray(self) -> np.ndarray:
+        """returns read only view of log times, as datetime64[us] in UTC"""
+        return self.__log.times()
+
+    def iterAll(self) -> Iterator[Tuple[datetime, Any]]:
+        """returns iterator over log entries, without copying the log"""
+        return iter(self.__log)
+
+    def iterInfo(self) -> Iterator[Any]:
+        """returns iterator over log info entries, without copying the log"""
+        return self.__log.infos()
     
     def clear(self) -> None:
         """clears all log entries"""
-        self.__log : List[Tuple[datetime, Any]] = [] 
+        with self.__journalLock():
+            if self.__buffers is not None: self.__buffers.drain()
+            self.__pending = []
+            self.__keys = set()
+            self.__log = self._newStore()
+            if self.__journal is not None: self.__rewrite()
+
+    def _uniqueKey(self, data:Any) -> Any:
+        """key of entry data that must be unique in log, None if there is none, for subclasses"""
+        return None
+
+    def _hasUniqueKey(self, store:LogStore, key:Any) -> bool:
+        """returns True if an entry of store has unique key, for subclasses"""
+        return False
+
+    def _newStore(self) -> LogStore:
+        """returns an empty store for log entries, subclasses may use other data container"""
+        return LogStore(self.__tz)
+
+    def _store(self) -> LogStore:
+        return self.__log
     
     def save(self, fn:AnyStr) -> None:
-        with open(fn, 'wb') as fp:
-            pickle.dump(self, fp)
+        """saves log pickled, atomically, a crash while saving keeps previous file"""
+        replaceFile(fn, lambda fp: pickle.dump(self, fp))
     
     @classmethod 
-    def load(cls, fn:AnyStr) -> 'SimpleLog':
-        with open(fn, 'rb') as fp:
-            return pickle.load(fp)
+    def load(cls, fn:AnyStr, tail:Optional[int]=None) -> 'SimpleLog':
+        """
+        loads log saved with save() or written with journal().
+        If tail is given, only the last tail entries are kept,
+        which for journals are the only ones read from file
+        """
+        if not Journal.isJournal(fn):
+            with open(fn, 'rb') as fp:
+                log = pickle.load(fp)
+            return log if tail is None else log.tail(tail)
+
+        header, records = Journal.read(fn, tail)
+        logcls = SimpleLog._subclass(header['cls'])
+        log = logcls(header['tz'])
+        log._setJournalState(header['state'])
+        #concurrent logs journal may end with drains not in time order, until merged
+        records = list(records)
+        if header.get('concurrent') and len(records) > 0:
+            times = np.fromiter((r[0] for r in records), dtype=np.int64, count=len(records))
+            if (np.diff(times) < 0).any():
+                records = [records[i] for i in np.argsort(times, kind='stable')]
+        for us, naive, data in records:
+            log.__log.append(us, data, naive)
+        return log
+
+    @staticmethod
+    def _subclass(name:str) -> type:
+        """returns SimpleLog or its subclass with name"""
+        pending = [SimpleLog]
+        while pending:
+            sub = pending.pop()
+            if sub.__name__ == name: return sub
+            pending.extend(sub.__subclasses__())
+        raise TypeError('Unknown SimpleLog subclass: {}'.format(name))
+
+    def __getstate__(self) -> dict:
+        """journal file is not pickled, nor threads buffers, that are merged"""
+        self.__log  #merges threads buffers
+        state = self.__dict__.copy()
+        state['_SimpleLog__journal'] = None
+        state['_SimpleLog__buffers'] = self.__buffers is not None
+        state['_SimpleLog__pending'] = []
+        state['_SimpleLog__keys'] = set()
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        """loads also logs pickled with entries in a list"""
+        state.setdefault('_SimpleLog__journal', None)
+        state.setdefault('_SimpleLog__syncEvery', 0)
+        state.setdefault('_SimpleLog__pending', [])
+        state.setdefault('_SimpleLog__keys', set())
+        state['_SimpleLog__buffers'] = ThreadBuffers() if state.get('_SimpleLog__buffers') else None
+        entries = state.pop('_SimpleLog__log', None)
+        self.__dict__.update(state)
+        if isinstance(entries, list):
+            self.__log = self._newStore()
+            for t, data in entries:
+                self.__log.append(t, data)
+        elif entries is not None:
+            self.__log = entries
+
+    """
+    Journal: append only log file, each add() writes one record
+    """
+    def journal(self, fn:AnyStr, syncEvery:int=64) -> None:
+        """
+        writes log entries to journal file fn, and then appends
+        to it each entry added. Entries are synced to disk every
+        syncEvery entries, or on closeJournal()/syncJournal()
+        Changing or removing entries rewrites all the journal.
+        Load it with load(), or with openJournal() to keep appending to it.
+        An existing fn is replaced
+        """
+        self.closeJournal()
+        with self.__journalLock():
+            records = chain(self.__store.rawIter(), self.__pendingRecords())
+            self.__journal = Journal.create(fn, self.__journalHeader(), records, syncEvery)
+            self.__syncEvery = syncEvery
+
+    @classmethod
+    def openJournal(cls, fn:AnyStr, syncEvery:int=64) -> 'SimpleLog':
+        """
+        loads journal fn and appends to it each entry added, as journal(),
+        without rewriting it. A truncated last record, of a crash, is dropped.
+        If fn does not exist, it is created for a new log of this class
+        """
+        if not os.path.exists(fn):
+            log = cls()
+            log.journal(fn, syncEvery)
+            return log
+        if not Journal.isJournal(fn):
+            raise RuntimeError('Not a log journal: {}'.format(fn))
+        #opened first, so load does not read the truncated record
+        journal = Journal(fn, syncEvery)
+        log = cls.load(fn)
+        log.__journal, log.__syncEvery = journal, syncEvery
+        return log
+
+    def syncJournal(self) -> None:
+        """merges entries in threads buffers, on concurrent logs, and syncs journal to disk"""
+        if self.__journal is None: return
+        self.__log  #merges threads buffers
+        with self.__journalLock():
+            if self.__journal is not None: self.__journal.sync()
+
+    def closeJournal(self) -> None:
+        """merges entries in threads buffers, on concurrent logs, and closes journal"""
+        if self.__journal is None: return
+        self.__log  #merges threads buffers
+        with self.__journalLock():
+            if self.__journal is not None: self.__journal.close()
+            self.__journal = None
+
+    def __journalHeader(self) -> dict:
+        return {'cls': type(self).__name__, 'tz': self.__tz.zone, 'state': self._journalState(),
+                'concurrent': self.__buffers is not None}
+
+    def __rewriteJournal(self) -> None:
+        if self.__journal is None: return
+        self.__log  #merges threads buffers
+        with self.__journalLock():
+            if self.__journal is not None: self.__rewrite()
+
+    def __rewrite(self) -> None:
+        '''rewrites journal with log entries and pending ones. Must hold journal lock'''
+        records = chain(self.__store.rawIter(), self.__pendingRecords())
+        self.__journal.rewrite(self.__journalHeader(), records)
+
+    def _journalState(self) -> dict:
+        """subclass state saved in journal header"""
+        return {}
+
+    def _setJournalState(self, state:dict) -> None:
+        """sets subclass state loaded from journal header"""
+        pass
 
     #Appends to receptor
     def append(self, log:'SimpleLog') -> None:
-        self.__log.extend(log.__log)      #type: ignore
+        store = self.__log
+        with self.__journalLock():
+            n = len(store)
+            store.extend(log.__log)      #type: ignore
+            if self.__journal is None: return
+            if self.__pending: self.__rewrite()
+            else:              self.__journal.extend(store.rawIter(n))
         
     #Returns new Log with head(n) entries of receptor
+    #Slices share log storage, O(1), it is only copied when changed
     def head(self, howMany:int=1) -> 'SimpleLog':
-        nLog = self.copy()  #Could just create new an copy __tz
-        nLog.__log = self.__log[:howMany] #type: ignore
-        return nLog
+        return self.__withStore(self.__log[:howMany])
 
     #Returns new Log with tail(n) entries of receptor
     def tail(self, howMany:int=1) -> 'SimpleLog':
-        nLog = self.copy()  #Could just create new an copy __tz
-        nLog.__log = self.__log[-howMany:] #type: ignore
-        return nLog
+        return self.__withStore(self.__log[-howMany:])
+
+    #Returns new Log with entries from start to stop (not included) of receptor
+    def slice(self, start:Optional[int]=None, stop:Optional[int]=None) -> 'SimpleLog':
+        return self.__withStore(self.__log[start:stop])
+
+    def between(self, t0:Optional[datetime]=None, t1:Optional[datetime]=None) -> 'SimpleLog':
+        """
+        returns new Log with entries with time t0 <= time < t1, None is an open bound.
+        Entries are found by binary search, O(log n), so they must be in time order,
+        as when added. Naive times are in log time zone
+        """
+        us0 = None if t0 is None else self.__log.toMicro(t0)[0]
+        us1 = None if t1 is None else self.__log.toMicro(t1)[0]
+        start, stop = self.__log.between(us0, us1)
+        return self.__withStore(self.__log.view(start, stop))
 
     def __str__(self):
         out = ""
-        for e in self.getAll():
+        for e in self.iterAll():
             out += str(e[0]) + ": " + str(e[1]) + "\n"
         return out
 
@@ -123,3 +422,6 @@ class SimpleLog:
         plt.xlabel("entries")
         plt.show()
 
+
+from hdlib.time.instrument import instrumentModule
+instrumentModule(__name__)
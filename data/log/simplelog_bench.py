@@ -0,0 +1,86 @@
+'''
+Benchmarks of concurrent logging
+
+Throughput of adding log entries with 1, 8 and 32 writers:
+    locked      SimpleLog, threads add under one shared lock (reference)
+    concurrent  SimpleLog(concurrent=True), threads add to their own buffers
+    journal     as concurrent, with a journal file
+    process     processes send entries to a LogCollector, through LogClient
+
+Time includes merging the entries on the first read of the log.
+
+    python simplelog_bench.py --writers 1 8 32 --entries 20000
+
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+from hdlib.data.log.simplelog import SimpleLog
+from hdlib.data.log.logcollector import LogCollector, LogClient
+from hdlib.time.stopwatch import Stopwatch
+from typing import List, Any
+import argparse, os, tempfile, threading, multiprocessing
+
+writers : List[int] = [1, 8, 32]
+modes   : List[str] = ['locked', 'concurrent', 'journal', 'process']
+
+def threadWriters(log:SimpleLog, nwriters:int, entries:int, lock:Any=None) -> float:
+    '''returns seconds for nwriters threads to add entries each, and read log length'''
+    def work(w:int) -> None:
+        if lock is None:
+            for i in range(entries):
+                log.add((w, i))
+        else:
+            for i in range(entries):
+                with lock: log.add((w, i))
+    threads = [threading.Thread(target=work, args=(w,)) for w in range(nwriters)]
+    chrono = Stopwatch()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(log) == nwriters * entries
+    return chrono.watch()
+
+def processWork(client:LogClient, w:int, entries:int) -> None:
+    with client:
+        for i in range(entries):
+            client.add((w, i))
+
+def processWriters(nwriters:int, entries:int) -> float:
+    '''returns seconds for nwriters processes to add entries each through a collector'''
+    log = SimpleLog(concurrent=True)
+    collector = LogCollector(log)
+    procs = [multiprocessing.Process(target=processWork, args=(collector.client(), w, entries))
+             for w in range(nwriters)]
+    chrono = Stopwatch()
+    collector.start()
+    for p in procs: p.start()
+    for p in procs: p.join()
+    collector.stop()
+    assert len(log) == nwriters * entries
+    return chrono.watch()
+
+def bench(mode:str, nwriters:int, entries:int) -> float:
+    if mode == 'locked':     return threadWriters(SimpleLog(), nwriters, entries, threading.Lock())
+    if mode == 'concurrent': return threadWriters(SimpleLog(concurrent=True), nwriters, entries)
+    if mode == 'process':    return processWriters(nwriters, entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SimpleLog(concurrent=True)
+        log.journal(os.path.join(tmp, 'bench.journal'))
+        t = threadWriters(log, nwriters, entries)
+        log.closeJournal()
+        return t
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Concurrent logging benchmarks')
+    parser.add_argument('--writers', type=int, nargs='+', default=writers, help='number of writers')
+    parser.add_argument('--entries', type=int, default=20000, help='entries added by each writer')
+    parser.add_argument('--modes', nargs='+', default=modes, choices=modes)
+    args = parser.parse_args()
+
+    print('{:<12} {:>8} {:>12} {:>14} {:>14}'.format('mode', 'writers', 'time (s)', 'entries/s', 'per writer/s'))
+    for mode in args.modes:
+        for n in args.writers:
+            t = bench(mode, n, args.entries)
+            total = n * args.entries
+            print('{:<12} {:>8} {:>12.3f} {:>14.0f} {:>14.0f}'.format(mode, n, t, total/t, total/t/n), flush=True)
@@ -11,6 +11,7 @@ from hdlib.data.log.simplelog import SimpleLog
 import unittest
 from typing import ClassVar, Tuple, List, Any
 from datetime import datetime
+import numpy as np
 
 class TestSimpleLog(unittest.TestCase):
     """Unit tests"""
@@ -206,6 +207,28 @@ class TestSimpleLog(unittest.TestCase):
         #simple test deepcopy of Head() and Tail()
         self.assertTrue(len(log0)==4)
 
+    def testSliceBetween0(self) -> None:
+        log = SimpleLog()
+        for i in range(10):
+            log.add(i, datetime(2019, 8, 22, 12, i))
+        head = log.head(3)
+        self.assertEqual(head.getInfo(), [0, 1, 2])
+        self.assertEqual(log.slice(2, 5).getInfo(), [2, 3, 4])
+        self.assertEqual(log.slice(-2).getInfo(), [8, 9])
+        #slices share storage until changed
+        self.assertTrue(np.shares_memory(head.getTimeArray(), log.getTimeArray()))
+        head.setInfoAt(0, 'new')
+        self.assertEqual(log.getInfoAt(0), 0)
+        log.remove(1)
+        self.assertEqual(head.getInfo(), ['new', 1, 2])
+
+        last = log.between(datetime(2019, 8, 22, 12, 5))
+        self.assertEqual(last.getInfo(), [5, 6, 7, 8, 9])
+        self.assertEqual(last.getFirst()[0], datetime(2019, 8, 22, 12, 5))
+        self.assertEqual(log.between(datetime(2019, 8, 22, 12, 2), datetime(2019, 8, 22, 12, 4)).getInfo(), [2, 3])
+        self.assertEqual(len(log.between(datetime(2019, 8, 22, 13))), 0)
+        t1 = log.getTimeZone().localize(datetime(2019, 8, 22, 12, 59))
+        self.assertEqual(log.between(None, t1).getInfo(), [0, 2, 3, 4, 5, 6, 7, 8, 9])
 
     def testPrint0(self) -> None:
         log = TestSimpleLog.log.copy()
@@ -0,0 +1,80 @@
+'''
+Compare predictions of several horizons
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+
+import numpy as np
+import pandas as pd
+from hdlib.base import Base
+from hdlib.data.series.ComparePrediction import ComparePrediction
+
+class CompareHorizons(Base):
+    """Compares series predictions of several horizons at once"""
+
+    def __init__(self, actual:np.array, predict:np.array, horizons=None) -> None:
+        """
+        :param actual:   the actual series
+        :param predict:  2D array (samples x horizons), column j is the prediction
+                         with horizon horizons[j], skewed as in ComparePrediction:
+                         predict[t, j] predicts actual[t + horizons[j]]
+        :param horizons: horizon of each column, 1, 2, ... by default
+
+        Arrays are not copied, views of them are compared
+        """
+        self.__actual  = np.asarray(actual).ravel()
+        self.__predict = np.asarray(predict)
+        self.__nsamples = self.__actual.shape[0]
+
+        if self.__predict.ndim != 2 or self.__predict.shape[0] != self.__nsamples:
+            raise RuntimeError('predict should be 2D with as many rows as actual length')
+
+        if horizons is None: horizons = range(1, self.__predict.shape[1] + 1)
+        self.__horizons = np.asarray(horizons, dtype=np.int64)
+        if self.__horizons.shape != (self.__predict.shape[1],):
+            raise RuntimeError('should be one horizon for each predict column')
+        if (self.__horizons > self.__nsamples).any() or (self.__horizons < 0).any():
+            raise RuntimeError('horizon must be in range: [0, series length]')
+
+
+    def horizons(self) -> np.array:
+        return self.__horizons
+
+
+    def commonPoints(self, horizon:int) -> (np.array, np.array):
+        """
+        Common points views of horizon, as ComparePrediction.commonPoints(),
+        prediction is a strided view of its column
+        """
+        j = self.__column(horizon)
+        return (self.__actual[horizon:],
+                self.__predict[:self.__nsamples-horizon, j])
+
+
+    def compare(self, horizon:int) -> ComparePrediction:
+        """ComparePrediction of horizon, that shares the arrays"""
+        return ComparePrediction(self.__actual, self.__predict[:, self.__column(horizon)], horizon)
+
+
+    def metrics(self) -> pd.DataFrame:
+        """
+        Error metrics, as ComparePrediction.metrics(), of each horizon
+
+        Each horizon is compared through views, so without copying
+        predictions, in one set of buffers reused for all horizons
+
+        :returns  DataFrame with one row per horizon and one column per metric
+        """
+        dtype = np.result_type(self.__actual, self.__predict, np.float32)
+        work = ComparePrediction._workspace((self.__nsamples,), dtype)
+        rows = []
+        for j, h in enumerate(self.__horizons.tolist()):
+            m = ComparePrediction._metrics(self.__actual, self.__predict[:, j], h, work)
+            rows.append({k: float(v) for k, v in m.items()})
+        return pd.DataFrame(rows, index=pd.Index(self.__horizons, name='horizon'))
+
+
+    def __column(self, horizon:int) -> int:
+        cols = np.flatnonzero(self.__horizons == horizon)
+        if len(cols) == 0: raise RuntimeError('no prediction with horizon ' + str(horizon))
+        return int(cols[0])
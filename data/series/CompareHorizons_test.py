@@ -0,0 +1,70 @@
+'''
+Compare predictions of several horizons unit tests
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+
+import numpy as np
+from hdlib.data.series.CompareHorizons import CompareHorizons
+from hdlib.data.series.ComparePrediction import ComparePrediction
+
+##############
+# Unit tests #
+##############
+import unittest
+
+spawn = 200
+nhorizons = 5
+
+rng = np.random.default_rng(0)
+actual0  = np.cumsum(rng.normal(size=spawn))
+predict0 = np.zeros((spawn, nhorizons))
+for h in range(1, nhorizons+1):
+    predict0[:spawn-h, h-1] = actual0[h:] + rng.normal(0, 0.1*h, spawn-h)
+
+
+class TestCompareHorizons(unittest.TestCase):
+    """Unit tests."""
+    def testInvalid0(self):
+        with self.assertRaises(RuntimeError):
+            CompareHorizons(actual0, predict0[1:])
+        with self.assertRaises(RuntimeError):
+            CompareHorizons(actual0, predict0, [1, 2])
+        with self.assertRaises(RuntimeError):
+            CompareHorizons(actual0, predict0, [1, 2, 3, 4, spawn+1])
+        with self.assertRaises(RuntimeError):
+            CompareHorizons(actual0, predict0).commonPoints(6)
+
+    def testViews0(self):
+        ch = CompareHorizons(actual0, predict0)
+        self.assertEqual([1, 2, 3, 4, 5], ch.horizons().tolist())
+        act, pred = ch.commonPoints(3)
+        self.assertTrue(np.shares_memory(act, actual0))
+        self.assertTrue(np.shares_memory(pred, predict0))
+        self.assertEqual(actual0[3:].tolist(), act.tolist())
+        self.assertEqual(predict0[:spawn-3, 2].tolist(), pred.tolist())
+
+    def testMetrics0(self):
+        ch = CompareHorizons(actual0, predict0, [0, 1, 2, 3, 4])
+        df = ch.metrics()
+        self.assertEqual([0, 1, 2, 3, 4], df.index.tolist())
+        self.assertEqual(['mae', 'mse', 'rmse', 'mape', 'smape', 'skill'], df.columns.tolist())
+        for h in range(nhorizons):
+            m = ComparePrediction(actual0, predict0[:, h], h).metrics()
+            for k, v in m.items():
+                if np.isnan(v): self.assertTrue(np.isnan(df.loc[h, k]))
+                else:           self.assertAlmostEqual(v, df.loc[h, k])
+            self.assertEqual(m['rmse'], ch.compare(h).metrics()['rmse'])
+
+        #errors grow with horizon
+        df = CompareHorizons(actual0, predict0).metrics()
+        self.assertTrue((np.diff(df['rmse'].values) > 0).all())
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e:
+        pass
@@ -8,6 +8,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from hdlib.base import Base
+import hdlib.data.series.decimate as decimation
 
 class ComparePrediction(Base):
     __LABELACT   = "actual"
@@ -45,9 +46,9 @@ class ComparePrediction(Base):
         predict = [3, 4, 5, 6, 7, 8, 9]
         """
 
-        #force np.array 1D
-        self.__actual  = np.array(actual).flatten()
-        self.__predict = np.array(predict).flatten()
+        #force np.array 1D, a view if already 1D contiguous
+        self.__actual  = np.asarray(actual).ravel()
+        self.__predict = np.asarray(predict).ravel()
         self.__horizon = horizon
         self.__nsamples = self.__actual.shape[0]
 
@@ -73,16 +74,104 @@ class ComparePrediction(Base):
 
             Note: If predict is the same as actual (naive forecasting): actual == predict
         """
+        #[:-horizon] would be empty for horizon 0
         return  (self.__actual[self.__horizon:], \
-                 #self.__predict[:self.__nsamples-self.__horizon])
-                 self.__predict[:-self.__horizon])
-                 
+                 self.__predict[:self.__nsamples-self.__horizon])
+
+
+    def metrics(self) -> dict:
+        """
+        Error metrics of prediction, over common points (see commonPoints()):
+
+            mae, mse, rmse
+            mape:  mean absolute percentage error, ignoring points where actual is 0
+            smape: symmetric mean absolute percentage error, in [0, 200],
+                   points where actual and prediction are 0 have no error
+            skill: 1 - mse / mse of naive forecast (actual horizon points before),
+                   1 is exact, 0 as good as naive, < 0 worse than naive
+
+        :returns  dict with metrics name: value, nan if not defined (eg: no common points)
+        """
+        m = ComparePrediction._metrics(self.__actual, self.__predict, self.__horizon)
+        return {k: float(v) for k, v in m.items()}
+
+
+    @classmethod
+    def batchMetrics(cls, actual:np.array, predict:np.array, horizon:int) -> dict:
+        """
+        Error metrics of many predictions at once, as metrics()
+
+        :param actual:  2D array (series x samples) with actual series
+        :param predict: 2D array (series x samples) with predicted series, as in constructor
+        :param horizon: same for all series
+
+        :returns  dict with metrics name: array with value of each series
+        """
+        actual, predict = np.asarray(actual), np.asarray(predict)
+        if actual.ndim != 2 or actual.shape != predict.shape:
+            raise RuntimeError('actual and predicted should be 2D arrays with same shape')
+        if horizon > actual.shape[1] or horizon < 0:
+            raise RuntimeError('horizon must be in range: [0, series length]')
+        return cls._metrics(actual, predict, horizon)
+
+
+    @staticmethod
+    def _workspace(shape:tuple, dtype:np.dtype) -> tuple:
+        """
+        Buffers for _metrics(), to reuse them on many calls
+        with series of length up to the last dimension of shape
+        """
+        return (np.empty(shape, dtype=dtype), np.empty(shape, dtype=dtype),
+                np.empty(shape, dtype=dtype), np.empty(shape, dtype=np.bool_))
+
+
+    @staticmethod
+    def _metrics(actual:np.array, predict:np.array, horizon:int, work:tuple=None) -> dict:
+        """
+        Metrics of series along the last axis, sums accumulated as float64
+
+        :param work: buffers from _workspace(), otherwise allocated
+        """
+        n = actual.shape[-1] - horizon
+        act   = actual[..., horizon:]
+        pred  = predict[..., :n]
+        dtype = np.result_type(pred, act, np.float32)
+        if work is None: work = ComparePrediction._workspace(act.shape, dtype)
+        err, den, ratio, mask = (w[..., :n] for w in work)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            #naive forecast errors, buffer reused for errors
+            np.subtract(actual[..., :n], act, out=err, dtype=dtype)
+            msenaive = np.einsum('...i,...i->...', err, err, dtype=np.float64) / n
+            np.subtract(pred, act, out=err, dtype=dtype)
+            mse = np.einsum('...i,...i->...', err, err, dtype=np.float64) / n
+            aerr = np.abs(err, out=err)
+            mae = aerr.sum(axis=-1, dtype=np.float64) / n
+
+            #buffer for |actual|, then |actual| + |predict|
+            np.abs(act, out=den, dtype=dtype)
+            ratio.fill(0)
+            nonzero = np.not_equal(den, 0, out=mask)
+            np.divide(aerr, den, out=ratio, where=nonzero)
+            mape = 100 * ratio.sum(axis=-1, dtype=np.float64) / nonzero.sum(axis=-1)
+
+            den += np.abs(pred, out=ratio, dtype=dtype)
+            ratio.fill(0)
+            np.divide(aerr, den, out=ratio, where=np.not_equal(den, 0, out=mask))
+            smape = 200 * ratio.sum(axis=-1, dtype=np.float64) / n
+
+            #not defined if naive forecast is exact, eg: horizon 0
+            skill = np.where(msenaive != 0, 1 - mse / msenaive, np.nan)
+
+        return {'mae': mae, 'mse': mse, 'rmse': np.sqrt(mse),
+                'mape': mape, 'smape': smape, 'skill': skill}
+
 
  
     def plot(self, begin=0, end=-1, overlap=False, 
                    labelact=__LABELACT, labelpred=__LABELPRED,
                    labelx=__LABELX, labely=__LABELY,
-                   title="", xtatitle=""):
+                   title="", xtatitle="", decimate=None, maxPoints=None):
         """
         Plot prediction against actual data
 
@@ -91,6 +180,13 @@ class ComparePrediction(Base):
                            If matches it is naive forecasting
                            (prediction is equal to previous points)
         :param begin, end  range of point to predict
+        :param decimate    None plots all points, or the method to plot less points
+                           keeping series shape, for large series:
+                           'minmax' min and max of each bucket of points, or
+                           'lttb' largest triangle three buckets (see decimate.py).
+                           Zooming (changing x limits) decimates again only the points in view
+        :param maxPoints   points to plot of each series when decimating,
+                           by default, from figure width: 2 per pixel for minmax, 1 for lttb
 
         :returns           figure and single axis, so that it can be saved or plotted
         """
@@ -115,8 +211,12 @@ class ComparePrediction(Base):
 
         #plot
         fig, axs = plt.subplots(1, constrained_layout=True)
-        axs.plot(t0, self.__actual[begin:end], 'g', label=labelact)
-        axs.plot(tp, self.__predict[begin:end], 'r', label=labelpred)
+        if decimate is None:
+            axs.plot(t0, self.__actual[begin:end], 'g', label=labelact)
+            axs.plot(tp, self.__predict[begin:end], 'r', label=labelpred)
+        else:
+            self.__plotDecimated(fig, axs, begin, end, tp.start-begin, decimate, maxPoints,
+                                 labelact, labelpred)
         axs.grid()
 
         #legend
@@ -127,3 +227,33 @@ class ComparePrediction(Base):
         return fig, axs
 
                  
+
+
+    def __plotDecimated(self, fig, axs, begin:int, end:int, shift:int, method:str,
+                        maxPoints:int, labelact:str, labelpred:str) -> None:
+        """
+        Plots decimated series, predict shifted shift points, and decimates
+        again the points in view when x limits change
+        """
+        if method not in decimation.methods:
+            raise RuntimeError('decimate method must be one of: ' + ', '.join(decimation.methods))
+        if maxPoints is None:
+            maxPoints = int(fig.get_figwidth() * fig.dpi) * (2 if method == 'minmax' else 1)
+
+        lines = ((axs.plot([], [], 'g', label=labelact)[0], self.__actual, 0),
+                 (axs.plot([], [], 'r', label=labelpred)[0], self.__predict, shift))
+
+        def redraw(x0:float, x1:float) -> None:
+            for line, series, off in lines:
+                #points in view, in [begin, end[
+                hi = min(end, int(np.ceil(x1)) - off + 1)
+                lo = min(hi, max(begin, int(np.floor(x0)) - off))
+                y = series[lo:hi]
+                x = np.arange(lo, hi) if method == 'lttb' else None
+                idx = decimation.decimate(x, y, maxPoints, method)
+                line.set_data(lo + off + idx, y[idx])
+
+        redraw(begin, end + shift - 1)
+        axs.relim()
+        axs.autoscale_view()
+        axs.callbacks.connect('xlim_changed', lambda ax: redraw(*ax.get_xlim()))
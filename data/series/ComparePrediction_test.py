@@ -71,6 +71,51 @@ class TestComparePrediction(unittest.TestCase):
         ap = cpnaive.commonPoints()
         self.assertEqual(mse(ap[0],ap[1]), mse1)
 
+    def testCommonPointsHorizon0(self):
+        ap = ComparePrediction(actual0, predict1, 0).commonPoints()
+        self.assertEqual(actual0.tolist(), ap[0].tolist())
+        self.assertEqual(actual0.tolist(), ap[1].tolist())
+
+    def testMetrics0(self):
+        m = cpexact.metrics()
+        for k in ['mae', 'mse', 'rmse', 'mape', 'smape']:
+            self.assertEqual(0, m[k])
+        self.assertEqual(1, m['skill'])
+
+        m = cpnaive.metrics()
+        self.assertEqual(mse1, m['mse'])
+        self.assertEqual(3, m['rmse'])
+        self.assertEqual(3, m['mae'])
+        self.assertEqual(0, m['skill'])
+        self.assertAlmostEqual(100 * np.mean(3 / common0), m['mape'])
+        self.assertAlmostEqual(100 * np.mean(6 / (2 * common0 - 3)), m['smape'])
+
+        #actual zeros are ignored by mape
+        m = ComparePrediction([0, 2, 4], [1, 1, 5], 0).metrics()
+        self.assertAlmostEqual(100 * (1/2 + 1/4) / 2, m['mape'])
+        self.assertAlmostEqual(100 * (2 + 2/3 + 2/9) / 3, m['smape'])
+        self.assertTrue(np.isnan(m['skill']))
+
+        m = ComparePrediction([0, 1], [0, 1], 2).metrics()
+        self.assertTrue(np.isnan(m['mae']))
+
+    def testBatchMetrics0(self):
+        rng = np.random.default_rng(0)
+        actual  = rng.random((50, 30))
+        predict = actual + rng.normal(0, 0.1, actual.shape)
+        batch = ComparePrediction.batchMetrics(actual, predict, horizon0)
+        self.assertEqual(['mae', 'mse', 'rmse', 'mape', 'smape', 'skill'], list(batch))
+        for i in [0, 17, 49]:
+            m = ComparePrediction(actual[i], predict[i], horizon0).metrics()
+            for k, v in m.items():
+                self.assertAlmostEqual(v, batch[k][i])
+                self.assertEqual((50,), batch[k].shape)
+
+        with self.assertRaises(RuntimeError):
+            ComparePrediction.batchMetrics(actual, predict[:, 1:], 1)
+        with self.assertRaises(RuntimeError):
+            ComparePrediction.batchMetrics(actual, predict, 31)
+
     #DOES NOT test, just to show
     #could save the file and compare it
     def testPlotCMP0(self):
@@ -94,6 +139,25 @@ class TestComparePrediction(unittest.TestCase):
         buffer.close()
         file.close()
 
+    def testPlotDecimate0(self):
+        big = np.sin(np.arange(100000) / 1000)
+        cp = ComparePrediction(big, np.roll(big, -horizon0), horizon0)
+        for method in ['minmax', 'lttb']:
+            fig, axs = cp.plot(decimate=method, maxPoints=500)
+            for line in axs.lines:
+                self.assertTrue(len(line.get_xdata()) <= 502)
+            self.assertEqual(horizon0, axs.lines[1].get_xdata()[0])
+            self.assertEqual(100000-1+horizon0, axs.lines[1].get_xdata()[-1])
+            #zoom decimates only points in view
+            axs.set_xlim(1000, 1200)
+            self.assertEqual(list(range(1000, 1201)), axs.lines[0].get_xdata().tolist())
+            self.assertEqual(big[1000:1201].tolist(), axs.lines[0].get_ydata().tolist())
+            axs.set_xlim(0, 50000)
+            self.assertEqual(0, axs.lines[0].get_xdata()[0])
+            self.assertTrue(axs.lines[0].get_xdata()[-1] <= 50000)
+        with self.assertRaises(RuntimeError):
+            cp.plot(decimate='other')
+
 
 #This way only runs if NOT imported!
 if __name__ == "__main__":
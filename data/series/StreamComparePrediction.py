@@ -0,0 +1,140 @@
+'''
+Compare predicted series incrementally
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+
+import math
+from hdlib.base import Base
+
+class StreamComparePrediction(Base):
+    """Compares series prediction one step at a time, as in ComparePrediction"""
+
+    def __init__(self, horizon:int, window:int=100, alpha:float=0.05) -> None:
+        """
+        :param horizon: how many steps in the future each prediction is,
+                        as in ComparePrediction
+        :param window:  number of last errors of rolling metrics
+        :param alpha:   weight of last error on exponentially weighted metrics,
+                        in ]0, 1]
+
+        Memory is constant: ring buffers of the last horizon+1 actual and
+        predicted values, to align them, and of the last window errors
+        """
+        if horizon < 0:
+            raise RuntimeError('horizon must be >= 0')
+        if window < 1:
+            raise RuntimeError('window must be >= 1')
+        if not 0 < alpha <= 1:
+            raise RuntimeError('alpha must be in range: ]0, 1]')
+
+        self.__horizon = horizon
+        self.__window  = window
+        self.__alpha   = alpha
+        self.__actual  = [0.0] * (horizon + 1)
+        self.__predict = [0.0] * (horizon + 1)
+        self.__steps   = 0    #updates
+        self.__count   = 0    #errors, updates with aligned actual and prediction
+
+        #terms of each error: |error|, error^2, |error|/|actual|, actual != 0,
+        #|error|/(|actual|+|predict|), naive forecast error^2
+        self.__terms   = [None] * window
+        self.__sums    = [0.0] * 6    #of terms in window
+        self.__totals  = [0.0] * 6    #of all terms
+        self.__ew      = [math.nan] * 6
+
+
+    def update(self, actual:float, predict:float) -> None:
+        """
+        Adds step, O(1)
+
+        :param actual:  actual value of this step
+        :param predict: prediction made at this step, of horizon steps ahead
+        """
+        h, t = self.__horizon, self.__steps
+        pos = t % (h + 1)
+        self.__actual[pos]  = actual  = float(actual)
+        self.__predict[pos] = float(predict)
+        self.__steps = t + 1
+        if t < h: return
+
+        #values from horizon steps before, predicting this one
+        old = (t - h) % (h + 1)
+        pred, naive = self.__predict[old], self.__actual[old]
+        aerr  = abs(pred - actual)
+        aact  = abs(actual)
+        den   = aact + abs(pred)
+        terms = (aerr, aerr * aerr,
+                 aerr / aact if aact != 0 else 0.0, 1.0 if aact != 0 else 0.0,
+                 aerr / den if den != 0 else 0.0, (naive - actual) ** 2)
+
+        #rolling sums, remove term leaving window
+        k = self.__count % self.__window
+        out = self.__terms[k]
+        self.__terms[k] = terms
+        self.__count += 1
+        if out is None:
+            self.__sums = [s + n for s, n in zip(self.__sums, terms)]
+        elif k == self.__window - 1:
+            #sum again on each full turn, so rounding errors do not add up
+            self.__sums = [math.fsum(col) for col in zip(*self.__terms)]
+        else:
+            self.__sums = [s + n - o for s, n, o in zip(self.__sums, terms, out)]
+        self.__totals = [s + n for s, n in zip(self.__totals, terms)]
+
+        #exponentially weighted, first term is the initial value,
+        #percentage error only where actual != 0
+        a, ew = self.__alpha, self.__ew
+        for i, n in enumerate(terms):
+            if i == 2 and aact == 0: continue
+            ew[i] = n if math.isnan(ew[i]) else ew[i] + a * (n - ew[i])
+
+
+    def steps(self) -> int:
+        return self.__steps
+
+
+    def count(self) -> int:
+        """number of errors, steps with prediction to compare"""
+        return self.__count
+
+
+    def metrics(self, kind:str='window') -> dict:
+        """
+        Error metrics, as ComparePrediction.metrics(), of:
+            window: last window errors
+            ew:     all errors, exponentially weighted
+            all:    all errors
+
+        :returns  dict with metrics name: value, nan if not defined (eg: no errors)
+        """
+        if kind == 'window':
+            sums, n = self.__sums, min(self.__count, self.__window)
+        elif kind == 'all':
+            sums, n = self.__totals, self.__count
+        elif kind == 'ew':
+            #averages, valid count is 1 if there was an actual != 0
+            sums, n = list(self.__ew), 1 if self.__count > 0 else 0
+            sums[3] = 0.0 if math.isnan(sums[2]) else 1.0
+        else:
+            raise RuntimeError('kind must be one of: window, ew, all')
+
+        div = lambda x, y: x / y if y != 0 else math.nan
+        return {'mae':   div(sums[0], n),
+                'mse':   div(sums[1], n),
+                'rmse':  math.sqrt(div(sums[1], n)),
+                'mape':  100 * div(sums[2], sums[3]),
+                'smape': 200 * div(sums[4], n),
+                'skill': 1 - div(sums[1], sums[5])}
+
+
+    def summary(self) -> dict:
+        """
+        Constant size summary, eg: for monitoring dashboards
+
+        :returns  dict with steps, count of errors, horizon, window, alpha,
+                  and dicts with metrics of window, ew and all
+        """
+        return {'steps': self.__steps, 'count': self.__count,
+                'horizon': self.__horizon, 'window': self.__window, 'alpha': self.__alpha,
+                'metrics': {kind: self.metrics(kind) for kind in ('window', 'ew', 'all')}}
@@ -0,0 +1,104 @@
+'''
+Compare predicted series incrementally unit tests
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+
+import json, math
+import numpy as np
+import pandas as pd
+from hdlib.data.series.StreamComparePrediction import StreamComparePrediction
+from hdlib.data.series.ComparePrediction import ComparePrediction
+
+##############
+# Unit tests #
+##############
+import unittest
+
+spawn = 1000
+horizon0 = 3
+window0 = 50
+
+rng = np.random.default_rng(0)
+actual0  = np.cumsum(rng.normal(size=spawn))
+actual0[100:110] = 0     #ignored by mape
+predict0 = np.roll(actual0, -horizon0) + rng.normal(0, 0.5, spawn)
+metrics0 = ['mae', 'mse', 'rmse', 'mape', 'smape', 'skill']
+
+
+class TestStreamComparePrediction(unittest.TestCase):
+    """Unit tests."""
+    def assertMetrics(self, expected, actual):
+        for k in metrics0:
+            self.assertAlmostEqual(expected[k], actual[k], places=9)
+
+    def testInvalid0(self):
+        with self.assertRaises(RuntimeError):
+            StreamComparePrediction(-1)
+        with self.assertRaises(RuntimeError):
+            StreamComparePrediction(1, window=0)
+        with self.assertRaises(RuntimeError):
+            StreamComparePrediction(1, alpha=0)
+        with self.assertRaises(RuntimeError):
+            StreamComparePrediction(1).metrics('other')
+
+    def testMetrics0(self):
+        scp = StreamComparePrediction(horizon0, window0)
+        for t in range(spawn):
+            scp.update(actual0[t], predict0[t])
+            if t < horizon0:
+                self.assertEqual(0, scp.count())
+                self.assertTrue(math.isnan(scp.metrics()['mae']))
+            elif t in [horizon0, 20, 100, 107, 499, spawn-1]:
+                #window, as ComparePrediction of last window errors
+                first = max(0, t+1 - window0 - horizon0)
+                cp = ComparePrediction(actual0[first:t+1], predict0[first:t+1], horizon0)
+                self.assertMetrics(cp.metrics(), scp.metrics())
+                self.assertMetrics(ComparePrediction(actual0[:t+1], predict0[:t+1], horizon0).metrics(),
+                                   scp.metrics('all'))
+        self.assertEqual(spawn, scp.steps())
+        self.assertEqual(spawn-horizon0, scp.count())
+
+    def testEW0(self):
+        alpha = 0.1
+        scp = StreamComparePrediction(horizon0, window0, alpha)
+        for t in range(spawn):
+            scp.update(actual0[t], predict0[t])
+        act, pred = actual0[horizon0:], predict0[:spawn-horizon0]
+        ew = lambda x: pd.Series(x).ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+        aerr = np.abs(pred - act)
+        m = scp.metrics('ew')
+        self.assertAlmostEqual(ew(aerr), m['mae'])
+        self.assertAlmostEqual(np.sqrt(ew(aerr**2)), m['rmse'])
+        nonzero = act != 0
+        self.assertAlmostEqual(100 * ew(aerr[nonzero] / np.abs(act[nonzero])), m['mape'])
+        self.assertAlmostEqual(200 * ew(aerr / (np.abs(act) + np.abs(pred))), m['smape'])
+        self.assertAlmostEqual(1 - ew(aerr**2) / ew((actual0[:spawn-horizon0] - act)**2), m['skill'])
+
+    def testHorizon0(self):
+        scp = StreamComparePrediction(0, window=2)
+        for a, p in [(1, 2), (2, 2), (4, 1)]:
+            scp.update(a, p)
+        m = scp.metrics()
+        self.assertEqual(1.5, m['mae'])
+        self.assertEqual(3 / 4 * 100 / 2, m['mape'])
+        self.assertTrue(math.isnan(m['skill']))
+
+    def testSummary0(self):
+        scp = StreamComparePrediction(horizon0, window0)
+        for t in range(100):
+            scp.update(actual0[t], predict0[t])
+        s = scp.summary()
+        self.assertEqual(100, s['steps'])
+        self.assertEqual(100-horizon0, s['count'])
+        self.assertEqual(['window', 'ew', 'all'], list(s['metrics']))
+        self.assertEqual(s, json.loads(json.dumps(s)))
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e:
+        pass
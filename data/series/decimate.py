@@ -0,0 +1,82 @@
+'''
+Decimate series to plot, keeping their shape
+v0.1 oct 2026
+hdaniel@ualg.pt
+
+Functions return the indexes of the points to keep, sorted,
+so they can select x and y, and any other array along the series
+'''
+
+import numpy as np
+
+methods = ('minmax', 'lttb')
+
+
+def minmax(y:np.array, maxPoints:int) -> np.array:
+    """
+    Keeps the min and the max of each of maxPoints/2 buckets, and the first
+    and last points, so peaks are kept. With 2 points per pixel, the plot
+    is the same as with all points
+
+    :returns  indexes of, at most, maxPoints + 2 points
+    """
+    n = len(y)
+    buckets = maxPoints // 2
+    if buckets < 1 or n <= maxPoints: return np.arange(n)
+
+    #equal buckets, the last one also has the remaining points
+    size = n // buckets
+    full = y[:buckets*size].reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lo = offsets + np.argmin(full, axis=1)
+    hi = offsets + np.argmax(full, axis=1)
+    if n > buckets * size:
+        tail = y[buckets*size:]
+        last = (buckets - 1) * size
+        both = np.concatenate((y[last:last+size], tail))
+        lo[-1] = last + np.argmin(both)
+        hi[-1] = last + np.argmax(both)
+    return np.unique(np.concatenate(([0], lo, hi, [n-1])))
+
+
+def lttb(x:np.array, y:np.array, maxPoints:int) -> np.array:
+    """
+    Largest triangle three buckets: keeps the first and last points, and
+    on each of maxPoints-2 buckets, the point of the largest triangle with
+    the point kept on the previous bucket and the average of the next one
+
+    Sveinn Steinarsson, Downsampling Time Series for Visual Representation, 2013
+
+    :returns  indexes of maxPoints points
+    """
+    n = len(y)
+    if maxPoints < 3 or n <= maxPoints: return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    #buckets [edges[i], edges[i+1]), the last one is only the last point
+    edges = np.linspace(1, n-1, maxPoints-1).astype(np.int64)
+    counts = np.diff(np.append(edges, n))
+    avgx = np.add.reduceat(x, edges) / counts
+    avgy = np.add.reduceat(y, edges) / counts
+
+    idx = np.empty(maxPoints, dtype=np.int64)
+    idx[0], idx[-1] = 0, n-1
+    a = 0
+    for i in range(maxPoints-2):
+        lo, hi = edges[i], edges[i+1]
+        ax, ay = x[a], y[a]
+        #twice the triangle area, the same argmax
+        area = np.abs((ax - avgx[i+1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avgy[i+1] - ay))
+        a = lo + int(np.argmax(area))
+        idx[i+1] = a
+    return idx
+
+
+def decimate(x:np.array, y:np.array, maxPoints:int, method:str='minmax') -> np.array:
+    """
+    :returns  indexes of points kept by method: minmax or lttb
+    """
+    if method == 'minmax': return minmax(y, maxPoints)
+    if method == 'lttb':   return lttb(x, y, maxPoints)
+    raise RuntimeError('decimate method must be one of: ' + ', '.join(methods))
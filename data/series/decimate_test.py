@@ -0,0 +1,60 @@
+'''
+Decimate series unit tests
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+
+import numpy as np
+from hdlib.data.series.decimate import minmax, lttb, decimate
+
+##############
+# Unit tests #
+##############
+import unittest
+
+rng = np.random.default_rng(0)
+spawn = 10007
+x0 = np.arange(spawn)
+y0 = np.sin(x0 / 500) + rng.normal(0, 0.1, spawn)
+y0[1234] = 10     #peak
+y0[8765] = -10
+
+
+class TestDecimate(unittest.TestCase):
+    """Unit tests."""
+    def testMinMax0(self):
+        idx = minmax(y0, 200)
+        self.assertTrue(len(idx) <= 202)
+        self.assertTrue((np.diff(idx) > 0).all())
+        self.assertEqual([0, spawn-1], [idx[0], idx[-1]])
+        self.assertIn(1234, idx)
+        self.assertIn(8765, idx)
+        self.assertIn(np.argmax(y0[9900:]) + 9900, idx)   #last bucket has remaining points
+        self.assertEqual(list(range(10)), minmax(y0[:10], 200).tolist())
+
+    def testLTTB0(self):
+        idx = lttb(x0, y0, 300)
+        self.assertEqual(300, len(idx))
+        self.assertTrue((np.diff(idx) > 0).all())
+        self.assertEqual([0, spawn-1], [idx[0], idx[-1]])
+        self.assertIn(1234, idx)
+        self.assertIn(8765, idx)
+        self.assertEqual(list(range(10)), lttb(x0[:10], y0[:10], 300).tolist())
+        #a line keeps its ends
+        line = np.arange(100.0)
+        self.assertEqual([0, 99], [lttb(line, line, 5)[0], lttb(line, line, 5)[-1]])
+
+    def testDecimate0(self):
+        self.assertEqual(minmax(y0, 100).tolist(), decimate(None, y0, 100).tolist())
+        self.assertEqual(lttb(x0, y0, 100).tolist(), decimate(x0, y0, 100, 'lttb').tolist())
+        with self.assertRaises(RuntimeError):
+            decimate(x0, y0, 100, 'other')
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    try:
+        unittest.main()
+    #avoid exception inside vscode when exiting unittest
+    except SystemExit as e:
+        pass
@@ -1,6 +1,8 @@
 from __future__ import annotations #must be at the beginning of file
 import random
 import math
+from typing import List
+import numpy as np
 
 '''
  Simple Linear congruential generator:
@@ -28,7 +30,7 @@ class LCG:
     @classmethod
     def lcg(cls, seed : int = None) -> LCG:
         if seed is None: seed = cls.defaultSeed
-        return LCG(cls.defaultSeed, cls.defaultMultiplier, 
+        return LCG(seed, cls.defaultMultiplier, 
                    cls.defaultIncrement, cls.defaultModulus)
 
     # allow setting seed at any time
@@ -46,3 +48,102 @@ class LCG:
     '''
     def nextInt(self, bound : int) -> int:
         return int(abs(self._update() % bound))
+
+    '''
+    returns: (A, C) such that k updates are x -> (A * x + C) % m, in O(log k)
+             k < 0 are updates backwards, a must be invertible mod m
+    '''
+    def _affine(self, k : int) -> tuple:
+        a, c, m = self._a, self._c, self._m
+        if k < 0:
+            a = pow(a, -1, m)   #ValueError if a not invertible
+            c = (-a * c) % m
+            k = -k
+        A, C = 1, 0
+        #square and multiply, composing updates: (a, c) after (A, C)
+        while k > 0:
+            if k & 1: A, C = (a * A) % m, (a * C + c) % m
+            a, c = (a * a) % m, (a * c + c) % m
+            k >>= 1
+        return A, C
+
+    '''
+    Advance generator k values, as k calls to nextInt(), in O(log k)
+    k < 0 goes back, so jump(-k) undoes jump(k)
+    '''
+    def jump(self, k : int) -> None:
+        A, C = self._affine(k)
+        self._x0 = (A * self._x0 + C) % self._m
+
+    '''
+    pre: k > 0, a invertible mod m (as on full period generators)
+    returns: k independent generators (substreams) of this generator sequence,
+             from its current state, that is not changed:
+      leapfrog: substream i has values i, i+k, i+2k, ...,
+                so interleaving them gives the sequence
+      block:    substream i has values from i*blockSize, so concatenating
+                blockSize values of each gives the sequence
+    Substreams can be sent to other processes, results do not depend on
+    the number of processes, as long as the sequence is split the same way
+    '''
+    def split(self, k : int, mode : str = 'leapfrog', blockSize : int = None) -> List[LCG]:
+        if mode == 'leapfrog':
+            A, C = self._affine(k)
+            streams = []
+            for i in range(k):
+                #state before value i+1, k steps behind it
+                stream = LCG(self._x0, self._a, self._c, self._m)
+                stream.jump(i + 1 - k)
+                streams.append(LCG(stream._x0, A, C, self._m))
+            return streams
+        if mode == 'block':
+            if blockSize is None: raise TypeError('block mode needs blockSize')
+            streams = []
+            for i in range(k):
+                stream = LCG(self._x0, self._a, self._c, self._m)
+                stream.jump(i * blockSize)
+                streams.append(stream)
+            return streams
+        raise TypeError('Unknown split mode: ' + mode)
+
+    '''
+    pre: bound > 0, n >= 0
+    returns: array with dtype of n pseudo random integers in [0, bound[,
+             the same as n calls to nextInt(bound)
+
+    The state of each value is computed from the previous block of states,
+    doubling it, with one vectorized update of k steps, so it takes
+    O(log n) numpy operations. States are uint64, with products wrapping
+    mod 2^64, so m must be a power of 2 up to 2^64, or less than 2^32,
+    otherwise values are generated one at a time
+    '''
+    def nextInts(self, bound : int, n : int, dtype=np.uint64) -> np.ndarray:
+        if bound - 1 > np.iinfo(dtype).max:
+            raise TypeError('bound does not fit in ' + np.dtype(dtype).name)
+        m = self._m
+        pow2 = m & (m - 1) == 0 and m <= 1 << 64
+        if n <= 0: return np.empty(0, dtype=dtype)
+        if not pow2 and m > 1 << 32:
+            return np.fromiter((self.nextInt(bound) for _ in range(n)), dtype=dtype, count=n)
+
+        x = np.empty(n, dtype=np.uint64)
+        x[0] = self._update()
+        s = 1
+        while s < n:
+            A, C = self._affine(s)
+            k = min(s, n - s)
+            if pow2:
+                #wraps mod 2^64, m divides it
+                np.multiply(x[:k], np.uint64(A), out=x[s:s+k])
+                x[s:s+k] += np.uint64(C)
+                if m < 1 << 64: x[s:s+k] &= np.uint64(m - 1)
+            else:
+                #A, C, x < m <= 2^32, products fit
+                np.multiply(x[:k], np.uint64(A), out=x[s:s+k])
+                x[s:s+k] %= np.uint64(m)
+                x[s:s+k] += np.uint64(C)
+                x[s:s+k] %= np.uint64(m)
+            s += k
+        self._x0 = int(x[-1])
+        x %= np.uint64(bound)
+        return x.astype(dtype, copy=False)
@@ -0,0 +1,48 @@
+'''
+Benchmark of LCG batch generation
+
+Time to generate n values with nextInt(), one call each (scalar),
+and with nextInts(), vectorized, and to jump n values ahead.
+
+    python lcgbench.py --sizes 1000 100000 1000000
+
+@author hdaniel@ualg.pt
+@version 202610181200
+'''
+from hdlib.math.lcg import LCG
+from hdlib.time.stopwatch import Stopwatch
+from typing import List
+import argparse
+import numpy as np
+
+sizes : List[int] = [1000, 100000, 1000000]
+
+def bench(n : int, bound : int, repeat : int) -> List[float]:
+    '''returns best seconds of scalar, vectorized and jump'''
+    best = [float('inf')] * 3
+    for _ in range(repeat):
+        rnd = LCG.lcg()
+        chrono = Stopwatch()
+        for _ in range(n): rnd.nextInt(bound)
+        chrono.lap()
+        LCG.lcg().nextInts(bound, n, np.uint32)
+        chrono.lap()
+        LCG.lcg().jump(n)
+        chrono.lap()
+        times = [chrono.read(i+1) - chrono.read(i) for i in range(3)]
+        best = [min(b, t) for b, t in zip(best, times)]
+    return best
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='LCG batch generation benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=sizes, help='values generated')
+    parser.add_argument('--bound', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('{:>10} {:>12} {:>12} {:>10} {:>12}'.format('n', 'scalar (s)', 'batch (s)', 'speedup', 'jump (us)'))
+    for n in args.sizes:
+        scalar, batch, jump = bench(n, args.bound, args.repeat)
+        print('{:>10} {:>12.4f} {:>12.4f} {:>10.1f} {:>12.1f}'.format(n, scalar, batch, scalar/batch, jump*1e6), flush=True)
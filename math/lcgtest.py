@@ -2,6 +2,14 @@ from __future__ import annotations #must be at the beginning of file
 from typing import List
 import unittest
 from lcg import LCG
+import numpy as np
+import multiprocessing
+
+
+#Worker of process pool tests, must be at module level to be pickled
+def draw(args : tuple) -> List[int]:
+    rnd, bound, n = args
+    return rnd.nextInts(bound, n).tolist()
 
 
 '''
@@ -41,5 +49,79 @@ class TestLCG(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+    def test_nextInts00(self) -> None:
+        params : List[tuple] = [(0, LCG.defaultMultiplier, LCG.defaultIncrement, LCG.defaultModulus),
+                                (0, 134775813, 1, 0x100000000),               #Turbo Pascal
+                                (7, 6364136223846793005, 1442695040888963407, 1 << 64),
+                                (3, 16807, 11, 0x7fffffff)]                    #m not a power of 2
+        for seed, a, c, m in params:
+            for n in [0, 1, 2, 7, 1000]:
+                scalar : LCG = LCG(seed, a, c, m)
+                batch  : LCG = LCG(seed, a, c, m)
+                expected : List[int] = [scalar.nextInt(35) for _ in range(n)]
+                actual = batch.nextInts(35, n, np.uint32)
+                self.assertEqual(np.uint32, actual.dtype)
+                self.assertEqual(expected, actual.tolist())
+                #continues the same sequence
+                self.assertEqual(scalar.nextInt(1000), batch.nextInt(1000))
+
+        self.assertEqual(np.uint64, LCG.lcg().nextInts(10, 3).dtype)
+        self.assertRaises(TypeError, LCG.lcg().nextInts, 1 << 40, 3, np.uint32)
+
+
+    def test_jump00(self) -> None:
+        scalar : LCG = LCG.lcg()
+        jumped : LCG = LCG.lcg()
+        for _ in range(12345): scalar.nextInt(10)
+        jumped.jump(12345)
+        self.assertEqual(scalar.nextInts(100, 10).tolist(), jumped.nextInts(100, 10).tolist())
+
+        jumped.jump(-10)
+        jumped.jump(-12345)
+        self.assertEqual(LCG.lcg().nextInts(100, 10).tolist(), jumped.nextInts(100, 10).tolist())
+
+        #a not invertible
+        self.assertRaises(ValueError, LCG(0, 2, 1, 16).jump, -1)
+
+
+    def test_seed00(self) -> None:
+        self.assertEqual(LCG(5, LCG.defaultMultiplier, LCG.defaultIncrement, LCG.defaultModulus).nextInts(100, 5).tolist(),
+                         LCG.lcg(5).nextInts(100, 5).tolist())
+        self.assertNotEqual(LCG.lcg().nextInts(100, 5).tolist(), LCG.lcg(5).nextInts(100, 5).tolist())
+
+
+    def test_split00(self) -> None:
+        serial   : List[int] = LCG.lcg(7).nextInts(1000, 120).tolist()
+        for k in [1, 3, 4, 7]:
+            #leapfrog: interleaved substreams are the sequence
+            parts = [rnd.nextInts(1000, 120) for rnd in LCG.lcg(7).split(k)]
+            actual : List[int] = [0] * 120
+            for i in range(k):
+                actual[i::k] = parts[i][:len(range(i, 120, k))].tolist()
+            self.assertEqual(serial, actual)
+
+            #block: concatenated substreams are the sequence
+            blockSize = -(-120 // k)
+            parts = [rnd.nextInts(1000, blockSize) for rnd in LCG.lcg(7).split(k, 'block', blockSize)]
+            self.assertEqual(serial, np.concatenate(parts)[:120].tolist())
+
+        #split does not change generator
+        rnd : LCG = LCG.lcg(7)
+        rnd.split(4)
+        self.assertEqual(serial[:5], rnd.nextInts(1000, 5).tolist())
+        self.assertRaises(TypeError, rnd.split, 4, 'block')
+        self.assertRaises(TypeError, rnd.split, 4, 'other')
+
+
+    def test_splitPool00(self) -> None:
+        serial : List[int] = LCG.lcg(11).nextInts(50, 4000).tolist()
+        for workers in [2, 4]:
+            with multiprocessing.Pool(workers) as pool:
+                blocks = pool.map(draw, [(rnd, 50, 500) for rnd in LCG.lcg(11).split(8, 'block', 500)])
+                self.assertEqual(serial, sum(blocks, []))
+                parts = pool.map(draw, [(rnd, 50, 500) for rnd in LCG.lcg(11).split(8)])
+                self.assertEqual(serial, np.stack(parts, axis=1).ravel().tolist())
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -4,11 +4,16 @@ Defines also some common network topologies
 
 v0.1 jan 2019
 v0.2 aug 2019
+v0.3 oct 2026 tf.data pipelines to train
 hdaniel@ualg.pt
 '''
+import inspect
+from fractions import Fraction
+import numpy as np
 import tensorflow as tf
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 import pandas as pd
+from hdlib.data.dataseries.dataseries import DataSeries
 from hdlib.time.stopwatch import Stopwatch
 import hdlib.tensorflow.plot as tfplt
 
@@ -109,18 +114,53 @@ class ANNModel():
             self._callbacks.append(save)
 
     #Train the model
-    def train(self, trainXs, trainYs, epochs=10, validationSplit=0.2, batchSize=128, 
-              verbose=0, debug=False):
+    def train(self, trainXs, trainYs=None, epochs=10, validationSplit=0.2, batchSize=128, 
+              verbose=0, debug=False, window=None, horizon=1, columns=None, targets=None,
+              flatten=True, shuffle=True, seed=0, cache=None, preprocess=None):
+        '''
+        Trains with trainXs, trainYs arrays in memory, or with a tf.data pipeline
+        if trainXs is a source of training pairs (trainYs not used):
+
+        DataSeries:      pairs of DataSeries.windowDataset(window, horizon, columns, targets),
+                         the last validationSplit pairs are for validation.
+                         Pairs are copied by batch, so a memory mapped DataSeries
+                         (DataSeries.load(fn, mmap=True)) may be larger than memory
+        generator:       function returning an iterator of (x, y) pairs, called on each pass over them
+        tf.data.Dataset: of (x, y) pairs, not batched
+        Of generators and datasets, validationSplit of the pairs are for validation,
+        evenly spread, eg: 0.25 each 4th pair, so the split is always the same.
+        Validation pairs are cached, in memory if cache is None, so after the
+        first epoch the source is only read once per epoch, for the train pairs.
+        With validationSplit 0 there is no validation
+
+        flatten:    DataSeries pairs flattened to (window*columns,), as needed by dense networks (MLP)
+        shuffle:    train pairs in random order, with seed, different in each epoch.
+                    DataSeries pairs are drawn in random order from all windows,
+                    unless cached, as the cache keeps the order of the first epoch.
+                    Cached DataSeries pairs, and pairs of generators and datasets,
+                    are shuffled in a buffer of max(16*batchSize, 1024) pairs
+        cache:      None, or cache prepared pairs, in memory if '', otherwise in
+                    files cache.train and cache.val, so only the first epoch prepares them
+        preprocess: function of (x, y) tensors, returning (x, y), applied in parallel
+
+        Pairs are prepared and prefetched while training (overlap with compute)
+        '''
         chrono = Stopwatch()
         chrono.reset() 
 
-        #Note: If batchSize, after split in train and validate, train data is smaller than batch
-        #gives error at fit():
-        ##AttributeError: 'ProgbarLogger' object has no attribute 'log_values
-        #https://github.com/keras-team/keras/issues/3657#issuecomment-360522232
-        response = self.model.fit(trainXs, trainYs, batch_size=batchSize, 
-                                validation_split=validationSplit,
-                                epochs=epochs, callbacks=self._callbacks, verbose=verbose)
+        if ANNModel._isSource(trainXs):
+            trainDs, valDs = self._pipeline(trainXs, validationSplit, batchSize, window, horizon,
+                                            columns, targets, flatten, shuffle, seed, cache, preprocess)
+            response = self.model.fit(trainDs, validation_data=valDs, epochs=epochs,
+                                      callbacks=self._callbacks, verbose=verbose)
+        else:
+            #Note: If batchSize, after split in train and validate, train data is smaller than batch
+            #gives error at fit():
+            ##AttributeError: 'ProgbarLogger' object has no attribute 'log_values
+            #https://github.com/keras-team/keras/issues/3657#issuecomment-360522232
+            response = self.model.fit(trainXs, trainYs, batch_size=batchSize, 
+                                    validation_split=validationSplit,
+                                    epochs=epochs, callbacks=self._callbacks, verbose=verbose)
         chrono.lap()
         loss = response.history['loss'][0]
         print('Train Loss:', loss, 'compute time: ' + str(chrono.read(1)))
@@ -128,6 +168,69 @@ class ANNModel():
         if debug:
             tfplt.plotTrainHistory(response)              
 
+    @staticmethod
+    def _isSource(trainXs):
+        '''True if trainXs is a source of pairs for a tf.data pipeline, not arrays'''
+        if inspect.isgenerator(trainXs):
+            raise RuntimeError('pass a function returning the generator, as it is iterated each epoch')
+        return isinstance(trainXs, (DataSeries, tf.data.Dataset)) or callable(trainXs)
+
+    def _pipeline(self, source, validationSplit, batchSize, window, horizon,
+                  columns, targets, flatten, shuffle, seed, cache, preprocess):
+        '''
+        returns (train, validation) tf.data datasets of batches from source, see train(),
+        validation is None if there are no validation pairs
+        '''
+        keepVal = False
+        if isinstance(source, DataSeries):
+            if window is None: raise RuntimeError('window needed to train from a DataSeries')
+            samples = len(source) - window - horizon + 1
+            nval = int(samples * validationSplit)
+            #shuffled by windowBatches over all train pairs, unless cached, as the cache keeps the order
+            globalShuffle = shuffle and cache is None
+            def pairs(start, stop, shuffled):
+                return source.windowDataset(window, horizon, batchSize, columns, targets,
+                                            flatten, shuffled, seed, start, stop).unbatch()
+            train = pairs(0, samples - nval, globalShuffle)
+            val   = pairs(samples - nval, samples, False) if nval > 0 else None
+            if globalShuffle: shuffle = False
+        else:
+            if isinstance(source, tf.data.Dataset):
+                ds = source
+            else:
+                x, y = next(iter(source()))
+                spec = lambda v: tf.TensorSpec(shape=np.shape(v), dtype=tf.as_dtype(np.asarray(v).dtype))
+                ds = tf.data.Dataset.from_generator(source, output_signature=(spec(x), spec(y)))
+
+            #pair i is for validation if floor((i+1)*split) > floor(i*split)
+            frac = Fraction(validationSplit).limit_denominator(1000)
+            num, den = frac.numerator, frac.denominator
+            if num == 0:
+                train, val = ds, None
+            else:
+                def isVal(i, xy):   return (i+1)*num // den > i*num // den
+                def isTrain(i, xy): return tf.logical_not(isVal(i, xy))
+                def pair(i, xy):    return xy
+                ds = ds.enumerate()
+                train = ds.filter(isTrain).map(pair)
+                val   = ds.filter(isVal).map(pair)
+                #validation pairs are kept, so only the first epoch reads the source twice
+                keepVal = True
+
+        if preprocess is not None:
+            train = train.map(preprocess, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+            if val is not None:
+                val = val.map(preprocess, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+        if cache is not None:
+            train = train.cache(cache + '.train' if cache else '')
+        if val is not None and (cache is not None or keepVal):
+            val = val.cache(cache + '.val' if cache else '')
+        if shuffle:
+            train = train.shuffle(max(16*batchSize, 1024), seed=seed, reshuffle_each_iteration=True)
+        if val is not None:
+            val = val.batch(batchSize).prefetch(tf.data.AUTOTUNE)
+        return train.batch(batchSize).prefetch(tf.data.AUTOTUNE), val
+
     #Predict
     def predict(self, testXs, testYs):
         #predict
@@ -165,4 +268,8 @@ class MLP(ANNModel):
         self.model.add(tf.keras.layers.Dense(numNeurons[0], activation=activation, input_shape=(numInputs,)))  # input shape required
         for n in numNeurons:
             self.model.add(tf.keras.layers.Dense(n, activation=activation))
-        self.model.add(tf.keras.layers.Dense(numOutputs))
\ No newline at end of file
+        self.model.add(tf.keras.layers.Dense(numOutputs))
+
+
+from hdlib.time.instrument import instrumentModule
+instrumentModule(__name__)
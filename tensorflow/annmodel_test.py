@@ -0,0 +1,125 @@
+'''
+ANN models unit tests
+Need tensorflow installed, otherwise are skipped
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+import importlib.util, os, tempfile
+import numpy as np
+import pandas as pd
+from hdlib.data.dataseries.simpleseries import SimpleSeries
+
+hasTensorflow = importlib.util.find_spec('tensorflow') is not None
+if hasTensorflow:
+    import tensorflow as tf
+    from hdlib.tensorflow.annmodel import MLP
+
+##############
+# Unit tests #
+##############
+import unittest
+
+window0  = 4
+samples0 = 300
+
+@unittest.skipUnless(hasTensorflow, 'tensorflow not installed')
+class TestANNModel(unittest.TestCase):
+    """Unit tests."""
+    def setUp(self):
+        tf.keras.utils.set_random_seed(0)
+        values = np.sin(np.arange(samples0) / 10).astype(np.float32)
+        self.series = SimpleSeries.fromDataFrame(pd.DataFrame({'A': values}))
+        X, Y = self.series.slidingWindows(window0)
+        self.X = X.reshape(len(X), -1).copy()
+        self.Y = Y.reshape(len(Y), -1).copy()
+
+    def model(self):
+        m = MLP(numInputs=window0, numOutputs=1, numNeurons=[8])
+        m.compile(optimizer='adam', loss='mse', metrics=['mae'])
+        return m
+
+    def history(self, m):
+        return m.model.history.history
+
+    def testTrainArrays0(self):
+        m = self.model()
+        m.train(self.X, self.Y, epochs=2, batchSize=32)
+        self.assertEqual(2, len(self.history(m)['loss']))
+        self.assertEqual(2, len(self.history(m)['val_loss']))
+
+    def testTrainDataSeries0(self):
+        m = self.model()
+        m.train(self.series, epochs=2, batchSize=32, window=window0)
+        h = self.history(m)
+        self.assertEqual(2, len(h['loss']))
+        self.assertEqual(2, len(h['val_loss']))
+        self.assertTrue(np.isfinite(h['loss']).all())
+
+        #validation pairs are the last ones, not shuffled
+        train, val = m._pipeline(self.series, 0.2, 32, window0, 1, None, None,
+                                 True, True, 0, None, None)
+        nval = int(len(self.X) * 0.2)
+        xs = np.concatenate([x.numpy() for x, _ in val])
+        self.assertEqual(self.X[-nval:].tolist(), xs.tolist())
+        #train pairs are all the others, in random order
+        xs = np.concatenate([x.numpy() for x, _ in train])
+        self.assertNotEqual(self.X[:-nval].tolist(), xs.tolist())
+        self.assertEqual(sorted(self.X[:-nval].tolist()), sorted(xs.tolist()))
+
+        with self.assertRaises(RuntimeError):
+            m.train(self.series, epochs=1)
+
+    def testTrainGenerator0(self):
+        def pairs():
+            for x, y in zip(self.X, self.Y):
+                yield x, y
+        m = self.model()
+        with tempfile.TemporaryDirectory() as tmp:
+            m.train(pairs, epochs=2, batchSize=32, validationSplit=0.25,
+                    cache=os.path.join(tmp, 'pairs'))
+        self.assertEqual(2, len(self.history(m)['val_loss']))
+
+        #each 4th pair for validation
+        train, val = m._pipeline(pairs, 0.25, 32, None, 1, None, None,
+                                 True, False, 0, None, None)
+        xs = np.concatenate([x.numpy() for x, _ in val])
+        self.assertEqual(self.X[3::4].tolist(), xs.tolist())
+        self.assertEqual(len(self.X) - len(xs), sum(len(x) for x, _ in train))
+
+        with self.assertRaises(RuntimeError):
+            m.train(pairs(), epochs=1)
+
+    def testNoValidation0(self):
+        calls = []
+        def pairs():
+            calls.append(1)
+            for x, y in zip(self.X, self.Y):
+                yield x, y
+        m = self.model()
+        m.train(pairs, epochs=3, batchSize=32)
+        #validation pairs kept after first epoch, source read once per epoch for train
+        self.assertEqual(3, len(self.history(m)['val_loss']))
+        self.assertEqual(1 + 3 + 1, len(calls))
+
+        for source, window in ((pairs, None), (self.series, window0)):
+            m = self.model()
+            m.train(source, epochs=1, batchSize=32, validationSplit=0, window=window)
+            self.assertNotIn('val_loss', self.history(m))
+            train, val = m._pipeline(source, 0, 32, window, 1, None, None,
+                                     True, True, 0, None, None)
+            self.assertIsNone(val)
+            self.assertEqual(len(self.X), sum(len(x) for x, _ in train))
+
+        #all pairs for validation, no train pairs
+        train, val = m._pipeline(self.series, 1.0, 32, window0, 1, None, None,
+                                 True, True, 0, None, None)
+        self.assertEqual(0, sum(len(x) for x, _ in train))
+        self.assertEqual(len(self.X), sum(len(x) for x, _ in val))
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    try:
+        unittest.main()
+    except SystemExit:
+        pass
@@ -0,0 +1,244 @@
+'''
+Instrumentation of hdlib entry points
+
+Times calls of public entry points, DataSeries factories and interpolate,
+ANNModel train and predict, and log saving and loading, with Stopwatch
+sections, and collects count, latency and bytes processed of each one.
+
+Enabled by the environment variable HDLIB_INSTRUMENT, before importing hdlib:
+    HDLIB_INSTRUMENT=1          enable
+    HDLIB_INSTRUMENT=prof.json  enable and dump to prof.json (or .txt) on exit
+or with enable() and disable(). Disabled, entry points are not wrapped,
+so there is no cost. Modules with entry points call instrumentModule(__name__)
+when imported, to be wrapped if enabled.
+
+    from hdlib.time import instrument
+    instrument.enable()
+    ts = TimeSeries.fromCSV(...)
+    print(instrument.dumps('text'))
+
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+import os, sys, json, atexit, threading
+from functools import wraps
+from typing import Dict, List, Tuple, Any, Callable, Optional
+import numpy as np
+from hdlib.time.stopwatch import Stopwatch
+
+Sizer = Callable[[tuple, dict, Any], int]   #(args, kwargs, result) -> bytes processed
+
+'''
+Bytes processed
+'''
+def nbytes(obj:Any) -> int:
+    '''
+    returns size in bytes of obj: of file, if a file name, of data of a DataSeries,
+    DataFrame or array, 0 if unknown
+    '''
+    if isinstance(obj, (str, bytes, os.PathLike)):
+        try:
+            return os.path.getsize(obj)
+        except OSError:
+            return 0
+    obj = getattr(obj, '_rawData', obj)   #DataSeries
+    usage = getattr(obj, 'memory_usage', None)
+    if callable(usage):
+        return int(np.sum(usage(index=True)))
+    return int(getattr(obj, 'nbytes', 0))
+
+def argBytes(*positions:int) -> Sizer:
+    '''returns sizer of arguments at positions, 0 is self or cls on methods'''
+    def sizer(args:tuple, kwargs:dict, result:Any) -> int:
+        return sum(nbytes(args[i]) for i in positions if i < len(args))
+    return sizer
+
+def resultBytes(args:tuple, kwargs:dict, result:Any) -> int:
+    return nbytes(result)
+
+
+'''
+Entry points of each module: (class, method, sizer)
+File sizes are read after the call, so saved files are measured
+'''
+_entryPoints : Dict[str, List[Tuple[str, str, Optional[Sizer]]]] = {
+    'hdlib.data.dataseries.dataseries': [
+        ('DataSeries', 'save', argBytes(1)),
+        ('DataSeries', 'load', argBytes(1)),
+        ('DataSeries', 'interpolateGaps', argBytes(0))],
+    'hdlib.data.dataseries.simpleseries': [
+        ('SimpleSeries', 'fromDataFrame', resultBytes),
+        ('SimpleSeries', 'fromCSV', argBytes(1)),
+        ('SimpleSeries', 'random', resultBytes),
+        ('SimpleSeries', 'interpolate', argBytes(0))],
+    'hdlib.data.dataseries.timeseries': [
+        ('TimeSeries', 'fromDataFrame', resultBytes),
+        ('TimeSeries', 'fromCSV', argBytes(1)),
+        ('TimeSeries', 'random', resultBytes),
+        ('TimeSeries', 'interpolate', argBytes(0))],
+    'hdlib.data.log.simplelog': [
+        ('SimpleLog', 'save', argBytes(1)),
+        ('SimpleLog', 'load', argBytes(1))],
+    'hdlib.data.log.explog': [
+        ('ExpLog', 'save', argBytes(1)),
+        ('ExpLog', 'load', argBytes(1))],
+    'hdlib.tensorflow.annmodel': [
+        ('ANNModel', 'train', argBytes(1, 2)),
+        ('ANNModel', 'predict', argBytes(1))],
+}
+
+
+class Registry:
+    '''
+    Times and bytes processed of instrumented calls, of all threads.
+    Each thread times in its own Stopwatch, as sections are not thread safe,
+    merged when read. Calls inside other instrumented calls are named
+    outer/inner, as Stopwatch nested sections
+    '''
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock  = threading.Lock()
+        self._threads : List[Tuple[Stopwatch, Dict[str, int]]] = []
+
+    def _thread(self) -> Tuple[Stopwatch, Dict[str, int]]:
+        '''returns (stopwatch, bytes by section) of calling thread'''
+        try:
+            return self._local.state
+        except AttributeError:
+            state = (Stopwatch(), {})
+            with self._lock:
+                self._threads.append(state)
+            self._local.state = state
+            return state
+
+    def wrap(self, func:Callable, name:str, sizer:Optional[Sizer]=None) -> Callable:
+        '''returns func timed in section name'''
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            chrono, sizes = self._thread()
+            sec = chrono.section(name)
+            with sec:
+                result = func(*args, **kwargs)
+            if sizer is not None:
+                sizes[sec.name] = sizes.get(sec.name, 0) + sizer(args, kwargs, result)
+            return result
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def reset(self) -> None:
+        with self._lock:
+            for chrono, sizes in self._threads:
+                chrono.reset()
+                sizes.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        '''
+        returns statistics of each entry point, as Stopwatch.stats() in seconds,
+        with bytes processed and throughput in bytes/s
+        '''
+        merged = Stopwatch()
+        sizes : Dict[str, int] = {}
+        with self._lock:
+            for chrono, sz in self._threads:
+                merged.merge(chrono)
+                for name, b in list(sz.items()):
+                    sizes[name] = sizes.get(name, 0) + b
+        out = merged.stats()
+        for name, st in out.items():
+            st['bytes'] = sizes.get(name, 0)
+            st['bytesPerSec'] = st['bytes'] / st['total'] if st['total'] > 0 else 0.0
+        return out
+
+    def dumps(self, format:str='json') -> str:
+        '''returns statistics as json, or as a text table (format text), times in ms'''
+        stats = self.stats()
+        if format == 'json': return json.dumps(stats, indent=2, default=float)
+        if format != 'text': raise TypeError('Unknown format: ' + format)
+        cols = ['count', 'total', 'mean', 'p50', 'p99', 'max', 'MB', 'MB/s']
+        width = max([len(n) for n in stats] + [11])
+        out = '{:<{w}}'.format('entry point', w=width) + ''.join('{:>12}'.format(c) for c in cols) + '\n'
+        for name, st in stats.items():
+            out += '{:<{w}}{:>12}'.format(name, st['count'], w=width)
+            out += ''.join('{:>12.3f}'.format(st[c] * 1e3) for c in cols[1:6])
+            out += '{:>12.3f}{:>12.1f}\n'.format(st['bytes'] / 1e6, st['bytesPerSec'] / 1e6)
+        return out
+
+    def dump(self, fn:str) -> None:
+        '''saves statistics in fn, as text if it ends in .txt, otherwise as json'''
+        with open(fn, 'w') as fp:
+            fp.write(self.dumps('text' if fn.endswith('.txt') else 'json'))
+
+
+registry = Registry()
+_enabled = False
+_installed : Dict[str, List[Tuple[type, str, Any]]] = {}   #module: [(class, method, original)]
+
+def isEnabled() -> bool:
+    return _enabled
+
+def register(module:str, cls:str, method:str, sizer:Optional[Sizer]=None) -> None:
+    '''adds entry point module.cls.method, wrapped now if enabled and module imported'''
+    _entryPoints.setdefault(module, []).append((cls, method, sizer))
+    if _enabled and module in sys.modules:
+        _uninstall(module)
+        _install(module)
+
+def instrumentModule(module:str) -> None:
+    '''wraps entry points of module, if enabled, called by modules when imported'''
+    if _enabled: _install(module)
+
+def enable() -> None:
+    '''wraps entry points of modules already imported, and of others when imported'''
+    global _enabled
+    _enabled = True
+    for module in _entryPoints:
+        if module in sys.modules: _install(module)
+
+def disable() -> None:
+    '''restores entry points, statistics are kept until reset()'''
+    global _enabled
+    _enabled = False
+    for module in list(_installed):
+        _uninstall(module)
+
+def _install(module:str) -> None:
+    if module in _installed: return
+    mod = sys.modules[module]
+    points = _entryPoints.get(module, [])
+    #module still being imported, wrapped by its own call to instrumentModule()
+    if not all(hasattr(mod, clsName) for clsName, _, _ in points): return
+    installed = []
+    for clsName, method, sizer in points:
+        cls = getattr(mod, clsName)
+        original = cls.__dict__[method]
+        name = clsName + '.' + method
+        #class and static methods wrap the function they hold
+        if isinstance(original, (classmethod, staticmethod)):
+            wrapped = type(original)(registry.wrap(original.__func__, name, sizer))
+        else:
+            wrapped = registry.wrap(original, name, sizer)
+        setattr(cls, method, wrapped)
+        installed.append((cls, method, original))
+    _installed[module] = installed
+
+def _uninstall(module:str) -> None:
+    for cls, method, original in _installed.pop(module, []):
+        setattr(cls, method, original)
+
+def reset() -> None:
+    registry.reset()
+
+def stats() -> Dict[str, dict]:
+    return registry.stats()
+
+def dumps(format:str='json') -> str:
+    return registry.dumps(format)
+
+def dump(fn:str) -> None:
+    registry.dump(fn)
+
+
+_env = os.environ.get('HDLIB_INSTRUMENT', '')
+if _env not in ('', '0'):
+    enable()
+    if _env != '1': atexit.register(dump, _env)
@@ -0,0 +1,99 @@
+'''
+Instrumentation unit tests
+v0.1 oct 2026
+hdaniel@ualg.pt
+'''
+from hdlib.time import instrument
+from hdlib.data.dataseries.simpleseries import SimpleSeries
+from hdlib.data.dataseries.dataseries import DataSeries
+from hdlib.data.log.simplelog import SimpleLog
+import os, json, tempfile, threading
+import numpy as np
+import pandas as pd
+
+##############
+# Unit tests #
+##############
+import unittest
+
+class TestInstrument(unittest.TestCase):
+    """Unit tests."""
+    def setUp(self):
+        instrument.reset()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def testEnable0(self):
+        fromDataFrame = SimpleSeries.__dict__['fromDataFrame']
+        save = DataSeries.__dict__['save']
+        instrument.enable()
+        self.assertTrue(instrument.isEnabled())
+        self.assertIsNot(fromDataFrame, SimpleSeries.__dict__['fromDataFrame'])
+        self.assertIsInstance(SimpleSeries.__dict__['fromDataFrame'], classmethod)
+        self.assertEqual('save', DataSeries.save.__name__)
+        instrument.enable()   #twice does not wrap again
+        self.assertIs(save, DataSeries.__dict__['save'].__wrapped__)
+
+        instrument.disable()
+        self.assertFalse(instrument.isEnabled())
+        self.assertIs(fromDataFrame, SimpleSeries.__dict__['fromDataFrame'])
+        self.assertIs(save, DataSeries.__dict__['save'])
+
+    def testStats0(self):
+        df = pd.DataFrame({'a': np.arange(1000, dtype=np.float64)})
+        SimpleSeries.fromDataFrame(df)   #disabled, not counted
+        instrument.enable()
+        for _ in range(3):
+            ds = SimpleSeries.fromDataFrame(df)
+        log = SimpleLog()
+        log.add('x')
+        with tempfile.TemporaryDirectory() as tmp:
+            fn = os.path.join(tmp, 'ds.bin')
+            ds.save(fn)
+            loaded = SimpleSeries.load(fn)
+            log.save(os.path.join(tmp, 'x.log'))
+            SimpleLog.load(os.path.join(tmp, 'x.log'))
+            size = os.path.getsize(fn)
+        self.assertIsInstance(loaded, SimpleSeries)
+
+        stats = instrument.stats()
+        self.assertEqual(['DataSeries.load', 'DataSeries.save', 'SimpleLog.load',
+                          'SimpleLog.save', 'SimpleSeries.fromDataFrame'], list(stats))
+        st = stats['SimpleSeries.fromDataFrame']
+        self.assertEqual(3, st['count'])
+        self.assertEqual(3 * int(df.memory_usage(index=True).sum()), st['bytes'])
+        self.assertTrue(st['total'] > 0 and st['bytesPerSec'] > 0)
+        self.assertEqual(size, stats['DataSeries.save']['bytes'])
+        self.assertEqual(size, stats['DataSeries.load']['bytes'])
+
+        self.assertEqual(stats.keys(), json.loads(instrument.dumps()).keys())
+        lines = instrument.dumps('text').splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertEqual(['entry', 'point', 'count', 'total', 'mean', 'p50', 'p99', 'max', 'MB', 'MB/s'],
+                         lines[0].split())
+        self.assertEqual(['SimpleSeries.fromDataFrame', '3'], lines[5].split()[:2])
+        self.assertRaises(TypeError, instrument.dumps, 'xml')
+
+        instrument.reset()
+        self.assertEqual({}, instrument.stats())
+
+    def testThreads0(self):
+        instrument.enable()
+        df = pd.DataFrame({'a': np.arange(10, dtype=np.float64)})
+        def work():
+            for _ in range(50):
+                SimpleSeries.fromDataFrame(df)
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(200, instrument.stats()['SimpleSeries.fromDataFrame']['count'])
+
+
+#This way only runs if NOT imported!
+if __name__ == "__main__":
+    try:
+        unittest.main()
+    except SystemExit:
+        pass
@@ -24,6 +24,82 @@ class TestStopWatch(unittest.TestCase):
         self.assertEqual("0", str(chrono.read(0)).split(".")[0])
         self.assertEqual("1", str(chrono.read(1)).split(".")[0])
         self.assertEqual("3", str(chrono.read(2)).split(".")[0])
+        self.assertEqual(3, len(chrono.laps()))
+
+    def testSections0(self):
+        chrono = Stopwatch()
+        for _ in range(3):
+            with chrono.section('outer'):
+                with chrono.section('inner'):
+                    time.sleep(0.01)
+        with chrono.section('inner'): pass
+        stats = chrono.stats()
+        self.assertEqual(['inner', 'outer', 'outer/inner'], list(stats))
+        self.assertEqual(3, stats['outer/inner']['count'])
+        self.assertEqual(1, stats['inner']['count'])
+        self.assertTrue(stats['outer/inner']['min'] >= 0.01)
+        self.assertTrue(stats['outer']['total'] >= stats['outer/inner']['total'])
+
+        #same section reentered
+        sec = chrono.section('again')
+        with sec:
+            with sec: pass
+        self.assertEqual(2, len(chrono.samples('again')))
+        self.assertTrue(chrono.samples('again')[1] >= chrono.samples('again')[0])
+
+    def testTimed0(self):
+        chrono = Stopwatch()
+        @chrono.timed()
+        def f(x): return 2 * x
+        @chrono.timed('g')
+        def g(): return f(1)
+        self.assertEqual(4, f(2))
+        self.assertEqual(2, g())
+        self.assertEqual('f', f.__name__)
+        f = 'TestStopWatch.testTimed0.<locals>.f'
+        self.assertEqual([f, 'g', 'g/' + f], list(chrono.stats()))
+
+    def testStats0(self):
+        chrono = Stopwatch()
+        for ns in range(1, 101):
+            chrono.record('x', ns * 1000)
+        st = chrono.stats(percentiles=(50, 99))['x']
+        self.assertEqual(100, st['count'])
+        self.assertAlmostEqual(5050e-6, st['total'])
+        self.assertAlmostEqual(1e-6, st['min'])
+        self.assertAlmostEqual(100e-6, st['max'])
+        self.assertAlmostEqual(50.5e-6, st['mean'])
+        self.assertAlmostEqual(50.5e-6, st['p50'])
+        self.assertAlmostEqual(99.01e-6, st['p99'])
+        self.assertRaises(KeyError, chrono.samples, 'y')
+        lines = chrono.report(percentiles=(50, 99)).splitlines()
+        self.assertEqual(['section', 'count', 'total', 'min', 'max', 'mean', 'p50', 'p99'], lines[0].split())
+        self.assertEqual(['x', '100', '5.0500', '0.0010', '0.1000', '0.0505', '0.0505', '0.0990'], lines[1].split())
+
+    def testKeepArrays0(self):
+        chrono = Stopwatch()
+        laps = chrono.laps()
+        chrono.lap()
+        self.assertEqual(1, len(laps))
+        self.assertEqual(2, len(chrono.laps()))
+        with chrono.section('x'): pass
+        samples = chrono.samples('x')
+        with chrono.section('x'): pass
+        self.assertEqual(1, len(samples))
+        self.assertEqual(2, len(chrono.samples('x')))
+
+    def testMerge0(self):
+        a, b = Stopwatch(), Stopwatch()
+        a.record('x', 1)
+        b.record('x', 2)
+        b.record('y', 3)
+        a.merge(b)
+        self.assertEqual([1, 2], a.samples('x').tolist())
+        self.assertEqual([3], a.samples('y').tolist())
+        self.assertEqual([2], b.samples('x').tolist())
+
+    def testOverhead0(self):
+        self.assertTrue(0 < Stopwatch.overhead(1000) < 1e-3)
 
 
 #This way only runs if NOT imported!